@@ -0,0 +1,367 @@
+import multiprocessing
+import os
+import queue
+import signal
+import threading
+import time
+import uuid
+from typing import Callable, Dict, List, Optional, Tuple
+
+from file_analyzer import EXTRACT_SECONDS, ExtractionError
+from metrics import Histogram
+from tracing import RequestTracer, span
+
+ANALYSIS_QUEUE_WAIT_SECONDS = Histogram("chatbot_analysis_queue_wait_seconds", "파일 분석 작업의 큐 대기 시간")
+# 작업 프로세스 결과 종류를 FileAnalyzer.extract_content의 결과 레이블로 변환
+_PROCESS_OUTCOMES = {"done": "ok", "failed": "error", "cancelled": "cancelled", "timeout": "timeout"}
+
+
+class QueueFullError(Exception):
+    """대기 중인 분석 작업이 너무 많아 새 작업을 받을 수 없는 경우"""
+
+
+def _extract_in_process(conn, options: Dict, file_path: str, file_extension: str,
+                        memory_limit_bytes: Optional[int]) -> None:
+    """
+    작업 프로세스에서 파일 내용을 추출하여 부모 프로세스로 전달
+
+    ("progress", 추출된 부분), ("done", {content, complete}), ("error", 오류 메시지) 순서로 보냅니다.
+    """
+    # PDF 추출용 프로세스 풀까지 한 번에 종료할 수 있도록 새 프로세스 그룹으로 분리
+    if hasattr(os, "setsid"):
+        os.setsid()
+    if memory_limit_bytes:
+        try:
+            import resource
+            resource.setrlimit(resource.RLIMIT_AS, (memory_limit_bytes, memory_limit_bytes))
+        except (ImportError, ValueError, OSError):
+            pass  # 메모리 제한을 지원하지 않는 환경에서는 시간 제한만 적용
+
+    try:
+        from file_analyzer import FileAnalyzer
+        analyzer = FileAnalyzer(**options)
+        status = {}
+        content = analyzer.extract_content(
+            file_path, file_extension, on_progress=lambda part: conn.send(("progress", part)), status=status)
+        conn.send(("done", {"content": content, "complete": status["complete"]}))
+    except ExtractionError as e:
+        conn.send(("error", str(e)))
+    except MemoryError:
+        conn.send(("error", "분석 중 메모리 제한을 초과했습니다."))
+    except Exception as e:
+        conn.send(("error", f"파일 분석 중 오류가 발생했습니다: {str(e)}"))
+    finally:
+        conn.close()
+
+
+class AnalysisJob:
+    """
+    파일 분석 작업 하나의 상태
+
+    상태는 queued -> running -> done/failed/cancelled/timeout 순서로 바뀌며,
+    추출된 부분 내용(partial)은 도착하는 대로 쌓여 진행 상황 스트림으로 전달됩니다.
+    """
+
+    FINISHED = ("done", "failed", "cancelled", "timeout")
+
+    def __init__(self, upload: Dict):
+        self.job_id = uuid.uuid4().hex
+        self.upload = upload
+        self.status = "queued"
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.partial: List[str] = []
+        self.result: Optional[Dict] = None
+        self.error: Optional[str] = None
+        self.cancel_requested = threading.Event()
+        self._condition = threading.Condition()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in self.FINISHED
+
+    def add_partial(self, part: str) -> None:
+        with self._condition:
+            self.partial.append(part)
+            self._condition.notify_all()
+
+    def set_status(self, status: str, result: Optional[Dict] = None, error: Optional[str] = None) -> None:
+        with self._condition:
+            self.status = status
+            if status == "running":
+                self.started_at = time.time()
+            if status in self.FINISHED:
+                self.finished_at = time.time()
+            self.result = result
+            self.error = error
+            self._condition.notify_all()
+
+    def wait_for_update(self, seen_parts: int, timeout: float) -> Tuple[List[str], bool]:
+        """
+        seen_parts 이후에 추가된 부분 내용을 기다려 반환
+
+        Returns:
+            (새 부분 내용 목록, 작업 종료 여부)
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: len(self.partial) > seen_parts or self.finished, timeout)
+            return self.partial[seen_parts:], self.finished
+
+    def to_dict(self, include_partial: bool = False) -> Dict:
+        """상태 조회 응답"""
+        with self._condition:
+            data = {
+                "job_id": self.job_id,
+                "status": self.status,
+                "filename": self.upload["filename"],
+                "file_type": self.upload["file_type"],
+                "file_size": self.upload["file_size"],
+                "created_at": self.created_at,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+                "progress": {"parts": len(self.partial), "chars": sum(len(part) for part in self.partial)},
+                "error": self.error
+            }
+            if include_partial:
+                data["partial_content"] = "".join(self.partial)
+            if self.result is not None:
+                data.update(self.result)
+            return data
+
+
+class AnalysisJobQueue:
+    """
+    느린 파일 분석을 요청 스레드 밖에서 실행하는 작업 큐
+
+    작업은 정해진 수의 작업 스레드가 하나씩 맡고, CPU를 많이 쓰는 형식(PDF, 문서, 엑셀, 이미지)은
+    별도 프로세스에서 추출하여 시간/메모리 제한을 넘거나 취소되면 프로세스를 종료합니다.
+    대기 중인 작업이 max_pending을 넘으면 새 작업은 QueueFullError로 거절됩니다.
+    """
+
+    def __init__(self, analyzer, max_workers: int = 2, max_pending: int = 16,
+                 time_limit: Optional[float] = 120, memory_limit_mb: Optional[int] = 1024,
+                 process_extensions=(".pdf", ".docx", ".xlsx", ".jpg", ".jpeg", ".png", ".gif"),
+                 retention: float = 3600, max_jobs: int = 1000,
+                 on_done: Optional[Callable[[Dict, Dict], None]] = None,
+                 tracer: Optional[RequestTracer] = None):
+        """
+        Args:
+            analyzer: 업로드 저장과 내용 추출에 사용할 FileAnalyzer
+            max_workers: 동시에 실행할 분석 작업 수
+            max_pending: 실행을 기다릴 수 있는 최대 작업 수
+            time_limit: 작업 하나의 제한 시간 (초, None이면 무제한)
+            memory_limit_mb: 작업 프로세스의 메모리 제한 (MB, None이면 무제한)
+            process_extensions: 별도 프로세스에서 추출할 확장자 (나머지는 작업 스레드에서 추출)
+            retention: 끝난 작업의 상태를 보관하는 시간 (초)
+            max_jobs: 상태를 보관하는 최대 작업 수
+            on_done: 분석이 끝난 뒤 작업을 done으로 바꾸기 전에 (업로드, 파일 정보)로 호출
+                     (예: 업로드 문서 색인)
+            tracer: 주어지면 작업마다 구간을 추적하여 오래 걸린 작업을 기록
+        """
+        self.analyzer = analyzer
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.time_limit = time_limit
+        self.memory_limit_mb = memory_limit_mb
+        self.process_extensions = set(process_extensions)
+        self.retention = retention
+        self.max_jobs = max_jobs
+        self.on_done = on_done
+        self.tracer = tracer
+
+        self._queue: "queue.Queue[Optional[AnalysisJob]]" = queue.Queue(maxsize=max_pending)
+        self._jobs: Dict[str, AnalysisJob] = {}
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+        self._context = multiprocessing.get_context("spawn")
+
+        self.rejected = 0
+
+    def start(self) -> None:
+        """작업 스레드 시작"""
+        with self._lock:
+            if self._threads:
+                return
+            for index in range(self.max_workers):
+                thread = threading.Thread(target=self._worker_loop, name=f"analysis-worker-{index}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, upload: Dict) -> AnalysisJob:
+        """
+        저장된 업로드(FileAnalyzer.prepare_upload 결과)의 분석 작업 추가
+
+        대기 중인 작업이 너무 많으면 QueueFullError를 발생시킵니다.
+        """
+        job = AnalysisJob(upload)
+        with self._lock:
+            self._prune_jobs()
+            try:
+                self._queue.put_nowait(job)
+            except queue.Full:
+                self.rejected += 1
+                raise QueueFullError("분석 대기 중인 파일이 많습니다. 잠시 후 다시 시도해주세요.") from None
+            self._jobs[job.job_id] = job
+        return job
+
+    def get(self, job_id: str) -> Optional[AnalysisJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        """작업 취소 요청 (이미 끝난 작업이면 False)"""
+        job = self.get(job_id)
+        if job is None or job.finished:
+            return False
+        job.cancel_requested.set()
+        if job.status == "queued":
+            job.set_status("cancelled")
+        return True
+
+    def stats(self) -> Dict:
+        """상태별 작업 수와 거절 횟수"""
+        with self._lock:
+            counts: Dict[str, int] = {}
+            for job in self._jobs.values():
+                counts[job.status] = counts.get(job.status, 0) + 1
+            return {"jobs": counts, "pending": self._queue.qsize(), "max_pending": self.max_pending,
+                    "workers": self.max_workers, "rejected": self.rejected}
+
+    def shutdown(self) -> None:
+        """대기 중인 작업을 취소하고 작업 스레드 종료"""
+        with self._lock:
+            for job in self._jobs.values():
+                if not job.finished:
+                    job.cancel_requested.set()
+            threads, self._threads = self._threads, []
+        for _ in threads:
+            self._queue.put(None)
+        for thread in threads:
+            thread.join()
+
+    def _prune_jobs(self) -> None:
+        """보관 기간이 지났거나 너무 많이 쌓인 끝난 작업 제거 (잠금 안에서 호출)"""
+        now = time.time()
+        finished = sorted((job for job in self._jobs.values() if job.finished), key=lambda job: job.finished_at)
+        excess = len(self._jobs) - self.max_jobs
+        for job in finished:
+            if now - job.finished_at > self.retention or excess > 0:
+                del self._jobs[job.job_id]
+                excess -= 1
+
+    def _worker_loop(self) -> None:
+        """작업 스레드: 큐에서 작업을 꺼내 실행"""
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            if job.cancel_requested.is_set():
+                if not job.finished:
+                    job.set_status("cancelled")
+                continue
+            trace = self.tracer.start("analysis_job", job_id=job.job_id,
+                                      file_type=job.upload["file_type"]) if self.tracer else None
+            try:
+                self._run_job(job)
+            except Exception as e:
+                job.set_status("failed", error=f"파일 분석 중 오류가 발생했습니다: {str(e)}")
+            finally:
+                if self.tracer:
+                    self.tracer.finish(trace, status=job.status)
+
+    def _run_job(self, job: AnalysisJob) -> None:
+        """작업 하나 실행"""
+        job.set_status("running")
+        ANALYSIS_QUEUE_WAIT_SECONDS.observe(job.started_at - job.created_at)
+        upload = job.upload
+        if upload["file_type"] in self.process_extensions:
+            # 작업 프로세스에서 기록한 지표는 사라지므로 프로세스 시작부터 결과까지를 여기서 기록
+            start = time.perf_counter()
+            with span("analysis.extract_in_process", file_type=upload["file_type"]):
+                outcome, payload = self._extract_in_process(job)
+            EXTRACT_SECONDS.labels(upload["file_type"], _PROCESS_OUTCOMES[outcome]).observe(
+                time.perf_counter() - start)
+        else:
+            # 가벼운 형식은 작업 스레드에서 바로 추출 (이 경우 제한 시간은 끝난 뒤에만 확인)
+            status = {}
+            try:
+                content = self.analyzer.extract_content(upload["file_path"], upload["file_type"],
+                                                        on_progress=job.add_partial, status=status)
+                outcome, payload = "done", {"content": content, "complete": status["complete"]}
+            except ExtractionError as e:
+                outcome, payload = "failed", str(e)
+            if job.cancel_requested.is_set():
+                outcome, payload = "cancelled", None
+            elif self.time_limit is not None and time.time() - job.started_at > self.time_limit:
+                outcome, payload = "timeout", "분석 제한 시간을 초과했습니다."
+
+        if outcome == "done":
+            # 제한으로 잘린 내용은 저장하지 않음 (finish_upload 참고)
+            file_info = self.analyzer.finish_upload(upload, payload["content"], complete=payload["complete"])
+            if self.on_done:
+                self.on_done(upload, file_info)
+            job.set_status("done", result={
+                "file_info": file_info,
+                "summary": self.analyzer.get_file_summary(file_info)
+            })
+        elif outcome == "cancelled":
+            job.set_status("cancelled")
+        else:
+            job.set_status(outcome, error=payload)
+
+    def _extract_in_process(self, job: AnalysisJob) -> Tuple[str, Optional[str]]:
+        """
+        별도 프로세스에서 내용 추출
+
+        Returns:
+            (결과 종류 done/failed/cancelled/timeout, 추출 결과 {content, complete} 또는 오류 메시지)
+        """
+        upload = job.upload
+        memory_limit = self.memory_limit_mb * 1024 * 1024 if self.memory_limit_mb else None
+        receiver, sender = self._context.Pipe(duplex=False)
+        # PDF 추출은 작업 프로세스 안에서 다시 프로세스 풀을 쓰므로 daemon으로 만들지 않음
+        process = self._context.Process(
+            target=_extract_in_process,
+            args=(sender, self.analyzer.options, upload["file_path"], upload["file_type"], memory_limit),
+            name=f"analysis-{job.job_id[:8]}")
+        process.start()
+        sender.close()
+
+        deadline = time.monotonic() + self.time_limit if self.time_limit is not None else None
+        try:
+            while True:
+                if job.cancel_requested.is_set():
+                    return "cancelled", None
+                wait = 0.1
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return "timeout", "분석 제한 시간을 초과했습니다."
+                    wait = min(wait, remaining)
+                if not receiver.poll(wait):
+                    continue
+                try:
+                    kind, payload = receiver.recv()
+                except EOFError:
+                    process.join()
+                    return "failed", f"분석 프로세스가 비정상 종료되었습니다 (종료 코드 {process.exitcode})."
+                if kind == "progress":
+                    job.add_partial(payload)
+                elif kind == "done":
+                    return "done", payload
+                else:
+                    return "failed", payload
+        finally:
+            receiver.close()
+            if process.is_alive():
+                self._kill_process_group(process)
+            process.join()
+
+    @staticmethod
+    def _kill_process_group(process) -> None:
+        """작업 프로세스와 그 프로세스가 만든 하위 프로세스 종료"""
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except (AttributeError, OSError):
+            process.kill()
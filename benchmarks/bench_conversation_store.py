@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+대화 기록 저장소 벤치마크 (JSON 파일 vs SQLite)
+
+세션 여러 개에 메시지를 저널 기록과 같은 크기의 묶음으로 저장한 뒤, 세션 로드, 세션 목록 조회,
+오래된 메시지 페이지 조회 시간을 저장소별로 비교합니다. 같은 JSON 기록을 SQLite로
+가져오는 마이그레이션 시간도 측정합니다.
+
+실행: python benchmarks/bench_conversation_store.py [세션 수 (기본값: 1000)] [세션당 메시지 수 (기본값: 200)]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from conversation_store import JsonFileStore, SqliteConversationStore, migrate_json_sessions
+
+BATCH = 4  # 쓰기 지연 작성기가 한 번에 기록하는 메시지 수와 비슷한 크기
+MAX_HISTORY = 100  # 웹 앱의 max_history
+QUERIES = 200
+
+
+def _message(session: int, seq: int) -> dict:
+    return {"timestamp": datetime.now().isoformat(), "role": "user" if seq % 2 else "assistant",
+            "content": f"세션 {session}의 {seq}번째 메시지입니다. " * 4, "response_time": 0.1,
+            "source": "bench", "token_count": 40}
+
+
+def fill(store, sessions: int, messages: int) -> float:
+    """세션마다 메시지를 묶음으로 기록하고 max_history마다 스냅샷 저장. 메시지당 시간 (초)"""
+    start = time.perf_counter()
+    for session in range(sessions):
+        session_id = f"s{session:06d}"
+        history = []
+        for first in range(1, messages + 1, BATCH):
+            entries = [(seq, _message(session, seq)) for seq in range(first, min(first + BATCH, messages + 1))]
+            store.append_messages(session_id, entries)
+            history.extend(message for _, message in entries)
+            if entries[-1][0] % MAX_HISTORY < BATCH:
+                store.save_snapshot(session_id, {
+                    "session_id": session_id, "last_seq": entries[-1][0],
+                    "conversation_history": history[-MAX_HISTORY:], "summary": {},
+                    "context_summary": {"content": "", "summarized_seq": 0}})
+    return (time.perf_counter() - start) / (sessions * messages)
+
+
+def bench_queries(store, sessions: int, messages: int) -> dict:
+    """로드, 세션 목록, 오래된 페이지 조회의 평균 시간 (초)"""
+    session_ids = [f"s{random.randrange(sessions):06d}" for _ in range(QUERIES)]
+    results = {}
+
+    start = time.perf_counter()
+    for session_id in session_ids:
+        store.load(session_id, max_messages=MAX_HISTORY)
+    results["load"] = (time.perf_counter() - start) / QUERIES
+
+    start = time.perf_counter()
+    for _ in range(10):
+        store.list_sessions()
+    results["list"] = (time.perf_counter() - start) / 10
+
+    start = time.perf_counter()
+    for session_id in session_ids:
+        store.get_messages(session_id, before_seq=messages - MAX_HISTORY // 2, limit=20)
+    results["page"] = (time.perf_counter() - start) / QUERIES
+    return results
+
+
+def main():
+    sessions = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    messages = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    random.seed(0)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        history_dir = os.path.join(tmp_dir, "json")
+        stores = {"json": JsonFileStore(history_dir),
+                  "sqlite": SqliteConversationStore(os.path.join(tmp_dir, "conversations.db"))}
+        print(f"세션 {sessions}개 x 메시지 {messages}개")
+        print(f"{'저장소':<8} {'기록(µs/메시지)':>16} {'로드(ms)':>10} {'목록(ms)':>10} {'페이지(ms)':>11}")
+        for name, store in stores.items():
+            write_cost = fill(store, sessions, messages)
+            results = bench_queries(store, sessions, messages)
+            print(f"{name:<8} {write_cost * 1e6:>16.1f} {results['load'] * 1000:>10.2f} "
+                  f"{results['list'] * 1000:>10.2f} {results['page'] * 1000:>11.2f}")
+        stores["sqlite"].close()
+
+        start = time.perf_counter()
+        result = migrate_json_sessions(history_dir, os.path.join(tmp_dir, "migrated.db"))
+        elapsed = time.perf_counter() - start
+        print(f"마이그레이션: 세션 {result['sessions']}개, 메시지 {result['messages']}개, {elapsed:.2f}초 "
+              f"(세션당 {elapsed / max(result['sessions'], 1) * 1000:.2f}ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Excel 텍스트 추출 메모리 벤치마크
+
+행 수가 다른 합성 .xlsx 파일을 만들어, 기존 방식(load_workbook 기본 모드로 모든 셀을
+메모리에 올린 뒤 content += ...)과 StreamingExcelExtractor의 최대 메모리 사용량(peak RSS)을
+비교합니다. 측정마다 새 프로세스를 띄우므로 앞선 측정의 메모리가 섞이지 않습니다.
+기존 방식은 파일 크기에 비례해 늘어나고, 제한을 둔 스트리밍 추출은 거의 일정해야 합니다.
+(제한 없는 스트리밍 추출도 셀 객체는 만들지 않지만, 결과 문자열 크기만큼은 늘어납니다.)
+
+실행: python benchmarks/bench_excel_extraction.py [행 수 ...]
+"""
+
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+ROW_COUNTS = [20000, 60000, 120000]
+COLUMNS = 10
+
+
+def write_synthetic_workbook(path: str, rows: int, columns: int = COLUMNS) -> None:
+    """헤더 한 행과 숫자/문자열이 섞인 데이터 행으로 된 .xlsx 파일 생성"""
+    import openpyxl
+
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet("data")
+    sheet.append([f"column_{column}" for column in range(columns)])
+    for row in range(rows):
+        sheet.append([row * column if column % 2 else f"value {row}-{column}" for column in range(columns)])
+    workbook.save(path)
+
+
+def _peak_rss_mb() -> float:
+    """현재 프로세스의 최대 메모리 사용량 (MB)"""
+    import resource
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux는 KB, macOS는 바이트 단위
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+def _measure(mode: str, path: str, result_queue) -> None:
+    """작업 프로세스에서 한 가지 방식으로 추출하고 (시간, 최대 메모리, 글자 수) 전달"""
+    import openpyxl
+    from excel_extractor import StreamingExcelExtractor
+
+    start = time.perf_counter()
+    if mode == "full":
+        workbook = openpyxl.load_workbook(path)
+        content = ""
+        for sheet_name in workbook.sheetnames:
+            sheet = workbook[sheet_name]
+            content += f"\n--- 시트: {sheet_name} ---\n"
+            for row in sheet.iter_rows(values_only=True):
+                if any(cell is not None for cell in row):
+                    content += " | ".join(str(cell) if cell is not None else "" for cell in row) + "\n"
+    elif mode == "streaming":
+        content = StreamingExcelExtractor().extract_text(path)["content"]
+    else:
+        from config import EXCEL_MAX_BYTES, EXCEL_MAX_COLUMNS, EXCEL_MAX_ROWS
+        extractor = StreamingExcelExtractor(
+            max_rows=EXCEL_MAX_ROWS, max_columns=EXCEL_MAX_COLUMNS, max_bytes=EXCEL_MAX_BYTES)
+        content = extractor.extract_text(path)["content"]
+    result_queue.put((time.perf_counter() - start, _peak_rss_mb(), len(content)))
+
+
+def measure(mode: str, path: str):
+    context = multiprocessing.get_context("spawn")
+    result_queue = context.Queue()
+    process = context.Process(target=_measure, args=(mode, path, result_queue))
+    process.start()
+    result = result_queue.get()
+    process.join()
+    return result
+
+
+def main() -> None:
+    row_counts = [int(arg) for arg in sys.argv[1:]] or ROW_COUNTS
+    modes = ["full", "streaming", "capped"]
+    print(f"{'rows':>8} {'file':>8}" + "".join(f" {mode:>22}" for mode in modes))
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for rows in row_counts:
+            path = os.path.join(tmp_dir, f"synthetic_{rows}.xlsx")
+            write_synthetic_workbook(path, rows)
+            line = f"{rows:>8} {os.path.getsize(path) / 1024 / 1024:>6.1f}MB"
+            for mode in modes:
+                elapsed, peak, _ = measure(mode, path)
+                line += f" {peak:>9.0f}MB RSS {elapsed:>6.2f}s"
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
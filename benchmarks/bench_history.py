@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+대화 히스토리 저장 구조 마이크로 벤치마크
+
+최대 개수(max_history)에 도달한 상태에서 메시지 하나를 추가하는 비용을
+기존 list.pop(0) 방식과 RingBuffer 방식으로 비교합니다.
+RingBuffer는 용량과 무관하게 메시지당 비용이 일정해야 합니다.
+
+실행: python benchmarks/bench_history.py
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from conversation_manager import ConversationManager
+from ring_buffer import RingBuffer
+
+CAPACITIES = [100, 10_000, 100_000, 1_000_000]
+MESSAGES = 20_000
+
+
+def _message(i: int) -> dict:
+    return {"role": "user", "content": f"메시지 {i}"}
+
+
+def bench_list(capacity: int) -> float:
+    """기존 방식: list.append + pop(0)"""
+    history = [_message(i) for i in range(capacity)]
+    start = time.perf_counter()
+    for i in range(MESSAGES):
+        history.append(_message(i))
+        if len(history) > capacity:
+            history.pop(0)
+    return (time.perf_counter() - start) / MESSAGES
+
+
+def bench_ring_buffer(capacity: int) -> float:
+    """RingBuffer 방식"""
+    history = RingBuffer(capacity, (_message(i) for i in range(capacity)))
+    start = time.perf_counter()
+    for i in range(MESSAGES):
+        history.append(_message(i))
+    return (time.perf_counter() - start) / MESSAGES
+
+
+def bench_manager(capacity: int) -> float:
+    """ConversationManager.add_message (파일 저장 제외)"""
+    with tempfile.TemporaryDirectory() as history_dir:
+        cm = ConversationManager(max_history=capacity, save_to_file=False, history_dir=history_dir)
+        for i in range(capacity):
+            cm.add_message("user", f"메시지 {i}")
+        start = time.perf_counter()
+        for i in range(MESSAGES):
+            cm.add_message("user", f"메시지 {i}")
+        return (time.perf_counter() - start) / MESSAGES
+
+
+def main():
+    print(f"메시지 {MESSAGES}개 추가 시 메시지당 평균 비용 (마이크로초)")
+    print(f"{'max_history':>12} {'list.pop(0)':>14} {'RingBuffer':>12} {'add_message':>12}")
+    for capacity in CAPACITIES:
+        list_cost = bench_list(capacity) * 1e6
+        ring_cost = bench_ring_buffer(capacity) * 1e6
+        manager_cost = bench_manager(capacity) * 1e6
+        print(f"{capacity:>12} {list_cost:>14.2f} {ring_cost:>12.2f} {manager_cost:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+지표 기록 오버헤드 벤치마크
+
+채팅 요청 하나가 기록하는 지표(HTTP 요청 시간, 규칙 매칭, 컨텍스트 생성, LLM 슬롯 대기와
+업스트림 시간, 저널/색인 저장)를 그대로 흉내 내어 요청당 기록 비용을 측정하고
+metrics.OVERHEAD_BUDGET_SECONDS와 비교합니다. 여러 스레드가 같은 지표에 동시에 기록할 때의
+비용과 /metrics 출력 시간도 측정합니다.
+
+실행: python benchmarks/bench_metrics.py [요청 수 (기본값: 20000)] [스레드 수 ...]
+"""
+
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from metrics import FAST_BUCKETS, OVERHEAD_BUDGET_SECONDS, Counter, Histogram, Registry, timed
+
+
+def build_request_metrics(registry: Registry) -> dict:
+    """채팅 요청 경로의 지표와 같은 모양(레이블, 버킷)의 지표"""
+    return {
+        "http": Histogram("http_seconds", "HTTP", ("endpoint", "method", "status"), registry=registry),
+        "rule": Histogram("rule_seconds", "규칙", ("result",), buckets=FAST_BUCKETS, registry=registry),
+        "context": Histogram("context_seconds", "컨텍스트", buckets=FAST_BUCKETS, registry=registry),
+        "queue": Histogram("queue_seconds", "슬롯 대기", registry=registry),
+        "upstream": Histogram("upstream_seconds", "LLM", ("operation", "outcome"), registry=registry),
+        "persist": Histogram("persist_seconds", "저장", ("kind",), registry=registry),
+        "requests": Counter("requests_total", "요청 수", ("source",), registry=registry),
+    }
+
+
+def record_request(metrics: dict) -> None:
+    """LLM까지 가는 채팅 요청 하나가 기록하는 지표 (측정 대상 작업은 비어 있음)"""
+    start = time.perf_counter()
+    metrics["rule"].labels("miss").observe(time.perf_counter() - start)
+    with metrics["context"].time():
+        pass
+    metrics["queue"].observe(time.perf_counter() - start)
+    with timed(metrics["upstream"], "completion"):
+        pass
+    metrics["requests"].labels("llm_api").inc()
+    with metrics["persist"].labels("journal").time():
+        pass
+    with metrics["persist"].labels("search_index").time():
+        pass
+    metrics["http"].labels("chat", "POST", 200).observe(time.perf_counter() - start)
+
+
+def bench_per_request(requests: int) -> float:
+    """요청 하나당 지표 기록 시간 (초)"""
+    metrics = build_request_metrics(Registry())
+    start = time.perf_counter()
+    for _ in range(requests):
+        record_request(metrics)
+    return (time.perf_counter() - start) / requests
+
+
+def bench_threads(requests: int, threads: int) -> float:
+    """여러 스레드가 동시에 기록할 때 요청 하나당 시간 (초, 전체 경과 시간 기준)"""
+    metrics = build_request_metrics(Registry())
+    per_thread = requests // threads
+
+    def worker():
+        for _ in range(per_thread):
+            record_request(metrics)
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return (time.perf_counter() - start) / (per_thread * threads)
+
+
+def bench_render(rounds: int = 50) -> float:
+    """레이블 조합이 많은 레지스트리의 /metrics 출력 시간 (초)"""
+    registry = Registry()
+    metrics = build_request_metrics(registry)
+    for index in range(30):
+        metrics["http"].labels(f"endpoint_{index}", "GET", 200).observe(0.01)
+    for _ in range(100):
+        record_request(metrics)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        registry.render()
+    return (time.perf_counter() - start) / rounds
+
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    thread_counts = [int(value) for value in sys.argv[2:]] or [1, 4, 16]
+
+    per_request = bench_per_request(requests)
+    status = "예산 안" if per_request <= OVERHEAD_BUDGET_SECONDS else "예산 초과"
+    print(f"요청당 지표 기록: {per_request * 1e6:.1f}µs "
+          f"(예산 {OVERHEAD_BUDGET_SECONDS * 1e6:.0f}µs, {status})")
+    for threads in thread_counts:
+        print(f"  스레드 {threads:>2}개: 요청당 {bench_threads(requests, threads) * 1e6:.1f}µs")
+    print(f"/metrics 출력: {bench_render() * 1000:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
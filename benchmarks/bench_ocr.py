@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+이미지 OCR 벤치마크
+
+휴대폰 사진 크기(3000x4000)의 합성 이미지에 글자를 그려, 기존 방식(원본 이미지를
+pytesseract.image_to_string에 한 번에 전달)과 OcrPipeline(해상도/색 정규화 후 띠로 나눠
+병렬 OCR)의 시간을 비교하고, 같은 이미지를 다시 처리할 때의 캐시 적중 시간도 측정합니다.
+
+실행: python benchmarks/bench_ocr.py [언어 (기본값: eng)] [동시 OCR 수 ...]
+tesseract 실행 파일이 필요합니다.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image, ImageDraw, ImageFont
+
+WORDS = ["invoice", "total", "amount", "delivery", "receipt", "customer", "order", "payment"]
+
+
+def write_synthetic_photo(path: str, width: int = 3000, height: int = 4000, lines: int = 40) -> None:
+    """밝기가 고르지 않은 배경에 글자 줄이 있는 사진 크기의 이미지 생성"""
+    image = Image.linear_gradient("L").resize((width, height)).point(lambda value: 170 + value // 4)
+    image = Image.merge("RGB", (image, image, image.point(lambda value: value - 10)))
+    draw = ImageDraw.Draw(image)
+    try:
+        font = ImageFont.load_default(size=64)
+    except TypeError:
+        font = ImageFont.load_default()
+    for line in range(lines):
+        text = " ".join(WORDS[(line + word) % len(WORDS)] for word in range(6)) + f" {line * 37}"
+        draw.text((150, 150 + line * (height - 300) // lines), text, fill=(30, 30, 40), font=font)
+    image.save(path, quality=90)
+
+
+def bench_single_call(path: str, lang: str) -> float:
+    """기존 방식: 원본 이미지를 한 번에 OCR"""
+    import pytesseract
+
+    start = time.perf_counter()
+    pytesseract.image_to_string(Image.open(path), lang=lang)
+    return time.perf_counter() - start
+
+
+def bench_pipeline(path: str, lang: str, workers: int):
+    """OcrPipeline (처음 처리 시간, 캐시 적중 시간)"""
+    from ocr_pipeline import OcrPipeline
+
+    pipeline = OcrPipeline(lang=lang, max_workers=workers)
+    try:
+        start = time.perf_counter()
+        pipeline.extract_text(path)
+        first = time.perf_counter() - start
+        start = time.perf_counter()
+        pipeline.extract_text(path)
+        return first, time.perf_counter() - start
+    finally:
+        pipeline.shutdown()
+
+
+def main() -> None:
+    if shutil.which("tesseract") is None:
+        print("tesseract 실행 파일이 없어 벤치마크를 실행할 수 없습니다.")
+        return
+
+    lang = sys.argv[1] if len(sys.argv) > 1 else "eng"
+    cores = os.cpu_count() or 1
+    worker_counts = [int(arg) for arg in sys.argv[2:]] or sorted({1, cores})
+    print(f"CPU 코어 수: {cores}, 언어: {lang}")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "photo.jpg")
+        write_synthetic_photo(path)
+        print(f"single call: {bench_single_call(path, lang):.2f}s")
+        for workers in worker_counts:
+            first, cached = bench_pipeline(path, lang, workers)
+            print(f"pipeline {workers} workers: {first:.2f}s (cached {cached * 1000:.1f}ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+PDF 텍스트 추출 벤치마크
+
+수백 페이지짜리 합성 PDF를 만들어, 기존 방식(요청 스레드에서 한 페이지씩 추출하며
+content += ...)과 ParallelPdfExtractor의 작업 프로세스 수별 시간을 비교합니다.
+작업 프로세스 수가 코어 수까지 늘어날수록 시간이 거의 비례해서 줄어야 합니다.
+
+실행: python benchmarks/bench_pdf_extraction.py [작업 프로세스 수 ...]
+      (기본값: 1, 2, 4, 코어 수 중 코어 수 이하)
+
+코어가 하나뿐인 환경에서는 작업마다 파일을 다시 읽는 비용만큼 병렬 추출이 느려지므로,
+ParallelPdfExtractor의 기본 작업 프로세스 수(코어 수)로는 현재 스레드에서 추출합니다.
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PAGE_COUNTS = [100, 300, 600]
+LINES_PER_PAGE = 60
+
+
+def write_synthetic_pdf(path: str, pages: int, lines_per_page: int = LINES_PER_PAGE) -> None:
+    """텍스트가 채워진 여러 페이지짜리 PDF 파일 생성 (외부 라이브러리 없이 직접 작성)"""
+    # 객체 번호: 1 카탈로그, 2 페이지 트리, 3 글꼴, 이후 페이지마다 (내용 스트림, 페이지)
+    objects = [b"", b"", b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for page in range(pages):
+        lines = [f"Page {page + 1} line {line + 1}: the quick brown fox jumps over the lazy dog {page * line}"
+                 for line in range(lines_per_page)]
+        text = " T* ".join(f"({line}) Tj" for line in lines)
+        stream = f"BT /F1 9 Tf 11 TL 40 760 Td {text} ET".encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        content_number = len(objects)
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_number)
+        kids.append(b"%d 0 R" % len(objects))
+    objects[0] = b"<< /Type /Catalog /Pages 2 0 R >>"
+    objects[1] = b"<< /Type /Pages /Kids [" + b" ".join(kids) + b"] /Count %d >>" % pages
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(output))
+        output += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref_offset = len(output)
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    output += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    output += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_offset)
+
+    with open(path, "wb") as f:
+        f.write(output)
+
+
+def bench_sequential(path: str) -> float:
+    """기존 방식: 한 페이지씩 추출하며 문자열 이어 붙이기"""
+    import PyPDF2
+
+    start = time.perf_counter()
+    content = ""
+    with open(path, "rb") as file:
+        reader = PyPDF2.PdfReader(file)
+        for page_num in range(len(reader.pages)):
+            content += f"\n--- 페이지 {page_num + 1} ---\n"
+            content += reader.pages[page_num].extract_text()
+    return time.perf_counter() - start
+
+
+def bench_parallel(path: str, workers: int) -> float:
+    """ParallelPdfExtractor (프로세스 풀 준비 시간 제외)"""
+    from pdf_extractor import ParallelPdfExtractor
+
+    extractor = ParallelPdfExtractor(max_workers=workers)
+    try:
+        if workers > 1:
+            # 작업 프로세스 시작 비용은 요청 간에 재사용되므로 측정에서 제외
+            list(extractor._get_executor().map(abs, range(workers * 2)))
+        start = time.perf_counter()
+        result = extractor.extract_text(path)
+        elapsed = time.perf_counter() - start
+        assert result["extracted_pages"] == result["total_pages"]
+        return elapsed
+    finally:
+        extractor.shutdown()
+
+
+def main() -> None:
+    cores = os.cpu_count() or 1
+    worker_counts = [int(arg) for arg in sys.argv[1:]] or sorted({1, 2, 4, cores} - {w for w in (2, 4) if w > cores})
+    print(f"CPU 코어 수: {cores}")
+    header = f"{'pages':>6} {'sequential':>12}" + "".join(f" {f'{w} workers':>12}" for w in worker_counts)
+    print(header)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for pages in PAGE_COUNTS:
+            path = os.path.join(tmp_dir, f"synthetic_{pages}.pdf")
+            write_synthetic_pdf(path, pages)
+            sequential = bench_sequential(path)
+            row = f"{pages:>6} {sequential:>11.2f}s"
+            for workers in worker_counts:
+                elapsed = bench_parallel(path, workers)
+                row += f" {elapsed:>6.2f}s x{sequential / elapsed:>3.1f}"
+            print(row)
+
+
+if __name__ == "__main__":
+    main()
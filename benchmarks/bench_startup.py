@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+시작 시간 벤치마크
+
+새 프로세스에서 모듈을 불러오는 시간과, 웹 앱을 불러온 직후 첫 요청(규칙 응답 채팅,
+텍스트 파일 업로드)의 지연 시간을 측정하고 그때까지 불러온 무거운 라이브러리를 표시합니다.
+각 측정은 빈 임시 디렉토리에서 실행하므로 대화 기록/업로드 디렉토리가 없는 첫 시작과 같습니다.
+측정값이 STARTUP_BUDGETS를 넘으면 종료 코드 1로 끝나므로 CI에서 회귀 확인에 쓸 수 있습니다.
+
+실행: python benchmarks/bench_startup.py [반복 횟수 (기본값: 5)]
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 시작할 때 불러오지 않아야 하는(처음 사용할 때 불러오는) 라이브러리
+HEAVY_MODULES = ("openai", "httpx", "httpx2", "PyPDF2", "docx", "openpyxl", "PIL", "pytesseract", "cProfile")
+
+# 측정 항목별 허용 시간 (초). 지연 로딩 전에는 web_app 불러오기가 약 1.5초였음
+STARTUP_BUDGETS = {
+    "import main": 0.5,
+    "import web_app": 0.8,
+    "first chat": 0.1,
+    "first upload": 0.2,
+}
+
+_IMPORT_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "modules": sorted(set(sys.modules) & set({heavy!r}))}}))
+"""
+
+_FIRST_REQUEST_PROBE = """
+import io, json, sys, time
+import web_app
+client = web_app.app.test_client()
+result = {{}}
+for name, request in (
+        ("first chat", lambda: client.post("/api/chat", json={{"message": "안녕", "session_id": "startup"}})),
+        ("second chat", lambda: client.post("/api/chat", json={{"message": "안녕", "session_id": "startup"}})),
+        ("first upload", lambda: client.post("/api/upload-file", data={{
+            "file": (io.BytesIO("시작 시간 측정용 문서".encode("utf-8")), "startup.txt"),
+            "session_id": "startup"}}))):
+    start = time.perf_counter()
+    response = request()
+    result[name] = time.perf_counter() - start
+    assert response.status_code in (200, 202), response.status_code
+web_app.analysis_jobs.shutdown()
+result["modules"] = sorted(set(sys.modules) & set({heavy!r}))
+print(json.dumps(result))
+"""
+
+
+def run_probe(code: str) -> dict:
+    """빈 임시 디렉토리를 작업 디렉토리로 한 새 프로세스에서 코드를 실행하고 마지막 줄의 JSON 반환"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        env = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""))
+        output = subprocess.run([sys.executable, "-c", code], cwd=tmp_dir, env=env,
+                                capture_output=True, text=True, check=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        result["created"] = sorted(os.listdir(tmp_dir))
+        return result
+
+
+def probe_import(module: str) -> dict:
+    """새 프로세스에서 모듈 하나를 불러오는 시간과 불러온 무거운 라이브러리"""
+    return run_probe(_IMPORT_PROBE.format(module=module, heavy=HEAVY_MODULES))
+
+
+def probe_first_requests() -> dict:
+    """새 프로세스에서 web_app을 불러온 뒤 첫 요청들의 지연 시간과 불러온 무거운 라이브러리"""
+    return run_probe(_FIRST_REQUEST_PROBE.format(heavy=HEAVY_MODULES))
+
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    results = {}
+
+    for module in ("main", "llm_api", "file_analyzer", "web_app"):
+        probes = [probe_import(module) for _ in range(rounds)]
+        seconds = statistics.median(probe["seconds"] for probe in probes)
+        results[f"import {module}"] = seconds
+        print(f"import {module:<14} {seconds * 1000:8.1f}ms  "
+              f"불러온 라이브러리: {', '.join(probes[-1]['modules']) or '없음'}  "
+              f"생성한 디렉토리: {', '.join(probes[-1]['created']) or '없음'}")
+
+    probes = [probe_first_requests() for _ in range(rounds)]
+    for name in ("first chat", "second chat", "first upload"):
+        results[name] = statistics.median(probe[name] for probe in probes)
+        print(f"{name:<21} {results[name] * 1000:8.1f}ms")
+    print(f"첫 요청 후 불러온 라이브러리: {', '.join(probes[-1]['modules']) or '없음'}")
+
+    exceeded = [name for name, budget in STARTUP_BUDGETS.items() if results[name] > budget]
+    for name in exceeded:
+        print(f"예산 초과: {name} {results[name] * 1000:.1f}ms > {STARTUP_BUDGETS[name] * 1000:.0f}ms")
+    sys.exit(1 if exceeded else 0)
+
+
+if __name__ == "__main__":
+    main()
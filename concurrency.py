@@ -0,0 +1,206 @@
+import asyncio
+import concurrent.futures
+import threading
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+
+class ConcurrencyLimitTimeout(Exception):
+    """동시 실행 슬롯을 기다리다 제한 시간을 넘긴 경우"""
+
+
+class ConcurrencyLimiter:
+    """
+    asyncio용 전역 + 세션별 동시 실행 제한기
+
+    슬롯이 없으면 대기열에서 기다리고, queue_timeout 안에 슬롯을 얻지 못하면
+    ConcurrencyLimitTimeout을 발생시킵니다. 세션별 제한을 먼저 얻은 뒤 전역 제한을 얻으므로
+    한 세션의 요청이 몰려도 전역 슬롯을 독차지하지 않습니다.
+    """
+
+    def __init__(self, max_concurrent: int = 100, max_per_session: Optional[int] = None,
+                 queue_timeout: Optional[float] = None):
+        """
+        Args:
+            max_concurrent: 전체 동시 실행 수
+            max_per_session: 세션 하나의 동시 실행 수 (None이면 제한 없음)
+            queue_timeout: 슬롯을 기다리는 최대 시간 (초, None이면 무제한)
+        """
+        self.max_concurrent = max_concurrent
+        self.max_per_session = max_per_session
+        self.queue_timeout = queue_timeout
+
+        self._global = asyncio.Semaphore(max_concurrent)
+        # 세션 키 -> [세마포어, 사용 중이거나 기다리는 요청 수]
+        self._sessions: Dict[str, list] = {}
+
+        self.in_flight = 0
+        self.queued = 0
+        self.timeouts = 0
+
+    @asynccontextmanager
+    async def acquire(self, session_key: Optional[str] = None):
+        """동시 실행 슬롯을 얻어 블록 안에서 사용"""
+        session_entry = None
+        if self.max_per_session and session_key is not None:
+            session_entry = self._sessions.setdefault(
+                session_key, [asyncio.Semaphore(self.max_per_session), 0])
+            session_entry[1] += 1
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.queue_timeout if self.queue_timeout is not None else None
+        acquired = []
+        self.queued += 1
+        try:
+            try:
+                for semaphore in ([session_entry[0]] if session_entry else []) + [self._global]:
+                    timeout = None if deadline is None else max(deadline - loop.time(), 0)
+                    await asyncio.wait_for(semaphore.acquire(), timeout)
+                    acquired.append(semaphore)
+            except asyncio.TimeoutError:
+                self.timeouts += 1
+                raise ConcurrencyLimitTimeout(
+                    f"동시 요청 대기 시간({self.queue_timeout}초)을 초과했습니다.") from None
+            finally:
+                self.queued -= 1
+
+            self.in_flight += 1
+            try:
+                yield
+            finally:
+                self.in_flight -= 1
+        finally:
+            for semaphore in reversed(acquired):
+                semaphore.release()
+            if session_entry is not None:
+                session_entry[1] -= 1
+                if session_entry[1] == 0:
+                    self._sessions.pop(session_key, None)
+
+    @contextmanager
+    def acquire_sync(self, event_loop: "BackgroundEventLoop", session_key: Optional[str] = None):
+        """
+        동기 코드(스레드)에서 슬롯을 얻어 블록 안에서 사용
+
+        슬롯은 event_loop에서 acquire()로 얻고 블록이 끝날 때까지 잡아 두므로,
+        동기 클라이언트로 처리하는 요청도 비동기 요청과 같은 제한을 받습니다.
+        제한기는 하나의 이벤트 루프에서만 사용해야 하므로 비동기 호출과 같은 루프를 넘겨야 합니다.
+        """
+        acquired = concurrent.futures.Future()
+        release = asyncio.Event()
+
+        async def hold():
+            try:
+                async with self.acquire(session_key):
+                    acquired.set_result(None)
+                    await release.wait()
+            except BaseException as e:
+                if not acquired.done():
+                    acquired.set_exception(e)
+                raise
+
+        holder = event_loop.submit(hold())
+        try:
+            acquired.result()
+        except BaseException:
+            holder.cancel()
+            raise
+        try:
+            yield
+        finally:
+            event_loop.loop.call_soon_threadsafe(release.set)
+
+    def stats(self) -> Dict:
+        """현재 실행/대기 중인 요청 수와 대기 시간 초과 횟수"""
+        return {
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "timeouts": self.timeouts,
+            "max_concurrent": self.max_concurrent,
+            "max_per_session": self.max_per_session
+        }
+
+
+class BackgroundEventLoop:
+    """
+    별도 스레드에서 계속 실행되는 asyncio 이벤트 루프
+
+    Flask 요청 스레드나 CLI 같은 동기 코드에서 코루틴을 제출하면, 모든 네트워크 대기가
+    하나의 루프와 연결 풀에서 함께 처리됩니다.
+    """
+
+    def __init__(self, name: str = "background-event-loop"):
+        self.name = name
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """이벤트 루프 반환 (처음 사용할 때 스레드 시작)"""
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, name=self.name, daemon=True)
+                self._thread.start()
+            return self._loop
+
+    def submit(self, coroutine):
+        """코루틴을 루프에 제출하고 concurrent.futures.Future 반환"""
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+
+    def run(self, coroutine, timeout: Optional[float] = None):
+        """코루틴을 루프에서 실행하고 결과를 기다려 반환"""
+        return self.submit(coroutine).result(timeout)
+
+    def stop(self) -> None:
+        """루프와 스레드 종료"""
+        with self._lock:
+            if self._loop is None:
+                return
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+            self._loop = None
+            self._thread = None
+
+
+class SingleFlight:
+    """
+    같은 키의 동시 비동기 호출을 하나로 합치는 도구 (single-flight)
+
+    진행 중인 호출이 있는 키로 요청이 오면 새로 호출하지 않고 그 결과(또는 예외)를 함께 받습니다.
+    호출은 별도 태스크로 실행되므로 먼저 요청한 쪽이 취소되어도 기다리는 다른 호출자에게는
+    결과가 전달됩니다. 같은 이벤트 루프 안에서만 사용해야 합니다.
+    """
+
+    def __init__(self):
+        self._flights: Dict[str, asyncio.Future] = {}
+        self.leaders = 0
+        self.followers = 0
+
+    async def do(self, key: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Args:
+            key: 합칠 호출을 구분하는 키
+            factory: 진행 중인 호출이 없을 때 실제 호출 코루틴을 만드는 함수
+        """
+        flight = self._flights.get(key)
+        if flight is not None:
+            self.followers += 1
+        else:
+            self.leaders += 1
+            flight = asyncio.ensure_future(factory())
+            self._flights[key] = flight
+            flight.add_done_callback(lambda _: self._flights.pop(key, None))
+        return await asyncio.shield(flight)
+
+    def stats(self) -> Dict:
+        """실제 호출 수, 합쳐진 호출 수와 합쳐진 비율"""
+        calls = self.leaders + self.followers
+        return {
+            "in_flight": len(self._flights),
+            "upstream_calls": self.leaders,
+            "coalesced_calls": self.followers,
+            "coalesce_rate": self.followers / calls if calls else 0
+        }
@@ -1 +1,71 @@
 OPENAI_API_KEY = "sk-..."
+
+# 사용할 LLM 모델 (또는 gpt-4)
+LLM_MODEL = "gpt-3.5-turbo"
+
+# LLM 응답 캐시 설정
+LLM_CACHE_ENABLED = True
+LLM_CACHE_TTL = 60 * 60  # 초
+LLM_CACHE_MAX_ENTRIES = 1000
+LLM_CACHE_DISK_PATH = "conversation_history/llm_cache.db"  # None이면 메모리 캐시만 사용
+LLM_CACHE_MAX_DISK_ENTRIES = 10000
+LLM_CACHE_CONTEXT_TURNS = True  # 이전 대화가 컨텍스트로 붙는 질문도 캐시할지 여부
+
+# LLM 호출 동시성 및 연결 설정 (비동기 호출 경로)
+LLM_MAX_CONCURRENT_REQUESTS = 200  # 프로세스 전체 동시 요청 수
+LLM_MAX_CONCURRENT_PER_SESSION = 1  # 세션 하나의 동시 요청 수
+LLM_QUEUE_TIMEOUT = 30  # 동시 요청 슬롯을 기다리는 최대 시간 (초)
+LLM_REQUEST_TIMEOUT = 60  # 재시도를 포함한 요청 하나의 전체 제한 시간 (초)
+LLM_MAX_CONNECTIONS = 100  # HTTP 연결 풀 크기
+
+# LLM 호출 재시도 및 헤지 요청 설정
+LLM_ATTEMPT_TIMEOUT = 20  # 시도 하나의 제한 시간 (초)
+LLM_MAX_ATTEMPTS = 3  # 재시도를 포함한 최대 시도 횟수
+LLM_RETRY_BASE_DELAY = 0.5  # 첫 재시도 전 최대 대기 시간 (초, 재시도마다 두 배)
+LLM_RETRY_MAX_DELAY = 8  # 재시도 전 대기 시간 상한 (초)
+LLM_HEDGE_PERCENTILE = None  # 예: 95이면 p95 지연 시간까지 응답이 없을 때 같은 요청을 하나 더 보냄 (None이면 사용 안 함)
+LLM_HEDGE_MIN_SAMPLES = 20  # 헤지 기준을 계산하기 위한 최소 표본 수
+LLM_BASE_URL = None  # OpenAI 호환 서버 주소 (None이면 기본 API)
+
+# 대화 기록 저장소 설정
+CONVERSATION_STORE = "json"  # "json" (세션별 JSON 파일) 또는 "sqlite" (기존 기록은 python conversation_store.py로 가져옴)
+CONVERSATION_DB_PATH = "conversation_history/conversations.db"  # sqlite 저장소 파일 경로
+
+# 긴 대화의 컨텍스트 압축 설정 (오래된 대화를 누적 요약으로 합침)
+CONTEXT_COMPACTION_ENABLED = True
+CONTEXT_RECENT_TOKENS = 600  # 요약하지 않고 그대로 보내는 최근 대화의 토큰 수
+CONTEXT_SUMMARY_MAX_TOKENS = 300  # 누적 요약의 최대 토큰 수
+CONTEXT_SUMMARY_BATCH_TOKENS = 300  # 최근 구간 밖으로 밀려난 대화가 이만큼 쌓이면 한 번에 요약
+CONTEXT_SUMMARY_MAX_BATCH_TOKENS = 2400  # 요약 한 번에 합칠 대화의 최대 토큰 수
+
+# 파일 분석 설정
+PDF_MAX_PAGES = 1000  # PDF에서 추출할 최대 페이지 수
+PDF_TIME_BUDGET = 30  # PDF 추출에 쓸 최대 시간 (초). 넘으면 추출한 페이지까지만 사용
+PDF_MAX_WORKERS = None  # PDF 추출 작업 프로세스 수 (None이면 CPU 코어 수)
+EXCEL_MAX_ROWS = 10000  # Excel 시트마다 추출할 최대 행 수
+EXCEL_MAX_COLUMNS = 100  # Excel 행마다 추출할 최대 열 수
+EXCEL_MAX_BYTES = 2 * 1024 * 1024  # Excel 시트마다 추출할 최대 텍스트 크기 (바이트)
+OCR_LANG = "kor+eng"  # OCR 언어
+OCR_MAX_SIDE = 2000  # OCR 전 이미지 긴 변의 최대 길이 (픽셀). 큰 사진은 줄여서 처리
+OCR_MAX_WORKERS = None  # 동시에 실행할 OCR 수 (None이면 CPU 코어 수)
+OCR_MAX_FRAMES = 20  # GIF 등 여러 프레임 이미지에서 OCR할 최대 프레임 수
+OCR_CACHE_DISK_PATH = "conversation_history/ocr_cache.db"  # OCR 결과 캐시 (None이면 메모리 캐시만 사용)
+UPLOAD_CACHE_MAX_BYTES = 1024 * 1024 * 1024  # 업로드 파일과 분석 결과를 합쳐 보관할 최대 크기 (바이트)
+UPLOAD_MAX_AGE_HOURS = 24  # 마지막 사용 후 업로드 파일과 분석 결과를 보관할 시간
+DOCUMENT_INDEX_PATH = "conversation_history/document_index.db"  # 업로드 문서 조각 검색 색인
+DOCUMENT_CHUNK_TOKENS = 300  # 문서 조각 하나의 최대 토큰 수
+DOCUMENT_CHUNK_OVERLAP_TOKENS = 50  # 이웃한 문서 조각끼리 겹치는 최대 토큰 수
+DOCUMENT_TOP_K = 5  # '파일 분석' 질문마다 LLM에 보낼 최대 문서 조각 수
+DOCUMENT_CONTEXT_TOKENS = 1500  # '파일 분석' 질문마다 LLM에 보낼 문서 조각의 최대 토큰 수
+DOCUMENT_MAX_PER_SESSION = 20  # 세션마다 색인해 둘 최대 문서 수
+ANALYSIS_MAX_WORKERS = 2  # 동시에 실행할 파일 분석 작업 수
+ANALYSIS_MAX_PENDING = 16  # 실행을 기다릴 수 있는 최대 분석 작업 수 (넘으면 503 응답)
+ANALYSIS_TIME_LIMIT = 120  # 분석 작업 하나의 제한 시간 (초)
+ANALYSIS_MEMORY_LIMIT_MB = 1024  # 분석 작업 프로세스의 메모리 제한 (MB)
+
+# 요청 추적 설정 (느린 요청의 구간 트리와 선택적 cProfile 결과를 로그 디렉토리에 기록)
+TRACE_ENABLED = True
+TRACE_SLOW_THRESHOLD = 2.0  # 이 시간(초) 이상 걸린 요청의 구간 트리를 기록
+TRACE_PROFILE_SAMPLE_RATE = 0.0  # cProfile로 측정할 요청 비율 (0~1, 0이면 측정하지 않음)
+TRACE_LOG_DIR = "logs/slow_requests"  # 느린 요청 기록 디렉토리
+TRACE_MAX_LOG_FILES = 200  # 보관할 최대 느린 요청 기록 수
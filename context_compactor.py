@@ -0,0 +1,80 @@
+import atexit
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Set
+
+# (이전 요약, 요약에 새로 합칠 메시지 목록) -> 새 요약
+SummarizeFunc = Callable[[str, List[Dict]], str]
+
+
+class ContextCompactor:
+    """
+    오래된 대화를 누적 요약으로 합치는 백그라운드 작업기
+
+    ConversationManager는 최근 메시지 구간 밖으로 밀려난 메시지가 생기면 schedule()로
+    요약 갱신을 요청만 하고, 요약 함수(보통 LLM 호출)는 요청 스레드가 아닌 작업 스레드에서
+    실행됩니다. 같은 세션의 요청은 진행 중인 작업이 끝날 때까지 하나로 합쳐집니다.
+    """
+
+    def __init__(self, summarize: SummarizeFunc, max_workers: int = 2):
+        """
+        Args:
+            summarize: 이전 요약과 새로 합칠 메시지들로 새 요약을 만드는 함수
+            max_workers: 동시에 요약을 만드는 작업 스레드 수
+        """
+        self.summarize = summarize
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="context-compactor")
+        # 진행 중이거나 대기 중인 세션 관리자, 진행 중에 다시 요청된 세션 관리자
+        self._scheduled: Set[object] = set()
+        self._rerun: Set[object] = set()
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+
+        self.runs = 0
+        self.errors = 0
+        atexit.register(self.shutdown)
+
+    def schedule(self, manager) -> None:
+        """세션 관리자의 요약 갱신 예약"""
+        with self._lock:
+            if manager in self._scheduled:
+                self._rerun.add(manager)
+                return
+            self._scheduled.add(manager)
+        self._executor.submit(self._run, manager)
+
+    def _run(self, manager) -> None:
+        """요약 갱신 실행 (작업 스레드). 실행 중 다시 요청되었으면 한 번 더 실행"""
+        while True:
+            failed = False
+            try:
+                manager.refresh_context_summary(self.summarize)
+            except Exception as e:
+                failed = True
+                print(f"대화 요약 중 오류 발생: {e}")
+
+            with self._lock:
+                if failed:
+                    self.errors += 1
+                else:
+                    self.runs += 1
+                if manager not in self._rerun:
+                    self._scheduled.discard(manager)
+                    if not self._scheduled:
+                        self._idle.notify_all()
+                    return
+                self._rerun.discard(manager)
+
+    def wait_idle(self, timeout: float = None) -> bool:
+        """예약된 요약 작업이 모두 끝날 때까지 대기 (테스트/종료용)"""
+        with self._idle:
+            return self._idle.wait_for(lambda: not self._scheduled, timeout)
+
+    def stats(self) -> Dict:
+        """요약 실행/오류 횟수와 진행 중인 세션 수"""
+        with self._lock:
+            return {"runs": self.runs, "errors": self.errors, "in_progress": len(self._scheduled)}
+
+    def shutdown(self) -> None:
+        """작업 스레드 종료 (진행 중인 요약은 끝까지 실행)"""
+        self._executor.shutdown(wait=True)
@@ -1,26 +1,195 @@
-import json
-import os
+import threading
+import time
+from bisect import bisect_left
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
+from conversation_store import ConversationStore, JsonFileStore
+from persistence_writer import WriteBehindWriter, get_default_writer
+from ring_buffer import RingBuffer
+from tokenizer import Tokenizer, KoreanApproxTokenizer
+from search_index import SearchIndex
+from session_catalog import SessionCatalog
+from context_compactor import ContextCompactor
+from metrics import FAST_BUCKETS, Histogram
+from tracing import span
+
+CONTEXT_BUILD_SECONDS = Histogram("chatbot_context_build_seconds", "LLM 컨텍스트 생성 시간",
+                                  buckets=FAST_BUCKETS)
+PERSISTENCE_WRITE_SECONDS = Histogram("chatbot_persistence_write_seconds",
+                                      "대화 기록 저장 시간 (저널 추가, 검색 색인, 스냅샷)", ("kind",))
+_JOURNAL_WRITE = PERSISTENCE_WRITE_SECONDS.labels("journal")
+_INDEX_WRITE = PERSISTENCE_WRITE_SECONDS.labels("search_index")
+_SNAPSHOT_WRITE = PERSISTENCE_WRITE_SECONDS.labels("snapshot")
+
+class ConversationStats:
+    """
+    대화 요약용 누적 통계
+    
+    메시지가 추가되거나 max_history로 밀려날 때마다 갱신되므로
+    요약을 만들 때 히스토리 전체를 다시 훑을 필요가 없습니다.
+    """
+    
+    def __init__(self):
+        self.reset()
+    
+    def reset(self) -> None:
+        """통계 초기화"""
+        self.role_counts: Dict[str, int] = {}
+        self.response_time_sum = 0.0
+        self.response_time_count = 0
+        self.content_length = 0
+        # 출처별 메시지 수와 봇 응답 시간 합계/개수
+        self.source_stats: Dict[str, Dict[str, float]] = {}
+    
+    def add(self, message: Dict) -> None:
+        """메시지를 통계에 반영"""
+        self._update(message, 1)
+    
+    def remove(self, message: Dict) -> None:
+        """밀려난 메시지를 통계에서 제외"""
+        self._update(message, -1)
+    
+    def _update(self, message: Dict, sign: int) -> None:
+        role = message["role"]
+        self.role_counts[role] = self.role_counts.get(role, 0) + sign
+        self.content_length += sign * len(message["content"])
+        
+        source = message.get("source") or "unknown"
+        stats = self.source_stats.setdefault(
+            source, {"messages": 0, "response_time_sum": 0.0, "response_time_count": 0})
+        stats["messages"] += sign
+        
+        response_time = message.get("response_time")
+        if role == "assistant" and response_time:
+            self.response_time_sum += sign * response_time
+            self.response_time_count += sign
+            stats["response_time_sum"] += sign * response_time
+            stats["response_time_count"] += sign
+        
+        if stats["messages"] <= 0:
+            del self.source_stats[source]
+    
+    def avg_response_time(self) -> float:
+        """봇 메시지 평균 응답 시간"""
+        if not self.response_time_count:
+            return 0
+        return self.response_time_sum / self.response_time_count
+    
+    def by_source(self) -> Dict[str, Dict]:
+        """출처별 메시지 수와 평균 응답 시간"""
+        return {
+            source: {
+                "messages": stats["messages"],
+                "avg_response_time": (stats["response_time_sum"] / stats["response_time_count"]
+                                      if stats["response_time_count"] else 0)
+            }
+            for source, stats in self.source_stats.items()
+        }
 
 class ConversationManager:
-    def __init__(self, max_history: int = 50, save_to_file: bool = True):
+    def __init__(self, max_history: int = 50, save_to_file: bool = True,
+                 history_dir: str = "conversation_history",
+                 compact_every: Optional[int] = None, fsync: bool = False,
+                 write_behind: bool = False, writer: Optional[WriteBehindWriter] = None,
+                 tokenizer: Optional[Tokenizer] = None,
+                 search_index: Optional[SearchIndex] = None,
+                 catalog: Optional[SessionCatalog] = None,
+                 session_id: Optional[str] = None,
+                 compactor: Optional[ContextCompactor] = None,
+                 context_recent_tokens: int = 600,
+                 context_summary_batch_tokens: Optional[int] = None,
+                 context_summary_max_batch_tokens: Optional[int] = None,
+                 summary_retry_delay: float = 5.0,
+                 summary_max_retry_delay: float = 300.0,
+                 store: Optional[ConversationStore] = None):
         """
         대화 히스토리를 관리하는 클래스
         
+        메시지는 저장소에 모아서 추가 기록되고, 일정 개수가 쌓이면 스냅샷으로
+        압축(compaction)됩니다. 따라서 메시지당 저장 비용은 히스토리 길이와 무관합니다.
+        기본 저장소는 세션별 저널 파일(conversation_<session_id>.jsonl)과
+        스냅샷 파일(conversation_<session_id>.json)을 쓰는 JsonFileStore입니다.
+        
+        write_behind를 켜면 파일 쓰기는 백그라운드 작성기가 모아서 수행하므로
+        add_message는 디스크 I/O를 기다리지 않습니다. 종료 전에는 flush()를 호출하세요.
+        
+        compactor를 주면 최근 context_recent_tokens 밖으로 밀려난 메시지는 백그라운드에서
+        누적 요약으로 합쳐지고, LLM 컨텍스트는 요약 메시지 + 최근 메시지로 구성됩니다.
+        요약은 밀려난 메시지가 context_summary_batch_tokens만큼 쌓였을 때 한 번에 합치며,
+        요약이 실패하면 지수 백오프로 다음 시도를 미룹니다.
+        
         Args:
             max_history: 저장할 최대 대화 개수
-            save_to_file: 파일에 저장할지 여부
+            save_to_file: 저장소에 저장할지 여부
+            history_dir: 대화 기록 저장 디렉토리 (store를 주지 않았을 때 사용)
+            compact_every: 저널을 스냅샷으로 압축할 메시지 개수 (기본값: max_history)
+            fsync: 저널 기록마다 fsync를 호출할지 여부 (store를 주지 않았을 때 사용)
+            write_behind: 백그라운드 작성기로 저장을 미룰지 여부
+            writer: 사용할 작성기 (기본값: 프로세스 공용 작성기)
+            tokenizer: 메시지 토큰 수 계산기 (기본값: 한국어 근사 토큰 계산기)
+            search_index: 저장되는 메시지를 색인할 세션 간 검색 색인 (선택사항)
+            catalog: 저장할 때마다 세션 정보를 기록할 세션 목록 (선택사항)
+            session_id: 사용할 세션 ID (기본값: 현재 시각으로 생성)
+            compactor: 오래된 대화를 누적 요약으로 합치는 작업기 (선택사항)
+            context_recent_tokens: 요약하지 않고 그대로 유지할 최근 메시지의 토큰 수
+            context_summary_batch_tokens: 요약을 예약할, 밀려난 메시지의 최소 토큰 수
+                (기본값: context_recent_tokens의 절반)
+            context_summary_max_batch_tokens: 요약 한 번에 합칠 메시지의 최대 토큰 수
+                (기본값: context_recent_tokens의 4배)
+            summary_retry_delay: 요약 실패 후 다시 시도하기까지의 첫 대기 시간 (초, 실패할 때마다 두 배)
+            summary_max_retry_delay: 요약 재시도 대기 시간의 상한 (초)
+            store: 대화 기록 저장소 (기본값: history_dir의 JsonFileStore)
         """
         self.max_history = max_history
         self.save_to_file = save_to_file
-        self.conversation_history: List[Dict] = []
-        self.session_id = self._generate_session_id()
+        self.compact_every = compact_every or max_history
+        # 최대 개수를 넘으면 가장 오래된 메시지가 O(1)로 밀려나는 원형 버퍼
+        self.conversation_history = RingBuffer(max_history)
+        
+        # 토큰 누적합: 각 메시지 이전까지의 누적 토큰 수 (히스토리와 같은 위치에 보관)
+        self.tokenizer = tokenizer or KoreanApproxTokenizer()
+        self._token_offsets = RingBuffer(max_history)
+        self._total_tokens = 0
+        
+        # 요약 통계 (add_message와 밀려나는 메시지에 맞춰 갱신)
+        self._stats = ConversationStats()
+        
+        self.session_id = session_id or self._generate_session_id()
+        
+        # 저널 상태: 마지막 메시지 순번과 마지막 압축 이후 저널에 쌓인 메시지 수
+        self._seq = 0
+        self._journal_entries = 0
         
-        # 저장 디렉토리 생성
-        self.history_dir = "conversation_history"
-        if not os.path.exists(self.history_dir):
-            os.makedirs(self.history_dir)
+        # 아직 저널에 기록되지 않은 (순번, 메시지) 목록
+        self._pending: List[Tuple[int, Dict]] = []
+        self._lock = threading.RLock()
+        self._flush_lock = threading.RLock()
+        
+        self.write_behind = write_behind
+        self.writer = (writer or get_default_writer()) if write_behind else None
+        self.search_index = search_index
+        self.catalog = catalog
+        
+        # 누적 요약: 요약 내용, 요약에 합쳐진 마지막 메시지 순번, 요약되기 전에 히스토리에서 밀려난
+        # (순번, 메시지) 목록. 초기화나 세션 로드 시 세대를 올려 진행 중이던 요약 결과를 버림
+        self.compactor = compactor
+        self.context_recent_tokens = context_recent_tokens
+        self._context_summary = ""
+        self._context_summary_tokens = 0
+        self._summarized_seq = 0
+        self._unsummarized_evicted: List[Tuple[int, Dict]] = []
+        self._unsummarized_evicted_tokens = 0
+        self._summary_generation = 0
+        self.context_summary_batch_tokens = (context_recent_tokens // 2 if context_summary_batch_tokens is None
+                                             else context_summary_batch_tokens)
+        self.context_summary_max_batch_tokens = context_summary_max_batch_tokens or context_recent_tokens * 4
+        # 요약 실패 백오프: 연속 실패 횟수와 다음 시도 가능 시각 (time.monotonic 기준)
+        self.summary_retry_delay = summary_retry_delay
+        self.summary_max_retry_delay = summary_max_retry_delay
+        self._summary_failures = 0
+        self._summary_retry_at = 0.0
+        
+        self.store = store or JsonFileStore(history_dir, fsync=fsync)
     
     def _generate_session_id(self) -> str:
         """세션 ID 생성"""
@@ -42,75 +211,232 @@ class ConversationManager:
             "role": role,
             "content": content,
             "response_time": response_time,
-            "source": source
+            "source": source,
+            "token_count": self.tokenizer.count_tokens(content)
         }
         
-        self.conversation_history.append(message)
+        with self._lock:
+            # 최대 개수를 넘으면 가장 오래된 메시지는 자동으로 제거됨
+            evicted = self.conversation_history.append(message)
+            self._append_token_offset(message)
+            self._stats.add(message)
+            if evicted is not None:
+                self._stats.remove(evicted)
+            
+            self._seq += 1
+            
+            if self.save_to_file:
+                self._pending.append((self._seq, message))
+            
+            schedule_summary = False
+            if self.compactor:
+                evicted_seq = self._seq - self.max_history
+                if evicted is not None and evicted_seq > self._summarized_seq:
+                    self._add_unsummarized_evicted([(evicted_seq, evicted)])
+                schedule_summary = self._needs_context_summary()
         
-        # 최대 개수 제한
-        if len(self.conversation_history) > self.max_history:
-            self.conversation_history.pop(0)
+        if schedule_summary:
+            self.compactor.schedule(self)
         
-        # 파일에 저장
+        # 저널에 추가 기록
         if self.save_to_file:
-            self._save_to_file()
+            if self.writer:
+                self.writer.mark_dirty(self)
+            else:
+                self.flush()
     
     def get_recent_messages(self, count: int = 10) -> List[Dict]:
         """최근 메시지들 반환"""
         return self.conversation_history[-count:]
     
+    def get_message_page(self, before_seq: Optional[int] = None, limit: int = 50) -> List[Tuple[int, Dict]]:
+        """
+        순번이 before_seq보다 작은 메시지 중 최근 limit개를 (순번, 메시지) 목록으로 반환 (오래된 순)
+        
+        메모리 히스토리에 있는 구간은 메모리에서 읽고, 더 오래된 구간은 저장소에서 범위 조회로 읽습니다.
+        """
+        with self._lock:
+            end = self._seq + 1 if before_seq is None else min(before_seq, self._seq + 1)
+            first_seq = self._first_seq()
+            if end - limit >= first_seq or not self.save_to_file:
+                return [(seq, self.conversation_history[seq - first_seq])
+                        for seq in range(max(end - limit, first_seq), end)]
+        
+        # 저장소에서 읽기 전에 대기 중인 메시지를 기록
+        self.flush()
+        return self.store.get_messages(self.session_id, end, limit)
+    
     def get_context_for_llm(self, max_tokens: int = 1000) -> List[Dict]:
         """
         LLM에 전달할 컨텍스트 생성
         OpenAI API 형식에 맞춰 반환
-        """
-        context_messages = []
-        total_tokens = 0
         
-        # 최근 메시지부터 역순으로 처리
-        for message in reversed(self.conversation_history):
-            # 간단한 토큰 계산 (실제로는 tiktoken 라이브러리 사용 권장)
-            estimated_tokens = len(message["content"]) // 4
+        최근 메시지부터 max_tokens 안에 들어가는 만큼 포함합니다.
+        누적 토큰 수에서 이분 탐색으로 시작 위치를 찾으므로 히스토리를 다시 훑지 않습니다.
+        누적 요약을 사용하면 요약 메시지를 맨 앞에 두고, 요약에 이미 합쳐진 메시지는 제외합니다.
+        """
+        with span("conversation.build_context"), CONTEXT_BUILD_SECONDS.time(), self._lock:
+            context = []
+            if self._context_summary:
+                context.append({"role": "system", "content": f"이전 대화 요약:\n{self._context_summary}"})
+                max_tokens -= self._context_summary_tokens
             
-            if total_tokens + estimated_tokens > max_tokens:
-                break
-                
-            context_messages.insert(0, {
-                "role": message["role"],
-                "content": message["content"]
-            })
-            total_tokens += estimated_tokens
+            # 시작 위치 이후 토큰 합 = 전체 합 - 시작 위치 이전 누적합 <= max_tokens
+            start = bisect_left(self._token_offsets, self._total_tokens - max_tokens)
+            if self.compactor:
+                start = max(start, self._summarized_seq - self._first_seq() + 1)
+            context.extend(
+                {"role": message["role"], "content": message["content"]}
+                for message in self.conversation_history[start:]
+            )
+            return context
+    
+    def _first_seq(self) -> int:
+        """히스토리에 남아 있는 가장 오래된 메시지의 순번 (잠금 안에서 호출)"""
+        return self._seq - len(self.conversation_history) + 1
+    
+    def _recent_start(self) -> int:
+        """요약하지 않고 유지할 최근 구간의 시작 위치. 마지막 메시지는 항상 포함 (잠금 안에서 호출)"""
+        start = bisect_left(self._token_offsets, self._total_tokens - self.context_recent_tokens)
+        return min(start, len(self.conversation_history) - 1)
+    
+    def _unsummarized_range(self) -> Tuple[int, int]:
+        """히스토리 안에서 최근 구간 밖이면서 아직 요약되지 않은 구간 [시작, 끝) 위치 (잠금 안에서 호출)"""
+        start = max(self._summarized_seq - self._first_seq() + 1, 0)
+        return start, max(self._recent_start(), start)
+    
+    def _needs_context_summary(self) -> bool:
+        """
+        최근 구간 밖으로 밀려났지만 아직 요약되지 않은 메시지가 한 묶음 이상 쌓였는지 (잠금 안에서 호출)
         
-        return context_messages
+        매 턴 요약하지 않도록 context_summary_batch_tokens 이상 쌓였을 때만 요약하고,
+        요약이 실패한 뒤에는 백오프 시각이 지날 때까지 예약하지 않습니다.
+        """
+        if time.monotonic() < self._summary_retry_at:
+            return False
+        tokens = self._unsummarized_evicted_tokens
+        if self.conversation_history:
+            start, end = self._unsummarized_range()
+            if end > start:
+                tokens += self._token_offsets[end] - self._token_offsets[start]
+        return tokens > 0 and tokens >= self.context_summary_batch_tokens
     
-    def get_conversation_summary(self) -> Dict:
-        """대화 요약 정보 반환"""
-        if not self.conversation_history:
-            return {"total_messages": 0, "duration": 0}
+    def _add_unsummarized_evicted(self, entries: List[Tuple[int, Dict]]) -> None:
+        """
+        히스토리에서 밀려난 요약 전 메시지를 보관 (잠금 안에서 호출)
         
-        start_time = datetime.fromisoformat(self.conversation_history[0]["timestamp"])
-        end_time = datetime.fromisoformat(self.conversation_history[-1]["timestamp"])
-        duration = (end_time - start_time).total_seconds()
+        요약이 계속 실패해도 메모리가 늘어나지 않도록 max_history개를 넘으면 가장 오래된 메시지를
+        버립니다. 버린 메시지는 저장소에는 남아 있고 요약에만 빠집니다.
+        """
+        for _, message in entries:
+            if message.get("token_count") is None:
+                message["token_count"] = self.tokenizer.count_tokens(message["content"])
+            self._unsummarized_evicted_tokens += message["token_count"]
+        self._unsummarized_evicted.extend(entries)
+        overflow = len(self._unsummarized_evicted) - self.max_history
+        if overflow > 0:
+            self._unsummarized_evicted_tokens -= sum(
+                message["token_count"] for _, message in self._unsummarized_evicted[:overflow])
+            del self._unsummarized_evicted[:overflow]
+    
+    def _drop_unsummarized_evicted(self, summarized_seq: int) -> None:
+        """요약에 합쳐진 밀려난 메시지를 버림 (잠금 안에서 호출)"""
+        self._unsummarized_evicted = [entry for entry in self._unsummarized_evicted if entry[0] > summarized_seq]
+        self._unsummarized_evicted_tokens = sum(message["token_count"] for _, message in self._unsummarized_evicted)
+    
+    def refresh_context_summary(self, summarize) -> bool:
+        """
+        최근 구간 밖의 요약되지 않은 메시지를 누적 요약에 합침 (ContextCompactor 작업 스레드에서 호출)
         
-        user_messages = [msg for msg in self.conversation_history if msg["role"] == "user"]
-        assistant_messages = [msg for msg in self.conversation_history if msg["role"] == "assistant"]
+        요약 함수는 잠금 밖에서 실행되므로 그동안에도 메시지를 추가할 수 있습니다.
+        한 번에 오래된 순으로 context_summary_max_batch_tokens까지만 합치고, 남은 메시지는
+        다음 요약 때 합칩니다. 요약 함수가 실패하면 다음 시도를 백오프로 미루고 예외를 전달합니다.
         
-        avg_response_time = 0
-        if assistant_messages:
-            response_times = [msg.get("response_time", 0) for msg in assistant_messages if msg.get("response_time")]
-            if response_times:
-                avg_response_time = sum(response_times) / len(response_times)
+        Args:
+            summarize: (이전 요약, 합칠 메시지 목록) -> 새 요약 함수
+        """
+        with self._lock:
+            if not self._needs_context_summary():
+                return False
+            generation = self._summary_generation
+            previous_summary = self._context_summary
+            first_seq = self._first_seq()
+            start, end = self._unsummarized_range()
+            candidates = [entry for entry in self._unsummarized_evicted if entry[0] > self._summarized_seq]
+            candidates.extend((first_seq + index, self.conversation_history[index]) for index in range(start, end))
+            # 오래된 순으로 최대 묶음 크기까지 (메시지 하나가 묶음보다 커도 최소 하나는 합침)
+            entries = []
+            batch_tokens = 0
+            for entry in candidates:
+                if entries and batch_tokens + entry[1]["token_count"] > self.context_summary_max_batch_tokens:
+                    break
+                entries.append(entry)
+                batch_tokens += entry[1]["token_count"]
         
-        return {
-            "session_id": self.session_id,
-            "total_messages": len(self.conversation_history),
-            "user_messages": len(user_messages),
-            "assistant_messages": len(assistant_messages),
-            "duration_seconds": duration,
-            "avg_response_time": avg_response_time,
-            "start_time": start_time.isoformat(),
-            "end_time": end_time.isoformat()
-        }
+        if not entries:
+            return False
+        try:
+            summary = summarize(previous_summary, [
+                {"role": message["role"], "content": message["content"]} for _, message in entries
+            ]).strip()
+        except Exception:
+            with self._lock:
+                self._summary_failures += 1
+                delay = min(self.summary_retry_delay * 2 ** (self._summary_failures - 1),
+                            self.summary_max_retry_delay)
+                self._summary_retry_at = time.monotonic() + delay
+            raise
+        summarized_seq = entries[-1][0]
+        
+        with self._lock:
+            # 요약하는 동안 초기화되었거나 다른 세션을 로드했으면 결과를 버림
+            self._summary_failures = 0
+            self._summary_retry_at = 0.0
+            if generation != self._summary_generation:
+                return False
+            self._context_summary = summary
+            self._context_summary_tokens = self.tokenizer.count_tokens(summary)
+            self._summarized_seq = summarized_seq
+            self._drop_unsummarized_evicted(summarized_seq)
+            return True
+    
+    def _reset_context_summary(self, summary: str = "", summarized_seq: int = 0) -> None:
+        """누적 요약 상태를 바꾸고 진행 중인 요약 결과를 무효화 (잠금 안에서 호출)"""
+        self._context_summary = summary
+        self._context_summary_tokens = self.tokenizer.count_tokens(summary) if summary else 0
+        self._summarized_seq = summarized_seq
+        self._unsummarized_evicted = []
+        self._unsummarized_evicted_tokens = 0
+        self._summary_generation += 1
+    
+    def _append_token_offset(self, message: Dict) -> None:
+        """메시지의 토큰 수를 누적합에 반영"""
+        if message.get("token_count") is None:
+            message["token_count"] = self.tokenizer.count_tokens(message["content"])
+        self._token_offsets.append(self._total_tokens)
+        self._total_tokens += message["token_count"]
+    
+    def get_conversation_summary(self) -> Dict:
+        """대화 요약 정보 반환 (누적 통계를 사용하므로 히스토리 길이와 무관)"""
+        with self._lock:
+            if not self.conversation_history:
+                return {"total_messages": 0, "duration": 0}
+            
+            start_time = datetime.fromisoformat(self.conversation_history[0]["timestamp"])
+            end_time = datetime.fromisoformat(self.conversation_history[-1]["timestamp"])
+            duration = (end_time - start_time).total_seconds()
+            
+            return {
+                "session_id": self.session_id,
+                "total_messages": len(self.conversation_history),
+                "user_messages": self._stats.role_counts.get("user", 0),
+                "assistant_messages": self._stats.role_counts.get("assistant", 0),
+                "duration_seconds": duration,
+                "avg_response_time": self._stats.avg_response_time(),
+                "start_time": start_time.isoformat(),
+                "end_time": end_time.isoformat(),
+                "by_source": self._stats.by_source()
+            }
     
     def search_messages(self, keyword: str) -> List[Dict]:
         """키워드로 메시지 검색"""
@@ -121,46 +447,191 @@ class ConversationManager:
         return results
     
     def clear_history(self) -> None:
-        """대화 히스토리 초기화"""
+        """대화 히스토리 초기화 (이전 세션은 저장해 두고 새 세션 ID로 시작)"""
+        with self._flush_lock:
+            # 이전 세션의 대기 중인 기록을 먼저 저장
+            self.flush()
+            with self._lock:
+                self._clear_state()
+                self.session_id = self._generate_session_id()
+    
+    def reset_history(self) -> None:
+        """
+        세션 ID는 유지한 채 대화 히스토리와 저장된 기록(저장소, 검색 색인, 세션 목록)을 삭제
+        
+        웹 세션처럼 세션 ID가 클라이언트 키로 정해진 경우에 사용합니다. 다시 로드해도
+        삭제한 기록이 돌아오지 않습니다.
+        """
+        if self.writer:
+            self.writer.discard(self)
+        with self._flush_lock:
+            with self._lock:
+                self._pending = []
+                self._clear_state()
+                session_id = self.session_id
+            
+            if self.save_to_file:
+                self.store.delete_session(session_id)
+            if self.search_index:
+                try:
+                    self.search_index.remove_session(session_id)
+                except Exception as e:
+                    print(f"검색 색인 삭제 중 오류 발생: {e}")
+            if self.catalog:
+                try:
+                    self.catalog.remove(session_id)
+                except Exception as e:
+                    print(f"세션 목록 갱신 중 오류 발생: {e}")
+    
+    def _clear_state(self) -> None:
+        """메모리 히스토리, 통계, 순번, 누적 요약 초기화 (잠금 안에서 호출)"""
         self.conversation_history.clear()
-        self.session_id = self._generate_session_id()
+        self._token_offsets.clear()
+        self._total_tokens = 0
+        self._stats.reset()
+        self._seq = 0
+        self._journal_entries = 0
+        self._reset_context_summary()
     
-    def _save_to_file(self) -> None:
-        """대화 히스토리를 파일에 저장"""
-        filename = f"{self.history_dir}/conversation_{self.session_id}.json"
+    def flush(self) -> None:
+        """대기 중인 메시지들을 한 번에 저장소에 추가하고 검색 색인에 반영"""
+        if self.writer:
+            self.writer.discard(self)
         
-        data = {
-            "session_id": self.session_id,
-            "conversation_history": self.conversation_history,
-            "summary": self.get_conversation_summary()
-        }
+        with self._flush_lock:
+            with self._lock:
+                entries = self._pending
+                self._pending = []
+                session_id = self.session_id
+            
+            if not entries:
+                return
+            
+            with span("conversation.write_journal", messages=len(entries)), _JOURNAL_WRITE.time():
+                self.store.append_messages(session_id, entries)
+            
+            if self.search_index:
+                try:
+                    with span("conversation.index_messages"), _INDEX_WRITE.time():
+                        self.search_index.add_messages(session_id, entries)
+                except Exception as e:
+                    print(f"검색 색인 중 오류 발생: {e}")
+            
+            self._journal_entries += len(entries)
+            if self._journal_entries >= self.compact_every:
+                self.compact()
+            
+            if self.catalog:
+                try:
+                    self.catalog.update(session_id, **self.get_catalog_entry())
+                except Exception as e:
+                    print(f"세션 목록 갱신 중 오류 발생: {e}")
+    
+    def compact(self) -> None:
+        """저널을 스냅샷에 합치고 저널을 비움"""
+        with self._flush_lock:
+            # 대기 중인 메시지도 색인되도록 먼저 기록
+            self.flush()
+            self._save_snapshot()
+            self._journal_entries = 0
+    
+    def _save_snapshot(self) -> None:
+        """대화 히스토리 스냅샷을 저장소에 저장 (파일 저장소는 스냅샷을 쓴 뒤 저널을 비움)"""
+        with self._lock:
+            session_id = self.session_id
+            data = {
+                "session_id": self.session_id,
+                "last_seq": self._seq,
+                "conversation_history": list(self.conversation_history),
+                "summary": self.get_conversation_summary(),
+                "context_summary": {"content": self._context_summary, "summarized_seq": self._summarized_seq}
+            }
         
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        with span("conversation.save_snapshot"), _SNAPSHOT_WRITE.time():
+            self.store.save_snapshot(session_id, data)
     
     def load_from_file(self, session_id: str) -> bool:
-        """파일에서 대화 히스토리 로드"""
-        filename = f"{self.history_dir}/conversation_{session_id}.json"
+        """
+        저장소에서 대화 히스토리 로드 (스냅샷 + 저널 재생)
         
-        if not os.path.exists(filename):
-            return False
+        최근 max_history개의 메시지(누적 요약을 사용하면 아직 요약되지 않은 메시지 포함)만 읽습니다.
+        """
+        # 현재 세션의 대기 중인 기록을 먼저 저장
+        self.flush()
         
         try:
-            with open(filename, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            session = self.store.load(session_id, max_messages=self.max_history,
+                                      include_unsummarized=self.compactor is not None)
+            if session is None:
+                return False
+            history = session["messages"]
+            last_seq = session["last_seq"]
+            context_summary = session["context_summary"]
+            schedule_summary = False
             
-            self.session_id = data["session_id"]
-            self.conversation_history = data["conversation_history"]
+            with self._lock:
+                self.session_id = session_id
+                self.conversation_history = RingBuffer(self.max_history)
+                self._token_offsets = RingBuffer(self.max_history)
+                self._total_tokens = 0
+                self._stats.reset()
+                for message in history[-self.max_history:]:
+                    self.conversation_history.append(message)
+                    self._append_token_offset(message)
+                    self._stats.add(message)
+                self._seq = last_seq
+                self._journal_entries = session["journal_entries"]
+                
+                self._reset_context_summary(context_summary.get("content", ""),
+                                            context_summary.get("summarized_seq", 0))
+                if self.compactor:
+                    # 히스토리에 다시 올리지 못한 오래된 메시지도 요약되도록 보관
+                    first_seq = last_seq - len(history) + 1
+                    self._add_unsummarized_evicted([
+                        (first_seq + index, message)
+                        for index, message in enumerate(history[:-self.max_history])
+                        if first_seq + index > self._summarized_seq
+                    ])
+                    schedule_summary = self._needs_context_summary()
+            if schedule_summary:
+                self.compactor.schedule(self)
             return True
         except Exception as e:
-            print(f"파일 로드 중 오류 발생: {e}")
+            print(f"세션 로드 중 오류 발생: {e}")
             return False
     
+    def get_messages_with_seq(self) -> List[Tuple[int, Dict]]:
+        """현재 히스토리의 (순번, 메시지) 목록 반환"""
+        with self._lock:
+            first_seq = self._seq - len(self.conversation_history) + 1
+            return [(first_seq + i, message) for i, message in enumerate(self.conversation_history)]
+    
+    def approx_memory_bytes(self) -> int:
+        """
+        히스토리가 차지하는 대략적인 메모리 크기 (바이트)
+        
+        한글 문자열은 글자당 약 2바이트, 메시지 딕셔너리는 개당 약 600바이트로 추정합니다.
+        """
+        with self._lock:
+            return self._stats.content_length * 2 + len(self.conversation_history) * 600
+    
+    def get_catalog_entry(self) -> Dict:
+        """세션 목록에 기록할 현재 세션 정보 반환"""
+        size_bytes = self.store.size_bytes(self.session_id)
+        
+        with self._lock:
+            first = self.conversation_history[0] if len(self.conversation_history) else None
+            last = self.conversation_history[-1] if len(self.conversation_history) else None
+            return {
+                "message_count": self._seq,
+                "size_bytes": size_bytes,
+                "created_at": first["timestamp"] if first else None,
+                "updated_at": last["timestamp"] if last else None
+            }
+    
     def get_available_sessions(self) -> List[str]:
         """사용 가능한 세션 목록 반환"""
-        sessions = []
-        for filename in os.listdir(self.history_dir):
-            if filename.startswith("conversation_") and filename.endswith(".json"):
-                session_id = filename.replace("conversation_", "").replace(".json", "")
-                sessions.append(session_id)
-        return sorted(sessions, reverse=True)
+        if self.catalog:
+            # 세션 목록이 있으면 디렉토리를 훑지 않음
+            return self.catalog.list_session_ids()
+        return self.store.list_sessions()
@@ -0,0 +1,484 @@
+import json
+import os
+import sqlite3
+import sys
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# 저장된 세션 하나: {"messages": 메시지 목록 (순번 순), "last_seq": 마지막 메시지 순번,
+#  "context_summary": {"content", "summarized_seq"}, "summary": 마지막 스냅샷의 대화 통계 (없으면 None),
+#  "journal_entries": 마지막 스냅샷 이후 메시지 수}
+# messages는 last_seq로 끝나는 연속 구간이므로 첫 메시지의 순번은 last_seq - len(messages) + 1
+
+
+class ConversationStore(ABC):
+    """대화 기록 저장소 인터페이스 (close를 뺀 모든 메서드를 구현해야 생성할 수 있음)"""
+
+    @abstractmethod
+    def append_messages(self, session_id: str, entries: List[Tuple[int, Dict]]) -> None:
+        """(순번, 메시지) 목록을 한 번에 추가 기록"""
+
+    @abstractmethod
+    def save_snapshot(self, session_id: str, snapshot: Dict) -> None:
+        """
+        세션 스냅샷 저장 (압축)
+
+        snapshot은 session_id, last_seq, conversation_history, summary, context_summary를 가집니다.
+        스냅샷 이전에 append_messages로 기록한 메시지는 스냅샷에 포함된 것으로 봅니다.
+        """
+
+    @abstractmethod
+    def load(self, session_id: str, max_messages: Optional[int] = None,
+             include_unsummarized: bool = False) -> Optional[Dict]:
+        """
+        세션 로드 (없으면 None)
+
+        Args:
+            max_messages: 가져올 최근 메시지 수 (None이면 저장된 전체)
+            include_unsummarized: 최근 메시지보다 오래됐지만 아직 누적 요약에 합쳐지지 않은 메시지도 포함
+        """
+
+    @abstractmethod
+    def get_messages(self, session_id: str, before_seq: Optional[int] = None,
+                     limit: int = 50) -> List[Tuple[int, Dict]]:
+        """순번이 before_seq보다 작은 메시지 중 최근 limit개를 (순번, 메시지) 목록으로 반환 (오래된 순)"""
+
+    @abstractmethod
+    def list_sessions(self) -> List[str]:
+        """저장된 세션 ID 목록 (최신순)"""
+
+    @abstractmethod
+    def size_bytes(self, session_id: str) -> int:
+        """세션이 차지하는 저장 공간 (바이트)"""
+
+    @abstractmethod
+    def delete_session(self, session_id: str) -> None:
+        """세션의 저장된 기록을 모두 삭제"""
+
+    def close(self) -> None:
+        """저장소 정리 (연결 종료 등)"""
+
+
+class JsonFileStore(ConversationStore):
+    """
+    세션마다 JSON 파일로 저장하는 저장소 (기본 저장소)
+
+    메시지는 저널 파일(conversation_<session_id>.jsonl)에 한 줄씩 추가 기록되고,
+    압축할 때 스냅샷 파일(conversation_<session_id>.json)에 합쳐진 뒤 저널이 비워집니다.
+    """
+
+    def __init__(self, history_dir: str = "conversation_history", fsync: bool = False):
+        """
+        Args:
+            history_dir: 대화 기록 저장 디렉토리
+            fsync: 기록마다 fsync를 호출할지 여부
+        """
+        self.history_dir = history_dir
+        self.fsync = fsync
+        # 저장 디렉토리는 처음 파일에 쓸 때 생성 (시작 직후에는 디스크를 건드리지 않음)
+        self._history_dir_ready = False
+
+    def _snapshot_path(self, session_id: str) -> str:
+        """스냅샷 파일 경로"""
+        return os.path.join(self.history_dir, f"conversation_{session_id}.json")
+
+    def _journal_path(self, session_id: str) -> str:
+        """저널 파일 경로"""
+        return os.path.join(self.history_dir, f"conversation_{session_id}.jsonl")
+
+    def _ensure_history_dir(self) -> None:
+        """저장 디렉토리가 없으면 생성"""
+        if not self._history_dir_ready:
+            os.makedirs(self.history_dir, exist_ok=True)
+            self._history_dir_ready = True
+
+    def append_messages(self, session_id: str, entries: List[Tuple[int, Dict]]) -> None:
+        lines = [json.dumps({"seq": seq, "message": message}, ensure_ascii=False)
+                 for seq, message in entries]
+        self._ensure_history_dir()
+        with open(self._journal_path(session_id), 'a', encoding='utf-8') as f:
+            f.write("\n".join(lines) + "\n")
+            if self.fsync:
+                f.flush()
+                os.fsync(f.fileno())
+
+    def save_snapshot(self, session_id: str, snapshot: Dict) -> None:
+        filename = self._snapshot_path(session_id)
+        # 임시 파일에 쓴 뒤 교체하여 스냅샷이 깨지지 않도록 함
+        self._ensure_history_dir()
+        temp_filename = filename + ".tmp"
+        with open(temp_filename, 'w', encoding='utf-8') as f:
+            json.dump(snapshot, f, ensure_ascii=False, indent=2)
+            if self.fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(temp_filename, filename)
+
+        # 스냅샷이 기록된 뒤에만 저널을 비움 (중간에 실패해도 last_seq로 중복 재생 방지)
+        journal_path = self._journal_path(session_id)
+        if os.path.exists(journal_path):
+            open(journal_path, 'w', encoding='utf-8').close()
+
+    def load(self, session_id: str, max_messages: Optional[int] = None,
+             include_unsummarized: bool = False) -> Optional[Dict]:
+        """스냅샷을 읽고 저널을 재생 (파일 전체를 읽으므로 max_messages와 관계없이 저장된 전체를 반환)"""
+        snapshot_path = self._snapshot_path(session_id)
+        journal_path = self._journal_path(session_id)
+
+        if not os.path.exists(snapshot_path) and not os.path.exists(journal_path):
+            return None
+
+        history: List[Dict] = []
+        last_seq = 0
+        context_summary = {}
+        summary = None
+
+        if os.path.exists(snapshot_path):
+            with open(snapshot_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            history = data["conversation_history"]
+            # 저널 도입 이전 스냅샷에는 last_seq가 없음
+            last_seq = data.get("last_seq", len(history))
+            context_summary = data.get("context_summary", {})
+            summary = data.get("summary")
+
+        replayed = 0
+        if os.path.exists(journal_path):
+            with open(journal_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # 기록 도중 중단된 마지막 줄은 무시
+                        continue
+                    if entry["seq"] <= last_seq:
+                        continue
+                    history.append(entry["message"])
+                    last_seq = entry["seq"]
+                    replayed += 1
+
+        return {
+            "messages": history,
+            "last_seq": last_seq,
+            "context_summary": context_summary,
+            "summary": summary,
+            "journal_entries": replayed
+        }
+
+    def get_messages(self, session_id: str, before_seq: Optional[int] = None,
+                     limit: int = 50) -> List[Tuple[int, Dict]]:
+        """세션 파일을 모두 읽은 뒤 구간을 잘라 반환 (스냅샷에 남아 있는 메시지까지만 조회 가능)"""
+        session = self.load(session_id)
+        if session is None:
+            return []
+        first_seq = session["last_seq"] - len(session["messages"]) + 1
+        end = session["last_seq"] + 1 if before_seq is None else min(before_seq, session["last_seq"] + 1)
+        start = max(end - limit, first_seq)
+        return [(seq, session["messages"][seq - first_seq]) for seq in range(start, end)]
+
+    def list_sessions(self) -> List[str]:
+        if not os.path.isdir(self.history_dir):
+            return []
+        sessions = set()
+        for filename in os.listdir(self.history_dir):
+            if not filename.startswith("conversation_"):
+                continue
+            for extension in (".json", ".jsonl"):
+                if filename.endswith(extension):
+                    sessions.add(filename[len("conversation_"):-len(extension)])
+        return sorted(sessions, reverse=True)
+
+    def size_bytes(self, session_id: str) -> int:
+        size_bytes = 0
+        for path in (self._snapshot_path(session_id), self._journal_path(session_id)):
+            if os.path.exists(path):
+                size_bytes += os.path.getsize(path)
+        return size_bytes
+
+    def delete_session(self, session_id: str) -> None:
+        for path in (self._snapshot_path(session_id), self._journal_path(session_id)):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+class SqliteConversationStore(ConversationStore):
+    """
+    SQLite(WAL) 데이터베이스에 저장하는 저장소
+
+    세션과 메시지를 색인된 테이블에 보관하므로 세션이 많아도 로드·목록 조회 비용이 늘지 않고,
+    메시지는 (세션 ID, 순번) 기본 키로 범위 조회하여 오래된 대화도 페이지 단위로 읽습니다.
+    메시지는 히스토리 최대 개수와 관계없이 모두 보관되며, 스냅샷은 누적 요약 등 세션 정보만 갱신합니다.
+    여러 프로세스가 같은 파일에 써도 SQLite 잠금으로 직렬화됩니다.
+    """
+
+    _MESSAGE_COLUMNS = ("timestamp", "role", "content", "response_time", "source", "token_count")
+
+    def __init__(self, db_path: str = "conversation_history/conversations.db", fsync: bool = False,
+                 busy_timeout: float = 5.0):
+        """
+        Args:
+            db_path: 데이터베이스 파일 경로
+            fsync: 커밋마다 디스크에 동기화할지 여부 (synchronous=FULL)
+            busy_timeout: 다른 프로세스가 쓰는 중일 때 기다릴 최대 시간 (초)
+        """
+        self.db_path = db_path
+        self.fsync = fsync
+        self.busy_timeout = busy_timeout
+        self._lock = threading.Lock()
+        # 데이터베이스는 처음 사용할 때 열기
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _db(self) -> sqlite3.Connection:
+        """데이터베이스 연결 (처음 호출할 때 디렉토리와 테이블 생성, 잠금 안에서 호출)"""
+        if self._conn is not None:
+            return self._conn
+        db_dir = os.path.dirname(self.db_path)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir, exist_ok=True)
+
+        conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(f"PRAGMA synchronous={'FULL' if self.fsync else 'NORMAL'}")
+        with conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS sessions (
+                    session_id TEXT PRIMARY KEY,
+                    last_seq INTEGER NOT NULL DEFAULT 0,
+                    snapshot_seq INTEGER NOT NULL DEFAULT 0,
+                    updated_at TEXT,
+                    size_bytes INTEGER NOT NULL DEFAULT 0,
+                    summary TEXT,
+                    context_summary TEXT NOT NULL DEFAULT '',
+                    summarized_seq INTEGER NOT NULL DEFAULT 0
+                );
+                CREATE TABLE IF NOT EXISTS messages (
+                    session_id TEXT NOT NULL,
+                    seq INTEGER NOT NULL,
+                    timestamp TEXT,
+                    role TEXT NOT NULL,
+                    content TEXT NOT NULL,
+                    response_time REAL,
+                    source TEXT,
+                    token_count INTEGER,
+                    PRIMARY KEY (session_id, seq)
+                );
+            """)
+        self._conn = conn
+        return conn
+
+    def _insert_messages(self, conn: sqlite3.Connection, session_id: str,
+                         entries: List[Tuple[int, Dict]]) -> int:
+        """
+        메시지를 한 번에 추가하고 세션 정보 갱신 (트랜잭션 안에서 호출, 이미 있는 순번은 건너뜀)
+
+        Returns:
+            새로 추가된 메시지 수
+        """
+        if not entries:
+            return 0
+        rows = [(session_id, seq) + tuple(message.get(column) for column in self._MESSAGE_COLUMNS)
+                for seq, message in entries]
+        inserted = conn.executemany(
+            "INSERT OR IGNORE INTO messages (session_id, seq, timestamp, role, content, response_time, "
+            "source, token_count) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows).rowcount
+        added_bytes = sum(len(message["content"].encode("utf-8")) for _, message in entries)
+        conn.execute(
+            "INSERT INTO sessions (session_id, last_seq, updated_at, size_bytes) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(session_id) DO UPDATE SET "
+            "last_seq = MAX(sessions.last_seq, excluded.last_seq), "
+            "updated_at = excluded.updated_at, "
+            "size_bytes = sessions.size_bytes + excluded.size_bytes",
+            (session_id, max(seq for seq, _ in entries), datetime.now().isoformat(),
+             added_bytes if inserted == len(entries) else 0))
+        if inserted != len(entries):
+            # 일부가 이미 있었으면(마이그레이션 재실행 등) 크기를 다시 계산
+            conn.execute(
+                "UPDATE sessions SET size_bytes = (SELECT COALESCE(SUM(LENGTH(CAST(content AS BLOB))), 0) "
+                "FROM messages WHERE session_id = ?) WHERE session_id = ?", (session_id, session_id))
+        return inserted
+
+    def _update_snapshot(self, conn: sqlite3.Connection, session_id: str, snapshot: Dict) -> None:
+        """세션의 스냅샷 정보(요약, 누적 요약, 마지막 순번) 갱신 (트랜잭션 안에서 호출)"""
+        context_summary = snapshot.get("context_summary") or {}
+        conn.execute(
+            "INSERT INTO sessions (session_id, last_seq, snapshot_seq, updated_at, summary, "
+            "context_summary, summarized_seq) VALUES (?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(session_id) DO UPDATE SET "
+            "last_seq = MAX(sessions.last_seq, excluded.last_seq), "
+            "snapshot_seq = excluded.snapshot_seq, "
+            "updated_at = excluded.updated_at, "
+            "summary = excluded.summary, "
+            "context_summary = excluded.context_summary, "
+            "summarized_seq = excluded.summarized_seq",
+            (session_id, snapshot["last_seq"], snapshot["last_seq"], datetime.now().isoformat(),
+             json.dumps(snapshot.get("summary"), ensure_ascii=False),
+             context_summary.get("content", ""), context_summary.get("summarized_seq", 0)))
+
+    def append_messages(self, session_id: str, entries: List[Tuple[int, Dict]]) -> None:
+        with self._lock:
+            conn = self._db()
+            with conn:
+                self._insert_messages(conn, session_id, entries)
+
+    def save_snapshot(self, session_id: str, snapshot: Dict) -> None:
+        with self._lock:
+            conn = self._db()
+            with conn:
+                self._update_snapshot(conn, session_id, snapshot)
+
+    def import_sessions(self, sessions: Iterable[Tuple[str, Dict]]) -> int:
+        """
+        여러 세션을 한 트랜잭션으로 가져오기 (마이그레이션용)
+
+        Args:
+            sessions: (세션 ID, load() 형식의 세션) 목록
+
+        Returns:
+            새로 추가된 메시지 수 (이미 있는 순번은 건너뜀)
+        """
+        added = 0
+        with self._lock:
+            conn = self._db()
+            with conn:
+                for session_id, session in sessions:
+                    first_seq = session["last_seq"] - len(session["messages"]) + 1
+                    added += self._insert_messages(conn, session_id, [
+                        (first_seq + index, message) for index, message in enumerate(session["messages"])])
+                    self._update_snapshot(conn, session_id, {
+                        "last_seq": session["last_seq"],
+                        "context_summary": session.get("context_summary"),
+                        "summary": session.get("summary")
+                    })
+        return added
+
+    def load(self, session_id: str, max_messages: Optional[int] = None,
+             include_unsummarized: bool = False) -> Optional[Dict]:
+        with self._lock:
+            conn = self._db()
+            row = conn.execute(
+                "SELECT last_seq, snapshot_seq, context_summary, summarized_seq, summary FROM sessions "
+                "WHERE session_id = ?", (session_id,)).fetchone()
+            if row is None:
+                return None
+            last_seq, snapshot_seq, context_summary, summarized_seq, summary = row
+
+            after_seq = 0
+            if max_messages is not None:
+                after_seq = max(last_seq - max_messages, 0)
+                if include_unsummarized:
+                    after_seq = min(after_seq, summarized_seq)
+            rows = conn.execute(
+                f"SELECT {', '.join(self._MESSAGE_COLUMNS)} FROM messages "
+                "WHERE session_id = ? AND seq > ? ORDER BY seq", (session_id, after_seq)).fetchall()
+
+        return {
+            "messages": [dict(zip(self._MESSAGE_COLUMNS, values)) for values in rows],
+            "last_seq": last_seq,
+            "context_summary": {"content": context_summary, "summarized_seq": summarized_seq},
+            "summary": json.loads(summary) if summary else None,
+            "journal_entries": last_seq - snapshot_seq
+        }
+
+    def get_messages(self, session_id: str, before_seq: Optional[int] = None,
+                     limit: int = 50) -> List[Tuple[int, Dict]]:
+        """(세션 ID, 순번) 기본 키의 범위 조회로 구간만 읽음"""
+        with self._lock:
+            rows = self._db().execute(
+                f"SELECT seq, {', '.join(self._MESSAGE_COLUMNS)} FROM messages "
+                "WHERE session_id = ? AND seq < ? ORDER BY seq DESC LIMIT ?",
+                (session_id, before_seq if before_seq is not None else sys.maxsize, limit)).fetchall()
+        return [(values[0], dict(zip(self._MESSAGE_COLUMNS, values[1:]))) for values in reversed(rows)]
+
+    def list_sessions(self) -> List[str]:
+        with self._lock:
+            rows = self._db().execute("SELECT session_id FROM sessions ORDER BY session_id DESC").fetchall()
+        return [row[0] for row in rows]
+
+    def size_bytes(self, session_id: str) -> int:
+        with self._lock:
+            row = self._db().execute(
+                "SELECT size_bytes FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+        return row[0] if row else 0
+
+    def delete_session(self, session_id: str) -> None:
+        with self._lock:
+            conn = self._db()
+            with conn:
+                conn.execute("DELETE FROM messages WHERE session_id = ?", (session_id,))
+                conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+
+    def close(self) -> None:
+        """데이터베이스 연결 종료"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def create_store(backend: str = "json", history_dir: str = "conversation_history",
+                 db_path: str = "conversation_history/conversations.db",
+                 fsync: bool = False) -> ConversationStore:
+    """
+    설정 이름으로 저장소 생성
+
+    Args:
+        backend: "json" (세션별 JSON 파일) 또는 "sqlite"
+        history_dir: JSON 파일 저장 디렉토리
+        db_path: SQLite 데이터베이스 파일 경로
+        fsync: 기록마다 디스크에 동기화할지 여부
+    """
+    if backend == "json":
+        return JsonFileStore(history_dir, fsync=fsync)
+    if backend == "sqlite":
+        return SqliteConversationStore(db_path, fsync=fsync)
+    raise ValueError(f"지원하지 않는 대화 저장소입니다: {backend}")
+
+
+def migrate_json_sessions(history_dir: str = "conversation_history",
+                          db_path: str = "conversation_history/conversations.db",
+                          batch_size: int = 200) -> Dict:
+    """
+    JSON 파일로 저장된 세션들을 SQLite 저장소로 가져오기
+
+    세션 batch_size개를 한 트랜잭션으로 넣으며, 이미 가져온 메시지는 건너뛰므로
+    여러 번 실행해도 안전합니다. JSON 파일은 그대로 둡니다.
+
+    Returns:
+        {"sessions", "messages", "failed"} 형식의 딕셔너리 (failed는 읽지 못한 세션 ID 목록)
+    """
+    source = JsonFileStore(history_dir)
+    target = SqliteConversationStore(db_path)
+    session_ids = source.list_sessions()
+    result = {"sessions": 0, "messages": 0, "failed": []}
+    try:
+        for start in range(0, len(session_ids), batch_size):
+            batch = []
+            for session_id in session_ids[start:start + batch_size]:
+                try:
+                    session = source.load(session_id)
+                except Exception as e:
+                    print(f"세션 {session_id} 읽기 중 오류 발생: {e}")
+                    result["failed"].append(session_id)
+                    continue
+                if session is not None:
+                    batch.append((session_id, session))
+            result["messages"] += target.import_sessions(batch)
+            result["sessions"] += len(batch)
+    finally:
+        target.close()
+    return result
+
+
+if __name__ == "__main__":
+    from config import CONVERSATION_DB_PATH
+
+    # 사용법: python conversation_store.py [JSON 기록 디렉토리] [SQLite 파일 경로]
+    result = migrate_json_sessions(sys.argv[1] if len(sys.argv) > 1 else "conversation_history",
+                                   sys.argv[2] if len(sys.argv) > 2 else CONVERSATION_DB_PATH)
+    print(f"{result['sessions']}개 세션의 메시지 {result['messages']}개를 가져왔습니다.")
+    if result["failed"]:
+        print(f"읽지 못한 세션: {', '.join(result['failed'])}")
@@ -0,0 +1,328 @@
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+from tokenizer import KoreanApproxTokenizer, Tokenizer
+
+_WORD_PATTERN = re.compile(r"\w+")
+
+
+def tokenize_terms(text: str) -> List[str]:
+    """
+    BM25 색인용 단어 목록
+
+    영문·숫자 단어는 그대로 쓰고, 한글처럼 조사가 붙는 단어는 형태소 분석기 없이도
+    "파일을"과 "파일"이 맞도록 두 글자 조각(bigram)으로 나눕니다.
+    """
+    terms = []
+    for word in _WORD_PATTERN.findall(text.lower()):
+        if word.isascii() or len(word) == 1:
+            terms.append(word)
+        else:
+            terms.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return terms
+
+
+def split_chunks(text: str, tokenizer: Tokenizer, chunk_tokens: int = 300,
+                 overlap_tokens: int = 50) -> List[str]:
+    """
+    문서를 줄 단위로 모아 chunk_tokens 토큰 이하의 조각으로 나눔
+
+    조각 경계에 걸친 내용도 찾을 수 있도록 앞 조각의 마지막 줄들을 overlap_tokens 토큰까지
+    다음 조각 앞에 다시 넣습니다. 한 줄이 chunk_tokens보다 길면 글자 수 비율로 자릅니다.
+    """
+    lines = []
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        tokens = tokenizer.count_tokens(line)
+        if tokens <= chunk_tokens:
+            lines.append((line, tokens))
+            continue
+        step = max(1, len(line) * chunk_tokens // tokens)
+        for start in range(0, len(line), step):
+            piece = line[start:start + step]
+            lines.append((piece, tokenizer.count_tokens(piece)))
+
+    chunks = []
+    current: List = []
+    current_tokens = 0
+    for line, tokens in lines:
+        if current and current_tokens + tokens > chunk_tokens:
+            chunks.append("\n".join(part for part, _ in current))
+            # 마지막 줄들을 overlap_tokens까지 다음 조각으로 넘김
+            carried = []
+            carried_tokens = 0
+            for part, part_tokens in reversed(current):
+                if carried_tokens + part_tokens > overlap_tokens or carried_tokens + part_tokens + tokens > chunk_tokens:
+                    break
+                carried.insert(0, (part, part_tokens))
+                carried_tokens += part_tokens
+            current, current_tokens = carried, carried_tokens
+        current.append((line, tokens))
+        current_tokens += tokens
+    if current:
+        chunks.append("\n".join(part for part, _ in current))
+    return chunks
+
+
+def format_reference(chunks: List[Dict]) -> str:
+    """검색된 조각을 LLM에 보낼 참고 자료 메시지로 변환"""
+    parts = ["다음은 사용자가 업로드한 파일에서 질문과 관련된 부분입니다. "
+             "이 내용을 바탕으로 답하고, 내용에서 찾을 수 없으면 찾을 수 없다고 답하세요."]
+    for chunk in chunks:
+        parts.append(f"[{chunk['filename']} #{chunk['position'] + 1}]\n{chunk['content']}")
+    return "\n\n".join(parts)
+
+
+class DocumentIndex:
+    """
+    세션별 업로드 문서의 조각 검색 색인 (SQLite, BM25)
+
+    업로드된 문서의 텍스트를 조각으로 나눠 세션별로 색인하고, 질문과 관련된 조각을
+    토큰 예산 안에서 골라 줍니다. 문서가 커도 질문마다 LLM에 보내는 토큰 수는 예산을 넘지 않습니다.
+    """
+
+    def __init__(self, db_path: str = "conversation_history/document_index.db",
+                 tokenizer: Optional[Tokenizer] = None, chunk_tokens: int = 300,
+                 overlap_tokens: int = 50, max_documents_per_session: int = 20,
+                 max_query_terms: int = 64):
+        """
+        Args:
+            db_path: 색인 데이터베이스 파일 경로
+            tokenizer: 조각 크기와 예산 계산에 쓸 토큰 계산기 (기본값: 한국어 근사 토큰 계산기)
+            chunk_tokens: 조각 하나의 최대 토큰 수
+            overlap_tokens: 이웃한 조각끼리 겹치는 최대 토큰 수
+            max_documents_per_session: 세션마다 보관할 최대 문서 수 (넘으면 오래된 문서부터 제거)
+            max_query_terms: 질문에서 사용할 최대 단어 수
+        """
+        self.db_path = db_path
+        self.tokenizer = tokenizer or KoreanApproxTokenizer()
+        self.chunk_tokens = chunk_tokens
+        self.overlap_tokens = overlap_tokens
+        self.max_documents_per_session = max_documents_per_session
+        self.max_query_terms = max_query_terms
+
+        db_dir = os.path.dirname(db_path)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS documents (
+                    id INTEGER PRIMARY KEY,
+                    session_id TEXT NOT NULL,
+                    file_hash TEXT NOT NULL,
+                    filename TEXT NOT NULL,
+                    chunk_count INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    UNIQUE (session_id, file_hash)
+                );
+                CREATE INDEX IF NOT EXISTS idx_documents_file_hash ON documents (file_hash);
+                CREATE TABLE IF NOT EXISTS chunks (
+                    id INTEGER PRIMARY KEY,
+                    document_id INTEGER NOT NULL,
+                    session_id TEXT NOT NULL,
+                    position INTEGER NOT NULL,
+                    content TEXT NOT NULL,
+                    length INTEGER NOT NULL,
+                    token_count INTEGER NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_chunks_document ON chunks (document_id, position);
+                CREATE INDEX IF NOT EXISTS idx_chunks_session ON chunks (session_id);
+                CREATE TABLE IF NOT EXISTS postings (
+                    session_id TEXT NOT NULL,
+                    term TEXT NOT NULL,
+                    chunk_id INTEGER NOT NULL,
+                    tf INTEGER NOT NULL,
+                    PRIMARY KEY (session_id, term, chunk_id)
+                ) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS idx_postings_chunk ON postings (chunk_id);
+            """)
+
+    def add_document(self, session_id: str, file_hash: str, filename: str, content: str) -> int:
+        """
+        문서를 세션 색인에 추가
+
+        같은 세션에 같은 내용의 문서가 이미 있으면 건너뛰고, 다른 세션에서 색인한 적이 있으면
+        조각과 단어 목록을 복사하여 다시 나누지 않습니다.
+
+        Returns:
+            문서의 조각 수
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT chunk_count FROM documents WHERE session_id = ? AND file_hash = ?",
+                (session_id, file_hash)).fetchone()
+            if row is not None:
+                with self._conn:
+                    self._conn.execute(
+                        "UPDATE documents SET created_at = ?, filename = ? WHERE session_id = ? AND file_hash = ?",
+                        (time.time(), filename, session_id, file_hash))
+                return row[0]
+            source = self._conn.execute(
+                "SELECT id, chunk_count FROM documents WHERE file_hash = ? LIMIT 1", (file_hash,)).fetchone()
+
+        if source is not None:
+            return self._copy_document(session_id, file_hash, filename, *source)
+
+        # 조각 나누기와 단어 세기는 잠금 밖에서 수행
+        chunks = []
+        for text in split_chunks(content, self.tokenizer, self.chunk_tokens, self.overlap_tokens):
+            terms = Counter(tokenize_terms(text))
+            chunks.append((text, terms, sum(terms.values()), self.tokenizer.count_tokens(text)))
+
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO documents (session_id, file_hash, filename, chunk_count, created_at) "
+                "VALUES (?, ?, ?, ?, ?)", (session_id, file_hash, filename, len(chunks), time.time()))
+            if cursor.rowcount != 1:
+                return len(chunks)
+            document_id = cursor.lastrowid
+            for position, (text, terms, length, token_count) in enumerate(chunks):
+                chunk_id = self._conn.execute(
+                    "INSERT INTO chunks (document_id, session_id, position, content, length, token_count) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (document_id, session_id, position, text, length, token_count)).lastrowid
+                self._conn.executemany(
+                    "INSERT INTO postings (session_id, term, chunk_id, tf) VALUES (?, ?, ?, ?)",
+                    ((session_id, term, chunk_id, tf) for term, tf in terms.items()))
+            self._prune_session(session_id)
+        return len(chunks)
+
+    def _copy_document(self, session_id: str, file_hash: str, filename: str,
+                       source_id: int, chunk_count: int) -> int:
+        """다른 세션에서 색인한 같은 문서의 조각과 단어 목록을 복사"""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO documents (session_id, file_hash, filename, chunk_count, created_at) "
+                "VALUES (?, ?, ?, ?, ?)", (session_id, file_hash, filename, chunk_count, time.time()))
+            if cursor.rowcount != 1:
+                return chunk_count
+            document_id = cursor.lastrowid
+            self._conn.execute(
+                "INSERT INTO chunks (document_id, session_id, position, content, length, token_count) "
+                "SELECT ?, ?, position, content, length, token_count FROM chunks WHERE document_id = ?",
+                (document_id, session_id, source_id))
+            self._conn.execute(
+                "INSERT INTO postings (session_id, term, chunk_id, tf) "
+                "SELECT ?, p.term, target.id, p.tf FROM chunks source "
+                "JOIN postings p ON p.chunk_id = source.id "
+                "JOIN chunks target ON target.document_id = ? AND target.position = source.position "
+                "WHERE source.document_id = ?",
+                (session_id, document_id, source_id))
+            self._prune_session(session_id)
+        return chunk_count
+
+    def _prune_session(self, session_id: str) -> None:
+        """세션의 문서 수가 최대치를 넘으면 오래된 문서부터 제거 (잠금과 트랜잭션 안에서 호출)"""
+        rows = self._conn.execute(
+            "SELECT id FROM documents WHERE session_id = ? ORDER BY created_at DESC LIMIT -1 OFFSET ?",
+            (session_id, self.max_documents_per_session)).fetchall()
+        self._delete_documents([row[0] for row in rows])
+
+    def _delete_documents(self, document_ids: List[int]) -> None:
+        """문서와 조각, 단어 목록 삭제 (잠금과 트랜잭션 안에서 호출)"""
+        for document_id in document_ids:
+            self._conn.execute(
+                "DELETE FROM postings WHERE chunk_id IN (SELECT id FROM chunks WHERE document_id = ?)",
+                (document_id,))
+            self._conn.execute("DELETE FROM chunks WHERE document_id = ?", (document_id,))
+            self._conn.execute("DELETE FROM documents WHERE id = ?", (document_id,))
+
+    def retrieve(self, session_id: str, query: str, top_k: int = 5, token_budget: int = 1500,
+                 k1: float = 1.2, b: float = 0.75) -> List[Dict]:
+        """
+        질문과 관련된 조각을 BM25 점수순으로 top_k개까지, 합계 token_budget 토큰 이하로 반환
+
+        질문과 겹치는 단어가 없으면(예: "요약해줘") 가장 최근 문서의 앞부분을 반환합니다.
+        결과는 문서 안의 순서대로 정렬됩니다.
+
+        Returns:
+            filename, position, content, token_count, score를 담은 조각 목록
+        """
+        terms = list(dict.fromkeys(tokenize_terms(query)))[:self.max_query_terms]
+        with self._lock:
+            chunk_total, avg_length = self._conn.execute(
+                "SELECT COUNT(*), AVG(length) FROM chunks WHERE session_id = ?", (session_id,)).fetchone()
+            if not chunk_total:
+                return []
+
+            scores: Dict[int, float] = {}
+            if terms:
+                placeholders = ",".join("?" * len(terms))
+                frequencies = dict(self._conn.execute(
+                    f"SELECT term, COUNT(*) FROM postings WHERE session_id = ? AND term IN ({placeholders}) "
+                    "GROUP BY term", [session_id, *terms]).fetchall())
+                idf = {term: math.log(1 + (chunk_total - df + 0.5) / (df + 0.5))
+                       for term, df in frequencies.items()}
+                for chunk_id, term, tf, length in self._conn.execute(
+                        "SELECT p.chunk_id, p.term, p.tf, c.length FROM postings p "
+                        f"JOIN chunks c ON c.id = p.chunk_id WHERE p.session_id = ? AND p.term IN ({placeholders})",
+                        [session_id, *terms]):
+                    norm = k1 * (1 - b + b * length / (avg_length or 1))
+                    scores[chunk_id] = scores.get(chunk_id, 0.0) + idf[term] * tf * (k1 + 1) / (tf + norm)
+
+            if scores:
+                ranked = sorted(scores, key=lambda chunk_id: (-scores[chunk_id], chunk_id))
+            else:
+                ranked = [row[0] for row in self._conn.execute(
+                    "SELECT c.id FROM chunks c JOIN documents d ON d.id = c.document_id "
+                    "WHERE c.session_id = ? ORDER BY d.created_at DESC, c.position LIMIT ?",
+                    (session_id, top_k))]
+
+            selected = []
+            used_tokens = 0
+            for chunk_id in ranked:
+                if len(selected) >= top_k:
+                    break
+                row = self._conn.execute(
+                    "SELECT d.filename, d.created_at, c.position, c.content, c.token_count "
+                    "FROM chunks c JOIN documents d ON d.id = c.document_id WHERE c.id = ?",
+                    (chunk_id,)).fetchone()
+                if used_tokens + row[4] > token_budget:
+                    continue
+                used_tokens += row[4]
+                selected.append(row + (scores.get(chunk_id, 0.0),))
+
+        selected.sort(key=lambda row: (row[1], row[2]))
+        return [{"filename": filename, "position": position, "content": content,
+                 "token_count": token_count, "score": score}
+                for filename, _, position, content, token_count, score in selected]
+
+    def list_documents(self, session_id: str) -> List[Dict]:
+        """세션에 색인된 문서 목록 (최근 순)"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT filename, file_hash, chunk_count, created_at FROM documents "
+                "WHERE session_id = ? ORDER BY created_at DESC", (session_id,)).fetchall()
+        return [{"filename": filename, "file_hash": file_hash, "chunk_count": chunk_count,
+                 "created_at": created_at} for filename, file_hash, chunk_count, created_at in rows]
+
+    def remove_session(self, session_id: str) -> None:
+        """세션의 모든 문서 제거"""
+        with self._lock, self._conn:
+            rows = self._conn.execute("SELECT id FROM documents WHERE session_id = ?", (session_id,)).fetchall()
+            self._delete_documents([row[0] for row in rows])
+
+    def cleanup(self, max_age_hours: float) -> int:
+        """마지막으로 추가된 지 max_age_hours가 지난 문서 제거. 제거한 문서 수 반환"""
+        cutoff = time.time() - max_age_hours * 3600
+        with self._lock, self._conn:
+            rows = self._conn.execute("SELECT id FROM documents WHERE created_at < ?", (cutoff,)).fetchall()
+            self._delete_documents([row[0] for row in rows])
+        return len(rows)
+
+    def close(self) -> None:
+        """데이터베이스 연결 종료"""
+        with self._lock:
+            self._conn.close()
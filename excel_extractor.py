@@ -0,0 +1,136 @@
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import openpyxl
+
+
+def _format_cell(value) -> str:
+    """셀 값을 텍스트로 변환 (빈 셀은 빈 문자열)"""
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _looks_like_header(values: List) -> bool:
+    """값이 있는 셀이 2개 이상이고 모두 문자열인 행을 헤더로 판단"""
+    filled = [value for value in values if value is not None and str(value).strip()]
+    return len(filled) >= 2 and all(isinstance(value, str) for value in filled)
+
+
+class StreamingExcelExtractor:
+    """
+    Excel 파일을 읽기 전용 모드로 한 행씩 읽어 텍스트로 추출
+
+    load_workbook의 기본 모드는 모든 셀 객체를 메모리에 만들기 때문에 큰 시트에서 메모리를
+    많이 쓰므로, 읽기 전용 모드로 행을 순서대로 읽고 시트마다 행/열/바이트 수 제한을 넘으면
+    나머지 행은 읽지 않습니다. 첫 번째로 값이 있는 행이 모두 문자열이면 헤더로 표시합니다.
+    """
+
+    def __init__(self, max_rows: Optional[int] = None, max_columns: Optional[int] = None,
+                 max_bytes: Optional[int] = None, chunk_rows: int = 500):
+        """
+        Args:
+            max_rows: 시트마다 추출할 최대 행 수 (빈 행 제외, None이면 전체)
+            max_columns: 행마다 추출할 최대 열 수 (None이면 전체)
+            max_bytes: 시트마다 추출할 최대 텍스트 크기 (UTF-8 바이트, None이면 무제한)
+            chunk_rows: iter_chunks에서 한 번에 전달할 행 수
+        """
+        self.max_rows = max_rows
+        self.max_columns = max_columns
+        self.max_bytes = max_bytes
+        self.chunk_rows = chunk_rows
+
+    def _iter_sheets(self, file_path: str, status: Dict) -> Iterator[Tuple[Dict, Iterator[str]]]:
+        """시트마다 (시트 상태, 행 텍스트 제너레이터) 반환. 행은 다음 시트로 넘어가기 전에 읽어야 함"""
+        status["sheets"] = []
+        workbook = openpyxl.load_workbook(file_path, read_only=True)
+        try:
+            for sheet in workbook.worksheets:
+                sheet_status = {"name": sheet.title, "rows": 0, "total_rows": sheet.max_row,
+                                "columns": 0, "header": None, "truncated": False, "reason": None}
+                status["sheets"].append(sheet_status)
+                yield sheet_status, self._iter_sheet(sheet, sheet_status)
+        finally:
+            workbook.close()
+
+    def _iter_sheet(self, sheet, sheet_status: Dict) -> Iterator[str]:
+        """시트 하나의 행 텍스트를 제한 안에서 반환"""
+        used_bytes = 0
+        for values in sheet.iter_rows(max_col=self.max_columns, values_only=True):
+            values = list(values)
+            # 읽기 전용 모드에서는 시트 크기에 맞춰 행 끝에 빈 셀이 채워지므로 잘라냄
+            while values and values[-1] is None:
+                values.pop()
+            if not values:
+                continue
+
+            if self.max_rows is not None and sheet_status["rows"] >= self.max_rows:
+                sheet_status["truncated"], sheet_status["reason"] = True, "max_rows"
+                return
+            line = " | ".join(_format_cell(value) for value in values)
+            if sheet_status["rows"] == 0 and _looks_like_header(values):
+                sheet_status["header"] = [_format_cell(value) for value in values]
+                line = f"[헤더] {line}"
+            size = len(line.encode("utf-8")) + 1
+            if self.max_bytes is not None and used_bytes + size > self.max_bytes:
+                sheet_status["truncated"], sheet_status["reason"] = True, "max_bytes"
+                return
+
+            used_bytes += size
+            sheet_status["rows"] += 1
+            sheet_status["columns"] = max(sheet_status["columns"], len(values))
+            yield line
+
+    def iter_rows(self, file_path: str, status: Optional[Dict] = None) -> Iterator[Tuple[str, str]]:
+        """
+        (시트 이름, 행 텍스트)를 시트와 행 순서대로 반환하는 제너레이터
+
+        Args:
+            file_path: Excel 파일 경로
+            status: 주어지면 sheets에 시트별 name, rows, total_rows, columns, header,
+                    truncated, reason을 기록
+        """
+        status = status if status is not None else {}
+        for sheet_status, lines in self._iter_sheets(file_path, status):
+            for line in lines:
+                yield sheet_status["name"], line
+
+    def iter_chunks(self, file_path: str, status: Optional[Dict] = None) -> Iterator[str]:
+        """
+        시트 제목과 행을 chunk_rows개씩 묶은 텍스트 조각을 순서대로 반환하는 제너레이터
+
+        시트가 제한으로 잘리면 시트 끝에 잘린 이유를 덧붙입니다.
+        """
+        status = status if status is not None else {}
+        for sheet_status, lines in self._iter_sheets(file_path, status):
+            chunk = [f"\n--- 시트: {sheet_status['name']} ---\n"]
+            for line in lines:
+                chunk.append(line + "\n")
+                if len(chunk) >= self.chunk_rows:
+                    yield "".join(chunk)
+                    chunk = []
+            chunk.append(self._truncation_note(sheet_status))
+            text = "".join(chunk)
+            if text:
+                yield text
+
+    @staticmethod
+    def _truncation_note(sheet_status: Dict) -> str:
+        """시트가 제한으로 잘렸으면 안내 문구 반환"""
+        if not sheet_status["truncated"]:
+            return ""
+        reason = "행 수 제한" if sheet_status["reason"] == "max_rows" else "크기 제한"
+        total = f"전체 {sheet_status['total_rows']}행 중 " if sheet_status["total_rows"] else ""
+        return f"({reason}으로 {total}{sheet_status['rows']}행만 추출했습니다.)\n"
+
+    def extract_text(self, file_path: str) -> Dict:
+        """
+        전체 텍스트 추출
+
+        Returns:
+            content와 시트별 추출 상태(sheets)
+        """
+        status: Dict = {}
+        content = "".join(self.iter_chunks(file_path, status))
+        return {"content": content, "sheets": status["sheets"]}
@@ -1,26 +1,78 @@
+import importlib.util
 import os
-import PyPDF2
-from docx import Document
-import openpyxl
-from PIL import Image
-import io
-import base64
-from typing import Dict, List, Optional
-import json
+import threading
+from typing import TYPE_CHECKING, Dict, List, Optional
+from upload_store import UploadStore
+from metrics import Histogram, timed
+from tracing import span
 
-# OCR 기능을 선택적으로 import
-try:
-    import pytesseract
-    OCR_AVAILABLE = True
-except ImportError:
-    OCR_AVAILABLE = False
+# 형식별 라이브러리(PyPDF2, python-docx, openpyxl, Pillow, pytesseract)는 불러오는 데 오래 걸리므로
+# 해당 형식을 처음 분석할 때 불러옴. 여기서는 타입 표시에만 사용
+if TYPE_CHECKING:
+    from excel_extractor import StreamingExcelExtractor
+    from ocr_pipeline import OcrPipeline
+    from pdf_extractor import ParallelPdfExtractor
+
+# OCR 기능은 pytesseract가 설치되어 있을 때만 사용 (설치 여부만 확인하고 불러오지는 않음)
+OCR_AVAILABLE = importlib.util.find_spec("pytesseract") is not None
+if not OCR_AVAILABLE:
     print("경고: pytesseract가 설치되지 않았습니다. 이미지 OCR 기능을 사용할 수 없습니다.")
 
+# 형식별 내용 추출 시간 (별도 프로세스에서 추출한 작업은 AnalysisJobQueue가 기록)
+EXTRACT_SECONDS = Histogram("chatbot_file_extract_seconds", "파일 형식별 내용 추출 시간",
+                            ("file_type", "outcome"))
+
+class ExtractionError(Exception):
+    """파일 내용을 추출하지 못한 경우 (손상된 파일, 형식별 라이브러리 오류 등)"""
+
 class FileAnalyzer:
     """파일 분석 클래스"""
     
-    def __init__(self, upload_dir: str = "uploads"):
+    def __init__(self, upload_dir: str = "uploads", pdf_max_pages: Optional[int] = None,
+                 pdf_time_budget: Optional[float] = None, pdf_workers: Optional[int] = None,
+                 cache_max_bytes: Optional[int] = 1024 * 1024 * 1024, max_age_hours: float = 24,
+                 excel_max_rows: Optional[int] = None, excel_max_columns: Optional[int] = None,
+                 excel_max_bytes: Optional[int] = None, ocr_lang: str = 'kor+eng',
+                 ocr_max_side: int = 2000, ocr_workers: Optional[int] = None,
+                 ocr_max_frames: Optional[int] = 20, ocr_cache_path: Optional[str] = None):
+        """
+        Args:
+            upload_dir: 업로드 파일 저장 디렉토리
+            pdf_max_pages: PDF에서 추출할 최대 페이지 수 (None이면 전체)
+            pdf_time_budget: PDF 추출에 쓸 최대 시간 (초, None이면 무제한)
+            pdf_workers: PDF 추출 작업 프로세스 수 (기본값: CPU 코어 수)
+            cache_max_bytes: 업로드 파일과 분석 결과를 합쳐 보관할 최대 크기 (바이트)
+            max_age_hours: 마지막 사용 후 업로드 파일과 분석 결과를 보관할 시간
+            excel_max_rows: Excel 시트마다 추출할 최대 행 수 (None이면 전체)
+            excel_max_columns: Excel 행마다 추출할 최대 열 수 (None이면 전체)
+            excel_max_bytes: Excel 시트마다 추출할 최대 텍스트 크기 (바이트, None이면 무제한)
+            ocr_lang: OCR 언어
+            ocr_max_side: OCR 전처리 후 이미지 긴 변의 최대 길이 (픽셀)
+            ocr_workers: 동시에 실행할 OCR 수 (기본값: CPU 코어 수)
+            ocr_max_frames: GIF 등에서 OCR할 최대 프레임 수 (None이면 전체)
+            ocr_cache_path: OCR 결과 디스크 캐시 경로 (None이면 메모리 캐시만 사용)
+        """
         self.upload_dir = upload_dir
+        # 분석 작업 프로세스에서 같은 설정의 분석기를 만들 때 사용
+        self.options = {
+            'upload_dir': upload_dir,
+            'pdf_max_pages': pdf_max_pages,
+            'pdf_time_budget': pdf_time_budget,
+            'pdf_workers': pdf_workers,
+            'excel_max_rows': excel_max_rows,
+            'excel_max_columns': excel_max_columns,
+            'excel_max_bytes': excel_max_bytes,
+            'ocr_lang': ocr_lang,
+            'ocr_max_side': ocr_max_side,
+            'ocr_workers': ocr_workers,
+            'ocr_max_frames': ocr_max_frames,
+            'ocr_cache_path': ocr_cache_path
+        }
+        # 형식별 추출기는 처음 사용할 때 생성
+        self._pdf_extractor: Optional["ParallelPdfExtractor"] = None
+        self._excel_extractor: Optional["StreamingExcelExtractor"] = None
+        self._ocr_pipeline: Optional["OcrPipeline"] = None
+        self._lock = threading.Lock()
         self.supported_extensions = {
             '.txt': self._analyze_text,
             '.pdf': self._analyze_pdf,
@@ -32,42 +84,77 @@ class FileAnalyzer:
             '.gif': self._analyze_image
         }
         
-        # 업로드 디렉토리 생성
-        if not os.path.exists(upload_dir):
-            os.makedirs(upload_dir)
+        # 업로드는 내용 해시로 저장하고, 같은 내용의 분석 결과는 다시 계산하지 않음.
+        # 추출만 하는 작업 프로세스에서는 저장소를 열지 않도록 처음 사용할 때 생성
+        self._store_options = {'max_bytes': cache_max_bytes, 'max_age_hours': max_age_hours}
+        self._store: Optional[UploadStore] = None
+    
+    @property
+    def store(self) -> UploadStore:
+        """업로드 저장소 (처음 사용할 때 생성)"""
+        with self._lock:
+            if self._store is None:
+                self._store = UploadStore(self.upload_dir, **self._store_options)
+            return self._store
+    
+    @property
+    def pdf_extractor(self) -> "ParallelPdfExtractor":
+        """PDF 추출기 (처음 사용할 때 생성). 큰 PDF는 페이지 구간별로 프로세스 풀에서 병렬 추출"""
+        with self._lock:
+            if self._pdf_extractor is None:
+                from pdf_extractor import ParallelPdfExtractor
+                self._pdf_extractor = ParallelPdfExtractor(
+                    max_workers=self.options['pdf_workers'], max_pages=self.options['pdf_max_pages'],
+                    time_budget=self.options['pdf_time_budget'])
+            return self._pdf_extractor
+    
+    @property
+    def excel_extractor(self) -> "StreamingExcelExtractor":
+        """
+        Excel 추출기 (처음 사용할 때 생성)
+        
+        읽기 전용 모드로 한 행씩 읽어 시트 크기와 관계없이 메모리 사용량을 일정하게 유지합니다.
+        """
+        with self._lock:
+            if self._excel_extractor is None:
+                from excel_extractor import StreamingExcelExtractor
+                self._excel_extractor = StreamingExcelExtractor(
+                    max_rows=self.options['excel_max_rows'], max_columns=self.options['excel_max_columns'],
+                    max_bytes=self.options['excel_max_bytes'])
+            return self._excel_extractor
+    
+    @property
+    def ocr_pipeline(self) -> "OcrPipeline":
+        """
+        OCR 처리기 (처음 사용할 때 생성)
+        
+        해상도/색을 정규화하고 큰 이미지는 띠로 나눠 병렬 OCR하며, 결과는 이미지 해시로 캐시합니다.
+        """
+        with self._lock:
+            if self._ocr_pipeline is None:
+                from ocr_pipeline import OcrPipeline
+                self._ocr_pipeline = OcrPipeline(
+                    lang=self.options['ocr_lang'], max_side=self.options['ocr_max_side'],
+                    max_workers=self.options['ocr_workers'], max_frames=self.options['ocr_max_frames'],
+                    cache_path=self.options['ocr_cache_path'])
+            return self._ocr_pipeline
     
     def analyze_file(self, file) -> Dict:
         """파일 분석 메인 함수"""
         try:
-            # 파일 확장자 확인
-            filename = file.filename
-            file_extension = os.path.splitext(filename)[1].lower()
-            
-            if file_extension not in self.supported_extensions:
-                return {
-                    'success': False,
-                    'error': f'지원하지 않는 파일 형식입니다: {file_extension}'
-                }
+            upload = self.prepare_upload(file)
+            if not upload['success']:
+                return upload
             
-            # 파일 저장
-            file_path = os.path.join(self.upload_dir, filename)
-            file.save(file_path)
-            
-            # 파일 분석
-            analyzer_func = self.supported_extensions[file_extension]
-            content = analyzer_func(file_path)
-            
-            # 파일 정보
-            file_info = {
-                'filename': filename,
-                'file_size': os.path.getsize(file_path),
-                'file_type': file_extension,
-                'content': content
-            }
+            # 파일 분석 (같은 내용을 분석한 결과가 있으면 그대로 사용)
+            content = upload['content']
+            status = {'complete': True}
+            if content is None:
+                content = self.extract_content(upload['file_path'], upload['file_type'], status=status)
             
             return {
                 'success': True,
-                'file_info': file_info
+                'file_info': self.finish_upload(upload, content, complete=status['complete'])
             }
             
         except Exception as e:
@@ -76,6 +163,86 @@ class FileAnalyzer:
                 'error': f'파일 분석 중 오류가 발생했습니다: {str(e)}'
             }
     
+    def prepare_upload(self, file) -> Dict:
+        """
+        업로드 파일의 형식을 확인하고 저장
+        
+        Returns:
+            success, filename, file_type, file_hash, file_path, file_size와
+            같은 내용을 분석한 결과가 있으면 content (없으면 None)
+        """
+        # 파일 확장자 확인
+        filename = file.filename
+        file_extension = os.path.splitext(filename)[1].lower()
+        
+        if file_extension not in self.supported_extensions:
+            return {
+                'success': False,
+                'error': f'지원하지 않는 파일 형식입니다: {file_extension}'
+            }
+        
+        # 파일 저장 (받는 동안 내용 해시 계산)
+        with span("file.save_upload", file_type=file_extension) as save_span:
+            file_hash, file_path, file_size = self.store.save_upload(file, file_extension)
+            content = self.store.get_content(file_hash, file_extension)
+            if save_span:
+                save_span.set(file_size=file_size, cached=content is not None)
+        
+        return {
+            'success': True,
+            'filename': filename,
+            'file_type': file_extension,
+            'file_hash': file_hash,
+            'file_path': file_path,
+            'file_size': file_size,
+            'content': content
+        }
+    
+    def extract_content(self, file_path: str, file_extension: str, on_progress=None,
+                        status: Optional[Dict] = None) -> str:
+        """
+        저장된 파일에서 내용 추출
+        
+        추출에 실패하면 ExtractionError를 발생시킵니다.
+        
+        Args:
+            on_progress: 주어지면 내용이 조금씩 추출될 때마다 추출된 부분을 전달
+                         (PDF는 페이지 단위, Excel은 여러 행 단위)
+            status: 주어지면 complete에 전체 내용을 추출했는지 기록
+                    (시간·페이지·행·프레임 제한으로 잘렸거나 OCR을 쓸 수 없으면 False)
+        """
+        status = status if status is not None else {}
+        status['complete'] = True
+        with span("file.extract", file_type=file_extension), timed(EXTRACT_SECONDS, file_extension):
+            if file_extension == '.pdf':
+                return self._analyze_pdf(file_path, on_progress, status)
+            if file_extension == '.xlsx':
+                return self._analyze_excel(file_path, on_progress, status)
+            if file_extension in ('.jpg', '.jpeg', '.png', '.gif'):
+                return self._analyze_image(file_path, status)
+            return self.supported_extensions[file_extension](file_path)
+    
+    def finish_upload(self, upload: Dict, content: str, complete: bool = True) -> Dict:
+        """
+        추출한 내용을 저장소에 기록하고 파일 정보 반환
+        
+        같은 파일을 다시 올리면 저장된 내용을 그대로 쓰므로, 제한으로 잘린 내용(complete=False)은
+        저장하지 않고 다음 업로드 때 다시 추출합니다.
+        """
+        cached = upload['content'] is not None
+        if not cached and complete:
+            with span("file.store_result"):
+                self.store.put_content(upload['file_hash'], upload['file_type'], content)
+        
+        return {
+            'filename': upload['filename'],
+            'file_size': upload['file_size'],
+            'file_type': upload['file_type'],
+            'file_hash': upload['file_hash'],
+            'cached': cached,
+            'content': content
+        }
+    
     def _analyze_text(self, file_path: str) -> str:
         """텍스트 파일 분석"""
         try:
@@ -88,69 +255,88 @@ class FileAnalyzer:
                 content = f.read()
             return content
     
-    def _analyze_pdf(self, file_path: str) -> str:
-        """PDF 파일 분석"""
-        content = ""
+    def _analyze_pdf(self, file_path: str, on_progress=None, status: Optional[Dict] = None) -> str:
+        """PDF 파일 분석 (예산을 넘으면 추출한 페이지까지만 반환)"""
+        pdf_status = {}
+        parts = []
         try:
-            with open(file_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                for page_num in range(len(pdf_reader.pages)):
-                    page = pdf_reader.pages[page_num]
-                    content += f"\n--- 페이지 {page_num + 1} ---\n"
-                    content += page.extract_text()
+            for page_num, text in self.pdf_extractor.iter_pages(file_path, pdf_status):
+                page = f"\n--- 페이지 {page_num} ---\n{text}"
+                parts.append(page)
+                if on_progress:
+                    on_progress(page)
         except Exception as e:
-            content = f"PDF 읽기 오류: {str(e)}"
-        return content
+            raise ExtractionError(f"PDF 읽기 오류: {str(e)}") from e
+        
+        if pdf_status['truncated']:
+            if status is not None:
+                status['complete'] = False
+            reason = '페이지 수 제한' if pdf_status['reason'] == 'max_pages' else '시간 제한'
+            parts.append(f"\n\n({reason}으로 전체 {pdf_status['total_pages']}페이지 중 "
+                         f"{pdf_status['extracted_pages']}페이지만 추출했습니다.)")
+        return "".join(parts)
+    
+    def iter_pdf_pages(self, file_path: str):
+        """PDF 페이지를 (페이지 번호, 텍스트) 형태로 순서대로 반환하는 제너레이터"""
+        return self.pdf_extractor.iter_pages(file_path)
     
     def _analyze_docx(self, file_path: str) -> str:
         """Word 문서 분석"""
         try:
+            from docx import Document
             doc = Document(file_path)
             content = ""
             for paragraph in doc.paragraphs:
                 content += paragraph.text + "\n"
             return content
         except Exception as e:
-            return f"Word 문서 읽기 오류: {str(e)}"
+            raise ExtractionError(f"Word 문서 읽기 오류: {str(e)}") from e
     
-    def _analyze_excel(self, file_path: str) -> str:
-        """Excel 파일 분석"""
+    def _analyze_excel(self, file_path: str, on_progress=None, status: Optional[Dict] = None) -> str:
+        """Excel 파일 분석 (시트마다 행/열/크기 제한을 넘으면 추출한 행까지만 반환)"""
+        excel_status = {}
+        parts = []
         try:
-            workbook = openpyxl.load_workbook(file_path)
-            content = ""
-            
-            for sheet_name in workbook.sheetnames:
-                sheet = workbook[sheet_name]
-                content += f"\n--- 시트: {sheet_name} ---\n"
-                
-                for row in sheet.iter_rows(values_only=True):
-                    if any(cell is not None for cell in row):
-                        content += " | ".join(str(cell) if cell is not None else "" for cell in row) + "\n"
-            
-            return content
+            for chunk in self.excel_extractor.iter_chunks(file_path, excel_status):
+                parts.append(chunk)
+                if on_progress:
+                    on_progress(chunk)
         except Exception as e:
-            return f"Excel 파일 읽기 오류: {str(e)}"
+            raise ExtractionError(f"Excel 파일 읽기 오류: {str(e)}") from e
+        
+        if status is not None and any(sheet['truncated'] for sheet in excel_status['sheets']):
+            status['complete'] = False
+        return "".join(parts)
     
-    def _analyze_image(self, file_path: str) -> str:
+    def _analyze_image(self, file_path: str, status: Optional[Dict] = None) -> str:
         """이미지 파일 분석 (OCR)"""
+        status = status if status is not None else {}
         try:
-            image = Image.open(file_path)
-            
-            if not OCR_AVAILABLE:
-                return f"이미지 파일이 업로드되었습니다. (OCR 기능을 사용하려면 pytesseract를 설치하세요)\n파일명: {os.path.basename(file_path)}\n파일 크기: {os.path.getsize(file_path)} bytes"
+            from PIL import Image
             
-            # OCR 수행
-            try:
-                text = pytesseract.image_to_string(image, lang='kor+eng')
-                if text.strip():
-                    return f"이미지에서 추출된 텍스트:\n{text}"
-                else:
-                    return "이미지에서 텍스트를 추출할 수 없습니다."
-            except Exception as ocr_error:
-                return f"OCR 처리 중 오류: {str(ocr_error)}\n이미지 파일이 업로드되었습니다."
-                
+            # 이미지 파일인지 먼저 확인
+            Image.open(file_path).close()
         except Exception as e:
-            return f"이미지 읽기 오류: {str(e)}"
+            raise ExtractionError(f"이미지 읽기 오류: {str(e)}") from e
+        
+        if not OCR_AVAILABLE:
+            # OCR을 설치한 뒤 다시 올리면 텍스트를 추출하도록 저장하지 않음
+            status['complete'] = False
+            return f"이미지 파일이 업로드되었습니다. (OCR 기능을 사용하려면 pytesseract를 설치하세요)\n파일명: {os.path.basename(file_path)}\n파일 크기: {os.path.getsize(file_path)} bytes"
+        
+        # OCR 수행
+        try:
+            result = self.ocr_pipeline.extract_text(file_path)
+        except Exception as ocr_error:
+            raise ExtractionError(f"OCR 처리 중 오류: {str(ocr_error)}") from ocr_error
+        text = result['text']
+        if result['total_frames'] > result['frames']:
+            status['complete'] = False
+            text += f"\n\n(전체 {result['total_frames']}프레임 중 {result['frames']}프레임만 처리했습니다.)"
+        if result['text'].strip():
+            return f"이미지에서 추출된 텍스트:\n{text}"
+        else:
+            return "이미지에서 텍스트를 추출할 수 없습니다."
     
     def get_file_summary(self, file_info: Dict) -> str:
         """파일 정보 요약"""
@@ -182,18 +368,14 @@ class FileAnalyzer:
 """
         return summary
     
-    def cleanup_files(self, max_age_hours: int = 24):
-        """오래된 파일 정리"""
-        import time
-        current_time = time.time()
+    def cleanup_files(self, max_age_hours: Optional[float] = None):
+        """
+        오래된 파일 정리
         
-        for filename in os.listdir(self.upload_dir):
-            file_path = os.path.join(self.upload_dir, filename)
-            file_age = current_time - os.path.getmtime(file_path)
-            
-            if file_age > max_age_hours * 3600:  # 시간을 초로 변환
-                try:
-                    os.remove(file_path)
-                    print(f"삭제된 파일: {filename}")
-                except Exception as e:
-                    print(f"파일 삭제 실패: {filename}, 오류: {e}")
+        업로드 저장소의 정책(보관 기간, 크기 예산)에 따라 업로드 파일과 분석 결과를 함께 정리합니다.
+        
+        Args:
+            max_age_hours: 보관 기간 (기본값: 생성 시 지정한 값)
+        """
+        for filename in self.store.cleanup(max_age_hours):
+            print(f"삭제된 파일: {filename}")
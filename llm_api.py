@@ -1,44 +1,337 @@
-from openai import OpenAI
+import asyncio
+import threading
 import time
-from config import OPENAI_API_KEY
+from config import (OPENAI_API_KEY, LLM_MODEL, LLM_CACHE_ENABLED, LLM_CACHE_TTL,
+                    LLM_CACHE_MAX_ENTRIES, LLM_CACHE_DISK_PATH, LLM_CACHE_MAX_DISK_ENTRIES,
+                    LLM_CACHE_CONTEXT_TURNS, LLM_MAX_CONCURRENT_REQUESTS,
+                    LLM_MAX_CONCURRENT_PER_SESSION, LLM_QUEUE_TIMEOUT, LLM_REQUEST_TIMEOUT,
+                    LLM_MAX_CONNECTIONS, LLM_ATTEMPT_TIMEOUT, LLM_MAX_ATTEMPTS,
+                    LLM_RETRY_BASE_DELAY, LLM_RETRY_MAX_DELAY, LLM_HEDGE_PERCENTILE,
+                    LLM_HEDGE_MIN_SAMPLES, LLM_BASE_URL, CONTEXT_SUMMARY_MAX_TOKENS)
 from conversation_manager import ConversationManager
+from llm_cache import ResponseCache
+from concurrency import BackgroundEventLoop, ConcurrencyLimiter, SingleFlight
+from resilience import ResilientCaller, AttemptsExhausted, is_retryable_error
+from metrics import Histogram, timed
+from tracing import span
 
-# OpenAI 클라이언트 초기화
-client = OpenAI(api_key=OPENAI_API_KEY)
+# OpenAI 클라이언트 (스트리밍 경로. 재시도는 SDK의 백오프를 사용).
+# openai SDK는 불러오는 데 오래 걸리므로 처음 LLM을 호출할 때 불러와 생성 (규칙 응답만 쓰면 불러오지 않음)
+_client = None
+_client_lock = threading.Lock()
 
-def get_llm_response(prompt, conversation_manager: ConversationManager = None):
+# 비동기 호출 경로: 하나의 이벤트 루프와 연결 풀에서 모든 LLM 요청을 처리
+llm_event_loop = BackgroundEventLoop(name="llm-event-loop")
+llm_limiter = ConcurrencyLimiter(
+    max_concurrent=LLM_MAX_CONCURRENT_REQUESTS,
+    max_per_session=LLM_MAX_CONCURRENT_PER_SESSION,
+    queue_timeout=LLM_QUEUE_TIMEOUT
+)
+# 컨텍스트 없는 같은 질문이 동시에 들어오면 API 요청 하나를 함께 사용
+llm_single_flight = SingleFlight()
+_async_client = None
+
+def _is_retryable_llm_error(error):
+    """연결 오류와 시간 초과, 408/409/429/5xx 응답만 재시도"""
+    from openai import APIConnectionError
+    return isinstance(error, APIConnectionError) or is_retryable_error(error)
+
+# 시도별 제한 시간, 지터가 있는 지수 백오프 재시도, 선택적 헤지 요청
+llm_caller = ResilientCaller(
+    attempt_timeout=LLM_ATTEMPT_TIMEOUT,
+    total_timeout=LLM_REQUEST_TIMEOUT,
+    max_attempts=LLM_MAX_ATTEMPTS,
+    base_delay=LLM_RETRY_BASE_DELAY,
+    max_delay=LLM_RETRY_MAX_DELAY,
+    hedge_percentile=LLM_HEDGE_PERCENTILE,
+    hedge_min_samples=LLM_HEDGE_MIN_SAMPLES,
+    retryable=_is_retryable_llm_error
+)
+
+# 같은 모델, 같은 질문, 같은 컨텍스트에 대한 응답 캐시
+response_cache = ResponseCache(
+    max_entries=LLM_CACHE_MAX_ENTRIES,
+    ttl=LLM_CACHE_TTL,
+    disk_path=LLM_CACHE_DISK_PATH,
+    max_disk_entries=LLM_CACHE_MAX_DISK_ENTRIES
+) if LLM_CACHE_ENABLED else None
+
+# 업스트림 응답 시간은 재시도와 헤지를 포함하고 동시 요청 슬롯 대기는 제외
+LLM_UPSTREAM_SECONDS = Histogram("chatbot_llm_upstream_seconds", "LLM API 응답 시간 (재시도 포함)",
+                                 ("operation", "outcome"))
+LLM_FIRST_TOKEN_SECONDS = Histogram("chatbot_llm_first_token_seconds", "스트리밍 응답의 첫 토큰까지 걸린 시간")
+LLM_QUEUE_WAIT_SECONDS = Histogram("chatbot_llm_queue_wait_seconds", "LLM 동시 요청 슬롯 대기 시간")
+
+def _build_messages(prompt, conversation_manager: ConversationManager = None, reference: str = None):
+    """
+    (컨텍스트 메시지, API에 보낼 메시지) 반환. 대화 히스토리가 있으면 컨텍스트로 사용
+    
+    참고 자료(reference)는 질문 바로 앞의 시스템 메시지로 보내므로 캐시 키에는 포함되지만
+    대화 히스토리에는 질문만 기록됩니다.
+    """
+    if conversation_manager:
+        context_messages = conversation_manager.get_context_for_llm()
+    else:
+        context_messages = []
+    if reference:
+        context_messages = context_messages + [{"role": "system", "content": reference}]
+    return context_messages, context_messages + [{"role": "user", "content": prompt}]
+
+def _get_cache_key(prompt, context_messages, use_cache: bool):
+    """응답 캐시 키 반환 (캐시를 사용하지 않는 질문이면 None)"""
+    if not response_cache or not use_cache:
+        return None
+    if context_messages and not LLM_CACHE_CONTEXT_TURNS:
+        return None
+    return ResponseCache.make_key(LLM_MODEL, prompt, context_messages)
+
+def _record_turn(conversation_manager, prompt, response_content, response_time, source):
+    """질문과 응답을 대화 히스토리에 추가"""
+    if conversation_manager:
+        conversation_manager.add_message("user", prompt, response_time, source)
+        conversation_manager.add_message("assistant", response_content, response_time, source)
+
+def get_llm_response(prompt, conversation_manager: ConversationManager = None, use_cache: bool = True,
+                     reference: str = None):
     """
     LLM API를 통해 응답 생성
     
+    동기 코드(Flask 요청 스레드, CLI)에서 호출하며, 요청은 공용 이벤트 루프의
+    비동기 호출 경로(get_llm_response_async)에서 실행되므로 연결 풀, 동시 요청 제한,
+    재시도와 제한 시간을 모든 호출자가 공유합니다.
+    
     Args:
         prompt: 사용자 입력
         conversation_manager: 대화 히스토리 관리자 (선택사항)
+        use_cache: 응답 캐시 사용 여부 (컨텍스트에 민감한 질문은 False로 호출)
+        reference: 질문과 함께 보낼 참고 자료 (예: 업로드 문서에서 검색한 조각)
+    """
+    # 이벤트 루프에서 실행되는 코루틴도 호출한 스레드의 contextvars를 이어받으므로 하위 구간이 이 구간 아래에 기록됨
+    with span("llm.request"):
+        return llm_event_loop.run(get_llm_response_async(prompt, conversation_manager, use_cache, reference))
+
+def stream_llm_response(prompt, conversation_manager: ConversationManager = None, use_cache: bool = True,
+                        reference: str = None):
+    """
+    LLM API 스트리밍 응답을 토큰 조각 단위로 반환하는 제너레이터
+    
+    스트림이 끝나거나 중간에 취소(제너레이터 close)되면 그때까지 받은 응답을
+    대화 히스토리에 기록합니다. 끝까지 받은 응답만 캐시에 저장합니다.
+    스트림을 받는 동안 llm_limiter 슬롯을 사용하므로 비동기 호출과 같은 동시 요청 제한을 받습니다.
+    
+    Args:
+        prompt: 사용자 입력
+        conversation_manager: 대화 히스토리 관리자 (선택사항)
+        use_cache: 응답 캐시 사용 여부
+        reference: 질문과 함께 보낼 참고 자료
     """
     start_time = time.time()
+    chunks = []
+    completed = False
+    failed = False
+    stream = None
+    upstream_start = None
     
     try:
-        # 대화 히스토리가 있으면 컨텍스트로 사용
-        if conversation_manager:
-            context_messages = conversation_manager.get_context_for_llm()
-            messages = context_messages + [{"role": "user", "content": prompt}]
-        else:
-            messages = [{"role": "user", "content": prompt}]
+        context_messages, messages = _build_messages(prompt, conversation_manager, reference)
         
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",  # 또는 gpt-4
-            messages=messages
+        cache_key = _get_cache_key(prompt, context_messages, use_cache)
+        if cache_key:
+            cached_response = response_cache.get(cache_key)
+            if cached_response is not None:
+                _record_turn(conversation_manager, prompt, cached_response,
+                             time.time() - start_time, "llm_cache")
+                yield cached_response
+                return
+        
+        # 스트림이 끝날 때까지 비동기 호출과 같은 llm_limiter 슬롯을 잡아 둠
+        session_key = conversation_manager.session_id if conversation_manager else None
+        wait_start = time.perf_counter()
+        with llm_limiter.acquire_sync(llm_event_loop, session_key):
+            queue_wait = time.perf_counter() - wait_start
+            LLM_QUEUE_WAIT_SECONDS.observe(queue_wait)
+            with span("llm.stream", queue_wait_ms=round(queue_wait * 1000, 1)) as stream_span:
+                upstream_start = time.perf_counter()
+                stream = _get_client().chat.completions.create(
+                    model=LLM_MODEL,
+                    messages=messages,
+                    stream=True
+                )
+                
+                for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        if not chunks:
+                            first_token = time.perf_counter() - upstream_start
+                            LLM_FIRST_TOKEN_SECONDS.observe(first_token)
+                            if stream_span:
+                                stream_span.set(first_token_ms=round(first_token * 1000, 1))
+                        chunks.append(delta)
+                        yield delta
+                completed = True
+        
+        if cache_key:
+            response_cache.put(cache_key, "".join(chunks))
+        
+    except Exception as e:
+        failed = True
+        print(f"LLM API 호출 중 오류 발생: {e}")
+        error_message = f"죄송합니다. 오류가 발생했습니다: {str(e)}"
+        if not chunks:
+            yield error_message
+    
+    finally:
+        if stream is not None and not completed:
+            stream.close()
+        if upstream_start is not None:
+            outcome = "ok" if completed else "error" if failed else "cancelled"
+            LLM_UPSTREAM_SECONDS.labels("stream", outcome).observe(time.perf_counter() - upstream_start)
+        # 완료되었거나 취소되기 전까지 받은 응답을 기록
+        if chunks:
+            _record_turn(conversation_manager, prompt, "".join(chunks),
+                         time.time() - start_time, "llm_api")
+
+def _get_client():
+    """동기(스트리밍) 클라이언트 반환 (처음 호출할 때 openai SDK를 불러와 생성)"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            from openai import OpenAI
+            _client = OpenAI(api_key=OPENAI_API_KEY, base_url=LLM_BASE_URL,
+                             timeout=LLM_ATTEMPT_TIMEOUT, max_retries=LLM_MAX_ATTEMPTS - 1)
+        return _client
+
+def _get_async_client():
+    """비동기 클라이언트 반환 (연결 풀이 이벤트 루프에 묶이므로 루프 안에서 처음 만들어짐)"""
+    global _async_client
+    if _async_client is None:
+        from openai import AsyncOpenAI
+        # httpx는 openai SDK의 의존성으로 함께 설치됨 (지원 경로).
+        # httpx2 위에서 동작하는 SDK가 설치된 환경이면 그쪽을 사용
+        try:
+            import httpx2 as httpx
+        except ImportError:
+            import httpx
+        # 재시도와 제한 시간은 llm_caller가 담당하므로 SDK 자체 재시도는 끔
+        _async_client = AsyncOpenAI(
+            api_key=OPENAI_API_KEY,
+            base_url=LLM_BASE_URL,
+            timeout=LLM_ATTEMPT_TIMEOUT,
+            max_retries=0,
+            http_client=httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=LLM_MAX_CONNECTIONS,
+                                    max_keepalive_connections=LLM_MAX_CONNECTIONS),
+                timeout=LLM_ATTEMPT_TIMEOUT
+            )
         )
+    return _async_client
+
+async def get_llm_response_async(prompt, conversation_manager: ConversationManager = None,
+                                 use_cache: bool = True, reference: str = None):
+    """
+    LLM API를 비동기로 호출하여 응답 생성
+    
+    전역/세션별 동시 요청 수는 llm_limiter로 제한되며, 요청은 llm_caller를 통해
+    시도별 제한 시간, 백오프 재시도, 헤지 요청이 적용됩니다. 슬롯을 기다리는 시간이나
+    전체 요청 시간이 제한을 넘으면 오류 메시지를 반환합니다.
+    대화 컨텍스트가 없는 질문은 진행 중인 같은(정규화 기준) 질문의 요청 결과를 함께 받습니다.
+    
+    Args:
+        prompt: 사용자 입력
+        conversation_manager: 대화 히스토리 관리자 (선택사항)
+        use_cache: 응답 캐시 사용 여부
+        reference: 질문과 함께 보낼 참고 자료
+    """
+    start_time = time.time()
+    
+    try:
+        context_messages, messages = _build_messages(prompt, conversation_manager, reference)
         
-        response_content = response.choices[0].message.content
+        # 디스크 캐시(SQLite)와 대화 기록 저장은 동기 I/O이므로 공용 이벤트 루프를 막지 않도록 스레드에서 실행
+        cache_key = _get_cache_key(prompt, context_messages, use_cache)
+        if cache_key:
+            cached_response = await asyncio.to_thread(response_cache.get, cache_key)
+            if cached_response is not None:
+                await asyncio.to_thread(_record_turn, conversation_manager, prompt, cached_response,
+                                        time.time() - start_time, "llm_cache")
+                return cached_response
+        
+        session_key = conversation_manager.session_id if conversation_manager else None
+        
+        async def request_completion():
+            wait_start = time.perf_counter()
+            async with llm_limiter.acquire(session_key):
+                queue_wait = time.perf_counter() - wait_start
+                LLM_QUEUE_WAIT_SECONDS.observe(queue_wait)
+                wait_ms = round(queue_wait * 1000, 1)
+                with span("llm.upstream", queue_wait_ms=wait_ms), timed(LLM_UPSTREAM_SECONDS, "completion"):
+                    response = await llm_caller.call(
+                        lambda: _get_async_client().chat.completions.create(model=LLM_MODEL, messages=messages))
+            return response.choices[0].message.content
+        
+        if use_cache and not context_messages:
+            # 세션별 컨텍스트가 없으면 응답이 호출자와 무관하므로 진행 중인 같은 질문과 합침
+            flight_key = ResponseCache.make_key(LLM_MODEL, prompt, [])
+            response_content = await llm_single_flight.do(flight_key, request_completion)
+        else:
+            response_content = await request_completion()
         response_time = time.time() - start_time
         
-        # 대화 히스토리에 추가
-        if conversation_manager:
-            conversation_manager.add_message("user", prompt, response_time, "llm_api")
-            conversation_manager.add_message("assistant", response_content, response_time, "llm_api")
+        if cache_key:
+            await asyncio.to_thread(response_cache.put, cache_key, response_content)
+        
+        await asyncio.to_thread(_record_turn, conversation_manager, prompt, response_content,
+                                response_time, "llm_api")
         
         return response_content
         
+    except asyncio.TimeoutError:
+        print("LLM API 호출 시간 초과")
+        return "죄송합니다. 응답 시간이 초과되었습니다. 잠시 후 다시 시도해주세요."
+    except AttemptsExhausted as e:
+        print(f"LLM API 호출 재시도 실패: {e.__cause__}")
+        return f"죄송합니다. 오류가 발생했습니다: {str(e.__cause__)}"
     except Exception as e:
         print(f"LLM API 호출 중 오류 발생: {e}")
-        return f"죄송합니다. 오류가 발생했습니다: {str(e)}"
\ No newline at end of file
+        return f"죄송합니다. 오류가 발생했습니다: {str(e)}"
+
+async def summarize_context_async(previous_summary, messages):
+    """
+    이전 요약과 새로 밀려난 대화를 합쳐 새 누적 요약 생성
+    
+    대화 기록에는 남기지 않으며, 실패하면 예외를 그대로 전달합니다 (다음 요약 때 다시 시도).
+    
+    Args:
+        previous_summary: 지금까지의 누적 요약 (없으면 빈 문자열)
+        messages: 요약에 새로 합칠 메시지 목록
+    """
+    lines = [f"{'사용자' if message['role'] == 'user' else '봇'}: {message['content']}"
+             for message in messages]
+    request_messages = [
+        {"role": "system", "content": "당신은 대화 요약기입니다. 이전 요약과 이어지는 대화를 합쳐, "
+                                      "이후 대화에 필요한 사실, 사용자의 요청과 선호, 결정된 내용을 "
+                                      "빠짐없이 담은 간결한 한국어 요약 하나로 작성하세요."},
+        {"role": "user", "content": f"이전 요약:\n{previous_summary or '(없음)'}\n\n"
+                                    f"이어지는 대화:\n" + "\n".join(lines)}
+    ]
+    async with llm_limiter.acquire():
+        with timed(LLM_UPSTREAM_SECONDS, "summary"):
+            response = await llm_caller.call(lambda: _get_async_client().chat.completions.create(
+                model=LLM_MODEL, messages=request_messages, max_tokens=CONTEXT_SUMMARY_MAX_TOKENS))
+    return response.choices[0].message.content
+
+def summarize_context(previous_summary, messages):
+    """ContextCompactor 작업 스레드에서 사용하는 동기 요약 함수"""
+    return llm_event_loop.run(summarize_context_async(previous_summary, messages))
+
+def get_llm_stats():
+    """LLM 호출 동시 실행, 재시도/헤지, 요청 합치기, 응답 캐시 통계와 최근 시도 기록"""
+    return {
+        "concurrency": llm_limiter.stats(),
+        "attempts": llm_caller.stats(),
+        "recent_attempts": llm_caller.recent_attempts(),
+        "coalescing": llm_single_flight.stats(),
+        "cache": response_cache.stats() if response_cache else None
+    }
@@ -0,0 +1,164 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+
+def normalize_prompt(prompt: str) -> str:
+    """캐시 키용 프롬프트 정규화 (유니코드 정규화, 공백 정리, 소문자화)"""
+    prompt = unicodedata.normalize("NFKC", prompt)
+    return re.sub(r"\s+", " ", prompt).strip().lower()
+
+
+def hash_context(context_messages: List[Dict]) -> str:
+    """컨텍스트 메시지 목록의 해시"""
+    payload = json.dumps([[m["role"], m["content"]] for m in context_messages], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    LLM 응답 캐시
+
+    메모리 LRU 캐시를 먼저 확인하고, 디스크 경로가 주어지면 재시작 후에도 남는
+    SQLite 기반 2차 캐시를 확인합니다. 키는 모델, 정규화된 프롬프트, 컨텍스트 해시로 만듭니다.
+    """
+
+    def __init__(self, max_entries: int = 1000, ttl: Optional[float] = 3600,
+                 disk_path: Optional[str] = None, max_disk_entries: int = 10000):
+        """
+        Args:
+            max_entries: 메모리에 보관할 최대 응답 수
+            ttl: 응답 유효 시간 (초, None이면 만료 없음)
+            disk_path: 디스크 캐시 파일 경로 (None이면 메모리 캐시만 사용)
+            max_disk_entries: 디스크에 보관할 최대 응답 수
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_disk_entries = max_disk_entries
+
+        # 키 -> (응답, 저장 시각). 앞쪽이 가장 오래 전 사용
+        self._memory: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        # 디스크 캐시는 처음 조회/저장할 때 열어 캐시를 만들기만 하는 프로세스(CLI 등)는 파일을 만들지 않음
+        self.disk_path = disk_path
+        self._conn = None
+        self._disk_puts = 0
+
+    def _disk(self) -> Optional[sqlite3.Connection]:
+        """디스크 캐시 연결 (처음 사용할 때 생성, 디스크 캐시를 쓰지 않으면 None. 잠금 안에서 호출)"""
+        if self._conn is None and self.disk_path:
+            disk_dir = os.path.dirname(self.disk_path)
+            if disk_dir and not os.path.exists(disk_dir):
+                os.makedirs(disk_dir)
+            conn = sqlite3.connect(self.disk_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS responses ("
+                    "key TEXT PRIMARY KEY, response TEXT NOT NULL, created_at REAL NOT NULL)")
+                conn.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_responses_created_at ON responses (created_at)")
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def make_key(model: str, prompt: str, context_messages: List[Dict]) -> str:
+        """캐시 키 생성"""
+        payload = json.dumps([model, normalize_prompt(prompt), hash_context(context_messages)],
+                             ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return self.ttl is not None and now - created_at > self.ttl
+
+    def get(self, key: str) -> Optional[str]:
+        """캐시된 응답 반환 (없거나 만료되면 None)"""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if not self._expired(entry[1], now):
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    return entry[0]
+                del self._memory[key]
+
+            conn = self._disk()
+            if conn is not None:
+                row = conn.execute(
+                    "SELECT response, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+                if row is not None and not self._expired(row[1], now):
+                    # 디스크에서 찾은 응답은 메모리 캐시로 올림
+                    self._store_memory(key, row[0], row[1])
+                    self.disk_hits += 1
+                    return row[0]
+
+            self.misses += 1
+            return None
+
+    def put(self, key: str, response: str) -> None:
+        """응답 저장"""
+        now = time.time()
+        with self._lock:
+            self._store_memory(key, response, now)
+            conn = self._disk()
+            if conn is not None:
+                with conn:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO responses (key, response, created_at) VALUES (?, ?, ?)",
+                        (key, response, now))
+                self._disk_puts += 1
+                # 크기 제한과 만료 정리는 가끔씩만 수행
+                if self._disk_puts % 100 == 0:
+                    self._prune_disk(now)
+
+    def _store_memory(self, key: str, response: str, created_at: float) -> None:
+        """메모리 캐시에 저장하고 LRU로 크기 제한 (잠금 안에서 호출)"""
+        self._memory[key] = (response, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _prune_disk(self, now: float) -> None:
+        """디스크 캐시의 만료 항목과 초과 항목 삭제 (잠금 안에서 호출)"""
+        with self._conn:
+            if self.ttl is not None:
+                self._conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl,))
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN (SELECT key FROM responses "
+                "ORDER BY created_at DESC LIMIT -1 OFFSET ?)", (self.max_disk_entries,))
+
+    def clear(self) -> None:
+        """캐시 비우기"""
+        with self._lock:
+            self._memory.clear()
+            conn = self._disk()
+            if conn is not None:
+                with conn:
+                    conn.execute("DELETE FROM responses")
+
+    def stats(self) -> Dict:
+        """캐시 적중/미스 통계"""
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "entries": len(self._memory),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0
+            }
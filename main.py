@@ -1,6 +1,12 @@
 from rule_engine import get_rule_response
-from llm_api import get_llm_response
+from llm_api import get_llm_response, summarize_context
 from conversation_manager import ConversationManager
+from conversation_store import create_store
+from search_index import SearchIndex
+from session_catalog import SessionCatalog
+from context_compactor import ContextCompactor
+from config import (CONTEXT_COMPACTION_ENABLED, CONTEXT_RECENT_TOKENS, CONVERSATION_STORE,
+                    CONVERSATION_DB_PATH, CONTEXT_SUMMARY_BATCH_TOKENS, CONTEXT_SUMMARY_MAX_BATCH_TOKENS)
 import json
 
 def print_conversation_history(conversation_manager):
@@ -35,20 +41,25 @@ def print_conversation_summary(conversation_manager):
     print(f"평균 응답 시간: {summary['avg_response_time']:.2f}초")
     print(f"시작 시간: {summary['start_time']}")
     print(f"종료 시간: {summary['end_time']}")
+    for source, stats in summary['by_source'].items():
+        print(f"  - {source}: 메시지 {stats['messages']}개, 평균 응답 시간 {stats['avg_response_time']:.2f}초")
 
-def search_messages(conversation_manager, keyword):
-    """메시지 검색"""
-    results = conversation_manager.search_messages(keyword)
+def search_messages(conversation_manager, search_index, keyword):
+    """모든 세션의 메시지 검색"""
+    # 아직 저장되지 않은 현재 세션의 메시지도 검색되도록 먼저 기록
+    conversation_manager.flush()
+    search_result = search_index.search(keyword)
+    results = search_result["results"]
     
     if not results:
         print(f"'{keyword}'와 관련된 메시지를 찾을 수 없습니다.")
         return
     
-    print(f"\n=== '{keyword}' 검색 결과 ===")
+    print(f"\n=== '{keyword}' 검색 결과 ({search_result['total']}건 중 {len(results)}건) ===")
     for i, message in enumerate(results, 1):
         role = "사용자" if message["role"] == "user" else "봇"
         timestamp = message["timestamp"][:19]
-        print(f"{i}. [{timestamp}] {role}: {message['content']}")
+        print(f"{i}. [{timestamp}] ({message['session_id']}) {role}: {message['content']}")
 
 def show_available_sessions(conversation_manager):
     """사용 가능한 세션 목록 표시"""
@@ -67,7 +78,17 @@ def chatbot():
     print("특별 명령어: '히스토리', '요약', '검색 [키워드]', '초기화', '도움말'")
     
     # 대화 히스토리 관리자 초기화
-    conversation_manager = ConversationManager(max_history=100, save_to_file=True)
+    search_index = SearchIndex()
+    compactor = ContextCompactor(summarize_context) if CONTEXT_COMPACTION_ENABLED else None
+    store = create_store(CONVERSATION_STORE, db_path=CONVERSATION_DB_PATH)
+    conversation_manager = ConversationManager(max_history=100, save_to_file=True,
+                                               search_index=search_index,
+                                               catalog=SessionCatalog(),
+                                               compactor=compactor,
+                                               context_recent_tokens=CONTEXT_RECENT_TOKENS,
+                                               context_summary_batch_tokens=CONTEXT_SUMMARY_BATCH_TOKENS,
+                                               context_summary_max_batch_tokens=CONTEXT_SUMMARY_MAX_BATCH_TOKENS,
+                                               store=store)
     
     while True:
         user_input = input("You: ")
@@ -86,7 +107,7 @@ def chatbot():
         elif user_input.startswith("검색 "):
             keyword = user_input[3:].strip()
             if keyword:
-                search_messages(conversation_manager, keyword)
+                search_messages(conversation_manager, search_index, keyword)
             else:
                 print("검색할 키워드를 입력해주세요. 예: '검색 안녕'")
             continue
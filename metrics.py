@@ -0,0 +1,261 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# 요청 하나에서 지표 기록에 쓸 수 있는 시간 예산 (초).
+# 관측 한 번(잠금 + 버킷 이분 탐색)은 1~2µs이고 LLM까지 가는 채팅 요청 하나는 8번 안팎 기록하므로
+# (단일 코어에서 측정 약 20µs) LLM 호출이 없는 규칙 응답(1ms 미만)에서도 5% 남짓입니다.
+# benchmarks/bench_metrics.py와 test_metrics.py에서 확인합니다.
+OVERHEAD_BUDGET_SECONDS = 50e-6
+
+# 밀리초 단위 규칙 매칭부터 수십 초 걸리는 LLM 호출, 파일 추출까지 담는 기본 버킷 (초)
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+# 규칙 매칭, 컨텍스트 생성처럼 수십 µs에 끝나는 단계용 버킷 (초)
+FAST_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+                0.01, 0.025, 0.05, 0.1)
+
+
+def _escape_help(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _escape(value: str) -> str:
+    """레이블 값 이스케이프 (역슬래시, 줄바꿈, 큰따옴표)"""
+    return _escape_help(value).replace('"', '\\"')
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str]) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+class Registry:
+    """지표 모음. render()로 Prometheus 텍스트 형식(0.0.4) 출력"""
+
+    def __init__(self):
+        self._metrics: Dict[str, "_Metric"] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: "_Metric") -> None:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"이미 등록된 지표입니다: {metric.name}")
+            self._metrics[metric.name] = metric
+
+    def get(self, name: str) -> Optional["_Metric"]:
+        with self._lock:
+            return self._metrics.get(name)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {_escape_help(metric.documentation)}")
+            lines.append(f"# TYPE {metric.name} {metric.metric_type}")
+            try:
+                lines.extend(metric.collect())
+            except Exception as e:
+                # 값을 읽지 못한 지표 하나 때문에 전체 출력이 실패하지 않도록 함
+                lines.append(f"# {metric.name} 수집 오류: {_escape_help(e)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+class _Metric(ABC):
+    """레이블별 값(child)을 가진 지표의 공통 부분"""
+
+    metric_type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 registry: Optional[Registry] = REGISTRY):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        if registry is not None:
+            registry.register(self)
+
+    def labels(self, *values) -> object:
+        """레이블 값에 해당하는 child 반환 (처음 쓰는 조합이면 생성)"""
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name}: 레이블 {self.labelnames}의 값이 필요합니다")
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    @abstractmethod
+    def _new_child(self):
+        """레이블 조합 하나의 값을 담는 child 생성"""
+
+    def _items(self):
+        with self._lock:
+            return sorted(self._children.items())
+
+    @abstractmethod
+    def collect(self) -> List[str]:
+        """노출 형식의 값 줄 목록"""
+
+
+class _CounterChild:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+
+class Counter(_Metric):
+    """증가만 하는 누적 값"""
+
+    metric_type = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        """레이블이 없는 지표의 값 증가"""
+        self.labels().inc(amount)
+
+    def collect(self) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(child.value)}"
+                for key, child in self._items()]
+
+
+class _Timer:
+    """with 블록의 실행 시간을 히스토그램에 기록"""
+
+    __slots__ = ("_child", "_start")
+
+    def __init__(self, child: "_HistogramChild"):
+        self._child = child
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._child.observe(time.perf_counter() - self._start)
+        return False
+
+
+class _HistogramChild:
+    __slots__ = ("upper_bounds", "counts", "sum", "_lock")
+
+    def __init__(self, upper_bounds: Tuple[float, ...]):
+        self.upper_bounds = upper_bounds
+        self.counts = [0] * (len(upper_bounds) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect_left(self.upper_bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    def time(self) -> _Timer:
+        return _Timer(self)
+
+
+class Histogram(_Metric):
+    """
+    값의 분포 (버킷별 누적 개수, 합계, 개수)
+
+    버킷별 개수만 저장하므로 관측 수와 관계없이 메모리가 일정합니다.
+    """
+
+    metric_type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS, registry: Optional[Registry] = REGISTRY):
+        self.upper_bounds = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self):
+        return _HistogramChild(self.upper_bounds)
+
+    def observe(self, value: float) -> None:
+        """레이블이 없는 지표에 값 기록"""
+        self.labels().observe(value)
+
+    def time(self) -> _Timer:
+        """레이블이 없는 지표에 with 블록의 실행 시간 기록"""
+        return self.labels().time()
+
+    def collect(self) -> List[str]:
+        lines = []
+        for key, child in self._items():
+            with child._lock:
+                counts = list(child.counts)
+                total = child.sum
+            cumulative = 0
+            for bound, count in zip(self.upper_bounds + (float("inf"),), counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames + ("le",), key + (_format_value(float(bound)),))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class CallbackMetric(_Metric):
+    """
+    출력할 때 함수를 호출해 값을 읽는 지표
+
+    캐시 적중/미스처럼 다른 객체가 이미 세고 있는 값을 중복 기록 없이 내보낼 때 사용합니다.
+    함수는 {레이블 값 튜플: 값}을 반환합니다.
+    """
+
+    def __init__(self, name: str, documentation: str, metric_type: str,
+                 func: Callable[[], Dict[Tuple[str, ...], float]], labelnames: Tuple[str, ...] = (),
+                 registry: Optional[Registry] = REGISTRY):
+        self.metric_type = metric_type
+        self.func = func
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self):
+        raise TypeError(f"{self.name}: 콜백 지표는 값을 함수에서 읽으므로 labels()로 기록할 수 없습니다")
+
+    def collect(self) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(float(value))}"
+                for key, value in sorted(self.func().items())]
+
+
+@contextmanager
+def timed(histogram: Histogram, *labels):
+    """
+    with 블록의 실행 시간을 결과 레이블과 함께 기록
+
+    히스토그램의 마지막 레이블은 결과이며, 블록이 정상 종료하면 "ok", 예외가 나면 "error"입니다.
+    """
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    finally:
+        histogram.labels(*labels, outcome).observe(time.perf_counter() - start)
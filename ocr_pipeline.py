@@ -0,0 +1,233 @@
+import hashlib
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from PIL import Image, ImageOps, ImageSequence
+
+from llm_cache import ResponseCache
+
+# 이미지 전처리 방식을 바꾸면 이전 캐시 결과를 쓰지 않도록 캐시 키에 포함
+PIPELINE_VERSION = "1"
+
+
+def _otsu_threshold(histogram: List[int]) -> int:
+    """회색조 히스토그램에서 두 집단(글자/배경)의 분산이 가장 크게 나뉘는 임계값 (Otsu)"""
+    total = sum(histogram)
+    sum_all = sum(value * count for value, count in enumerate(histogram))
+    weight_bg = 0
+    sum_bg = 0
+    best, threshold = 0.0, 128
+    for value, count in enumerate(histogram):
+        weight_bg += count
+        if weight_bg == 0:
+            continue
+        weight_fg = total - weight_bg
+        if weight_fg == 0:
+            break
+        sum_bg += value * count
+        mean_bg = sum_bg / weight_bg
+        mean_fg = (sum_all - sum_bg) / weight_fg
+        between = weight_bg * weight_fg * (mean_bg - mean_fg) ** 2
+        if between > best:
+            best, threshold = between, value
+    return threshold
+
+
+def preprocess_image(image: Image.Image, max_side: int = 2000, min_side: int = 800,
+                     binarize: bool = True) -> Image.Image:
+    """
+    OCR 전에 해상도와 색을 정규화
+
+    촬영 방향(EXIF)을 적용하고, 투명 배경은 흰색으로 채운 뒤 회색조로 바꿉니다.
+    긴 변이 max_side보다 크면 줄이고 min_side보다 작으면 키운 다음, 대비를 늘리고
+    Otsu 임계값으로 흑백으로 만듭니다. 어두운 배경이 대부분이면 밝은 배경으로 뒤집습니다.
+    """
+    image = ImageOps.exif_transpose(image)
+    if image.mode in ("RGBA", "LA", "P"):
+        image = image.convert("RGBA")
+        background = Image.new("RGBA", image.size, "white")
+        image = Image.alpha_composite(background, image)
+    image = image.convert("L")
+
+    longest = max(image.size)
+    scale = 1.0
+    if longest > max_side:
+        scale = max_side / longest
+    elif longest < min_side:
+        scale = min(min_side / longest, 4.0)
+    if scale != 1.0:
+        size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+        image = image.resize(size, Image.LANCZOS)
+
+    image = ImageOps.autocontrast(image)
+    if binarize:
+        threshold = _otsu_threshold(image.histogram())
+        image = image.point([0 if value <= threshold else 255 for value in range(256)])
+        if image.histogram()[0] > image.width * image.height / 2:
+            image = ImageOps.invert(image)
+    return image
+
+
+def split_strips(image: Image.Image, strip_height: int = 600, overlap: int = 40) -> List[Tuple[int, int]]:
+    """
+    이미지를 가로 전체 폭의 띠로 나눈 (위, 아래) 좌표 목록
+
+    글자 줄이 잘리지 않도록 목표 높이 근처에서 가장 밝은(글자가 가장 적은) 행을 경계로 고르고,
+    그래도 걸친 줄은 양쪽 띠에 모두 들어가도록 경계 위아래로 overlap만큼 겹칩니다.
+    """
+    height = image.height
+    if height <= strip_height + overlap:
+        return [(0, height)]
+
+    cuts = [0]
+    while height - cuts[-1] > strip_height + overlap:
+        target = cuts[-1] + strip_height
+        low = target - strip_height // 4
+        # 행마다 평균 밝기: 폭을 1로 줄이면 각 행의 평균 픽셀 값이 남음
+        rows = image.crop((0, low, image.width, target)).resize((1, target - low), Image.BOX).tobytes()
+        cuts.append(low + max(range(len(rows)), key=lambda index: (rows[index], index)))
+    cuts.append(height)
+    return [(max(0, top - overlap), min(height, bottom + overlap)) for top, bottom in zip(cuts, cuts[1:])]
+
+
+def merge_strip_texts(texts: List[str], max_overlap_lines: int = 3) -> str:
+    """띠별 OCR 결과를 이어 붙이며 겹친 영역에서 두 번 읽힌 줄 제거"""
+    lines: List[str] = []
+    for text in texts:
+        new_lines = [line for line in text.splitlines() if line.strip()]
+        for count in range(min(max_overlap_lines, len(lines), len(new_lines)), 0, -1):
+            if lines[-count:] == new_lines[:count]:
+                new_lines = new_lines[count:]
+                break
+        lines.extend(new_lines)
+    return "\n".join(lines)
+
+
+def iter_frames(image: Image.Image, max_frames: Optional[int] = None) -> Iterator[Image.Image]:
+    """이미지의 모든 프레임 (GIF 등 여러 프레임 이미지, 최대 max_frames개)"""
+    for index, frame in enumerate(ImageSequence.Iterator(image)):
+        if max_frames is not None and index >= max_frames:
+            return
+        yield frame.copy()
+
+
+class OcrPipeline:
+    """
+    이미지 전처리, 띠 분할, 병렬 OCR, 결과 캐시를 묶은 OCR 처리기
+
+    큰 사진은 해상도를 줄이고 흑백으로 만든 뒤 겹치는 가로 띠로 나눠 동시에 OCR합니다.
+    pytesseract는 호출마다 tesseract 프로세스를 띄우므로 스레드 풀로도 여러 코어를 사용합니다.
+    GIF는 모든 프레임을 처리하고, 전처리한 이미지의 해시로 결과를 캐시하여
+    같은 이미지(같은 프레임이 반복되는 GIF 포함)는 다시 OCR하지 않습니다.
+    """
+
+    def __init__(self, lang: str = "kor+eng", max_side: int = 2000, strip_height: int = 600,
+                 strip_overlap: int = 40, max_workers: Optional[int] = None,
+                 max_frames: Optional[int] = 20, cache_path: Optional[str] = None,
+                 cache_entries: int = 200):
+        """
+        Args:
+            lang: tesseract 언어
+            max_side: 전처리 후 이미지 긴 변의 최대 길이 (픽셀)
+            strip_height: OCR 한 번에 처리할 띠 높이 (픽셀)
+            strip_overlap: 띠 경계 위아래로 겹치는 높이 (픽셀)
+            max_workers: 동시에 실행할 OCR 수 (기본값: CPU 코어 수)
+            max_frames: 여러 프레임 이미지에서 처리할 최대 프레임 수 (None이면 전체)
+            cache_path: OCR 결과 디스크 캐시 경로 (None이면 메모리 캐시만 사용)
+            cache_entries: 메모리에 보관할 최대 OCR 결과 수
+        """
+        self.lang = lang
+        self.max_side = max_side
+        self.strip_height = strip_height
+        self.strip_overlap = strip_overlap
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_frames = max_frames
+        self.cache_path = cache_path
+        self.cache_entries = cache_entries
+
+        self._cache: Optional[ResponseCache] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_cache(self) -> ResponseCache:
+        """OCR 결과 캐시 (처음 사용할 때 생성)"""
+        with self._lock:
+            if self._cache is None:
+                self._cache = ResponseCache(max_entries=self.cache_entries, ttl=None, disk_path=self.cache_path)
+            return self._cache
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """OCR 스레드 풀 (처음 사용할 때 생성하여 재사용)"""
+        with self._lock:
+            if self._executor is None:
+                # tesseract가 프로세스마다 여러 스레드를 쓰면 띠 단위 병렬 실행과 겹쳐 오히려 느려짐
+                os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="ocr")
+            return self._executor
+
+    def cache_key(self, image: Image.Image) -> str:
+        """전처리한 이미지의 캐시 키 (픽셀, 크기, 언어, 처리 방식의 해시)"""
+        digest = hashlib.sha256()
+        digest.update(f"{PIPELINE_VERSION}|{self.lang}|{image.mode}|{image.width}x{image.height}|".encode("utf-8"))
+        digest.update(image.tobytes())
+        return digest.hexdigest()
+
+    def _ocr(self, image: Image.Image) -> str:
+        import pytesseract
+        return pytesseract.image_to_string(image, lang=self.lang)
+
+    def ocr_image(self, image: Image.Image) -> str:
+        """이미지 한 장(프레임 하나)의 텍스트"""
+        prepared = preprocess_image(image, max_side=self.max_side)
+        cache = self._get_cache()
+        key = self.cache_key(prepared)
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+        boxes = split_strips(prepared, self.strip_height, self.strip_overlap)
+        strips = [prepared.crop((0, top, prepared.width, bottom)) for top, bottom in boxes]
+        if len(strips) == 1 or self.max_workers <= 1:
+            texts = [self._ocr(strip) for strip in strips]
+        else:
+            texts = list(self._get_executor().map(self._ocr, strips))
+
+        text = merge_strip_texts(texts)
+        cache.put(key, text)
+        return text
+
+    def extract_text(self, file_path: str) -> Dict:
+        """
+        이미지 파일의 텍스트 추출
+
+        Returns:
+            text, frames(처리한 프레임 수), total_frames
+        """
+        with Image.open(file_path) as image:
+            total_frames = getattr(image, "n_frames", 1)
+            texts = [self.ocr_image(frame) for frame in iter_frames(image, self.max_frames)]
+
+        if len(texts) == 1:
+            text = texts[0]
+        else:
+            # 같은 내용이 이어지는 프레임은 한 번만 표시
+            parts = []
+            previous = None
+            for index, frame_text in enumerate(texts, 1):
+                if frame_text.strip() and frame_text != previous:
+                    parts.append(f"--- 프레임 {index} ---\n{frame_text}")
+                previous = frame_text
+            text = "\n".join(parts)
+        return {"text": text, "frames": len(texts), "total_frames": total_frames}
+
+    def stats(self) -> Dict:
+        """OCR 결과 캐시 적중/미스 통계"""
+        return self._get_cache().stats()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
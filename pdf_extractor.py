@@ -0,0 +1,133 @@
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import PyPDF2
+
+
+def _extract_page(reader: "PyPDF2.PdfReader", page_num: int) -> Tuple[int, str]:
+    """페이지 하나의 (페이지 번호, 텍스트). 실패해도 나머지 페이지는 계속 추출"""
+    try:
+        text = reader.pages[page_num].extract_text() or ""
+    except Exception as e:
+        text = f"(페이지 읽기 오류: {e})"
+    return page_num + 1, text
+
+
+def extract_page_range(file_path: str, start: int, end: int) -> List[Tuple[int, str]]:
+    """
+    [start, end) 페이지의 텍스트를 (페이지 번호, 텍스트) 목록으로 반환
+
+    작업 프로세스에서 실행되므로 모듈 최상위 함수로 둡니다.
+    """
+    with open(file_path, 'rb') as file:
+        reader = PyPDF2.PdfReader(file)
+        return [_extract_page(reader, page_num) for page_num in range(start, end)]
+
+
+class ParallelPdfExtractor:
+    """
+    PDF 페이지를 페이지 구간 단위로 나눠 프로세스 풀에서 병렬 추출
+
+    결과는 페이지 순서대로 제너레이터로 전달되므로 전체 문서를 기다리지 않고 앞부분부터
+    사용할 수 있습니다. 페이지 수나 시간 예산을 넘으면 그때까지 추출한 페이지만 반환합니다.
+    작은 문서는 프로세스 간 전달 비용이 더 크므로 현재 스레드에서 바로 추출합니다.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, pages_per_task: int = 16,
+                 parallel_threshold: int = 32, max_pages: Optional[int] = None,
+                 time_budget: Optional[float] = None):
+        """
+        Args:
+            max_workers: 작업 프로세스 수 (기본값: CPU 코어 수)
+            pages_per_task: 작업 하나가 맡는 최소 페이지 수. 작업마다 파일을 다시 여므로
+                            문서가 크면 작업 프로세스당 4개 정도의 구간으로 나눔
+            parallel_threshold: 이 페이지 수 이상일 때만 프로세스 풀 사용
+            max_pages: 추출할 최대 페이지 수 (None이면 전체)
+            time_budget: 추출에 쓸 최대 시간 (초, None이면 무제한)
+        """
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.pages_per_task = pages_per_task
+        self.parallel_threshold = parallel_threshold
+        self.max_pages = max_pages
+        self.time_budget = time_budget
+
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """프로세스 풀 반환 (처음 사용할 때 생성하여 요청 간에 재사용)"""
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            return self._executor
+
+    def iter_pages(self, file_path: str, status: Optional[Dict] = None) -> Iterator[Tuple[int, str]]:
+        """
+        (페이지 번호, 텍스트)를 페이지 순서대로 반환하는 제너레이터
+
+        Args:
+            file_path: PDF 파일 경로
+            status: 주어지면 total_pages, extracted_pages, truncated, reason을 기록
+        """
+        status = status if status is not None else {}
+        deadline = time.monotonic() + self.time_budget if self.time_budget is not None else None
+        with open(file_path, 'rb') as file:
+            reader = PyPDF2.PdfReader(file)
+            total_pages = len(reader.pages)
+            page_limit = min(total_pages, self.max_pages) if self.max_pages is not None else total_pages
+            status.update(total_pages=total_pages, extracted_pages=0, truncated=page_limit < total_pages,
+                          reason="max_pages" if page_limit < total_pages else None)
+
+            if self.max_workers <= 1 or page_limit < self.parallel_threshold:
+                # 현재 스레드에서 파일을 한 번만 열어 추출
+                for page_num in range(page_limit):
+                    if deadline is not None and time.monotonic() >= deadline:
+                        status.update(truncated=True, reason="time_budget")
+                        return
+                    status["extracted_pages"] += 1
+                    yield _extract_page(reader, page_num)
+                return
+
+        task_size = max(self.pages_per_task, -(-page_limit // (self.max_workers * 4)))
+        ranges = [(start, min(start + task_size, page_limit)) for start in range(0, page_limit, task_size)]
+        executor = self._get_executor()
+        futures = [executor.submit(extract_page_range, file_path, start, end) for start, end in ranges]
+        try:
+            for future in futures:
+                timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+                try:
+                    pages = future.result(timeout)
+                except FutureTimeoutError:
+                    status.update(truncated=True, reason="time_budget")
+                    return
+                for page in pages:
+                    status["extracted_pages"] += 1
+                    yield page
+        finally:
+            # 예산 초과나 소비자가 중단한 경우 아직 시작하지 않은 작업은 취소
+            for future in futures:
+                future.cancel()
+
+    def extract_text(self, file_path: str) -> Dict:
+        """
+        전체 텍스트와 추출 상태 반환
+
+        Returns:
+            content, total_pages, extracted_pages, truncated, reason(max_pages/time_budget/None)
+        """
+        status: Dict = {}
+        parts = []
+        for page_num, text in self.iter_pages(file_path, status):
+            parts.append(f"\n--- 페이지 {page_num} ---\n")
+            parts.append(text)
+        return dict(status, content="".join(parts))
+
+    def shutdown(self) -> None:
+        """프로세스 풀 종료"""
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True, cancel_futures=True)
+                self._executor = None
@@ -0,0 +1,119 @@
+import atexit
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+
+class WriteBehindWriter:
+    """
+    대화 기록을 백그라운드에서 모아서 저장하는 쓰기 지연(write-behind) 작성기
+
+    ConversationManager가 메시지를 추가하면 세션을 "dirty"로 표시만 하고,
+    실제 파일 쓰기는 백그라운드 스레드에서 수행합니다. 같은 세션에 대한
+    여러 번의 갱신은 한 번의 쓰기로 합쳐집니다.
+    """
+
+    def __init__(self, flush_interval: float = 1.0, max_dirty_age: float = 5.0):
+        """
+        Args:
+            flush_interval: 마지막 갱신 후 이 시간(초) 동안 추가 갱신이 없으면 저장
+            max_dirty_age: 갱신이 계속되더라도 처음 dirty가 된 뒤 이 시간(초)이 지나면 저장
+        """
+        self.flush_interval = flush_interval
+        self.max_dirty_age = max_dirty_age
+
+        # 세션 관리자 -> (처음 dirty가 된 시각, 마지막 갱신 시각)
+        self._dirty: Dict[object, Tuple[float, float]] = {}
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+
+    def start(self) -> None:
+        """백그라운드 작성 스레드 시작"""
+        with self._condition:
+            if self._running:
+                return
+            self._running = True
+            self._thread = threading.Thread(target=self._run, name="write-behind-writer", daemon=True)
+            self._thread.start()
+        atexit.register(self.shutdown)
+
+    def mark_dirty(self, manager) -> None:
+        """세션 관리자에 저장할 내용이 생겼음을 표시"""
+        now = time.monotonic()
+        with self._condition:
+            first_dirty, _ = self._dirty.get(manager, (now, now))
+            self._dirty[manager] = (first_dirty, now)
+            self._condition.notify()
+
+    def discard(self, manager) -> None:
+        """대기 중인 저장 대상에서 제거 (관리자가 직접 저장한 경우)"""
+        with self._condition:
+            self._dirty.pop(manager, None)
+
+    def flush(self) -> None:
+        """대기 중인 모든 세션을 즉시 저장"""
+        with self._condition:
+            managers = list(self._dirty)
+            self._dirty.clear()
+        self._flush_managers(managers)
+
+    def shutdown(self) -> None:
+        """작성 스레드를 멈추고 남은 내용을 모두 저장"""
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
+        self.flush()
+
+    def _next_deadline(self, first_dirty: float, last_update: float) -> float:
+        """세션을 저장해야 하는 시각"""
+        return min(last_update + self.flush_interval, first_dirty + self.max_dirty_age)
+
+    def _run(self) -> None:
+        """백그라운드 작성 루프"""
+        while True:
+            with self._condition:
+                if not self._running:
+                    return
+
+                now = time.monotonic()
+                due = [manager for manager, times in self._dirty.items()
+                       if self._next_deadline(*times) <= now]
+
+                if not due:
+                    if self._dirty:
+                        timeout = min(self._next_deadline(*times) for times in self._dirty.values()) - now
+                    else:
+                        timeout = None
+                    self._condition.wait(timeout)
+                    continue
+
+                for manager in due:
+                    del self._dirty[manager]
+
+            self._flush_managers(due)
+
+    def _flush_managers(self, managers) -> None:
+        """세션 관리자들의 대기 중인 내용을 저장"""
+        for manager in managers:
+            try:
+                manager.flush()
+            except Exception as e:
+                print(f"대화 기록 저장 중 오류 발생: {e}")
+
+
+_default_writer: Optional[WriteBehindWriter] = None
+_default_writer_lock = threading.Lock()
+
+
+def get_default_writer() -> WriteBehindWriter:
+    """프로세스 전역에서 공유하는 기본 작성기 반환 (처음 호출 시 시작)"""
+    global _default_writer
+    with _default_writer_lock:
+        if _default_writer is None:
+            _default_writer = WriteBehindWriter()
+            _default_writer.start()
+        return _default_writer
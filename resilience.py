@@ -0,0 +1,206 @@
+import asyncio
+import random
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from ring_buffer import RingBuffer
+
+
+class AttemptsExhausted(Exception):
+    """모든 시도가 실패한 경우 (마지막 오류를 __cause__로 가짐)"""
+
+
+def is_retryable_error(error: BaseException) -> bool:
+    """다시 시도할 만한 오류인지 판단 (시간 초과, 연결 오류, 408/409/429/5xx 응답)"""
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError, ConnectionError)):
+        return True
+    status_code = getattr(error, "status_code", None)
+    if status_code is not None:
+        return status_code in (408, 409, 429) or status_code >= 500
+    return False
+
+
+class LatencyTracker:
+    """최근 성공한 호출의 지연 시간 분포"""
+
+    def __init__(self, window: int = 200):
+        self._samples = deque(maxlen=window)
+
+    def record(self, latency: float) -> None:
+        self._samples.append(latency)
+
+    def percentile(self, percent: float) -> Optional[float]:
+        """지연 시간 백분위수 (표본이 없으면 None)"""
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        index = min(int(len(ordered) * percent / 100), len(ordered) - 1)
+        return ordered[index]
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+
+class ResilientCaller:
+    """
+    비동기 호출에 시도별 제한 시간, 지터가 있는 지수 백오프 재시도, 헤지 요청을 적용
+
+    헤지 요청을 켜면 첫 시도가 최근 지연 시간의 백분위수 안에 끝나지 않을 때 같은 요청을
+    하나 더 보내고, 먼저 성공한 응답을 사용하며 나머지는 취소합니다.
+    모든 시도는 최근 기록(recent_attempts)과 통계(stats)에 남습니다.
+    """
+
+    def __init__(self, attempt_timeout: Optional[float] = 20, total_timeout: Optional[float] = 60,
+                 max_attempts: int = 3, base_delay: float = 0.5, max_delay: float = 8.0,
+                 hedge_percentile: Optional[float] = None, hedge_min_samples: int = 20,
+                 retryable: Callable[[BaseException], bool] = is_retryable_error,
+                 history_size: int = 200):
+        """
+        Args:
+            attempt_timeout: 시도 하나의 제한 시간 (초, None이면 무제한)
+            total_timeout: 재시도와 대기를 포함한 전체 제한 시간 (초, None이면 무제한)
+            max_attempts: 최대 시도 횟수 (헤지 요청은 세지 않음)
+            base_delay: 첫 재시도 전 최대 대기 시간 (초). 재시도마다 두 배
+            max_delay: 재시도 전 대기 시간의 상한 (초)
+            hedge_percentile: 이 백분위수 지연 시간이 지나도 응답이 없으면 헤지 요청 (None이면 사용 안 함)
+            hedge_min_samples: 헤지 기준을 계산하기 위한 최소 지연 시간 표본 수
+            retryable: 오류가 재시도 대상인지 판단하는 함수
+            history_size: 보관할 최근 시도 기록 수
+        """
+        self.attempt_timeout = attempt_timeout
+        self.total_timeout = total_timeout
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.retryable = retryable
+
+        self.latencies = LatencyTracker()
+        self._recent_attempts = RingBuffer(history_size)
+        self.counters = {
+            "calls": 0, "attempts": 0, "retries": 0, "hedges": 0, "hedge_wins": 0,
+            "timeouts": 0, "errors": 0, "failures": 0
+        }
+
+    def backoff_delay(self, retry: int) -> float:
+        """retry번째 재시도 전 대기 시간 (full jitter)"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** retry)))
+
+    def hedge_delay(self) -> Optional[float]:
+        """헤지 요청을 보내기까지 기다릴 시간 (헤지를 하지 않으면 None)"""
+        if self.hedge_percentile is None or len(self.latencies) < self.hedge_min_samples:
+            return None
+        return self.latencies.percentile(self.hedge_percentile)
+
+    async def call(self, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        factory가 만든 코루틴을 실행하고 결과 반환
+
+        전체 제한 시간을 넘으면 asyncio.TimeoutError, 재시도할 수 없는 오류는 그대로,
+        모든 시도가 실패하면 AttemptsExhausted를 발생시킵니다.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.total_timeout if self.total_timeout is not None else None
+        self.counters["calls"] += 1
+        last_error: Optional[BaseException] = None
+        out_of_time = False
+
+        for attempt in range(self.max_attempts):
+            if attempt:
+                delay = self.backoff_delay(attempt - 1)
+                if deadline is not None and loop.time() + delay >= deadline:
+                    out_of_time = True
+                    break
+                self.counters["retries"] += 1
+                await asyncio.sleep(delay)
+
+            try:
+                return await self._run_round(factory, attempt, deadline)
+            except Exception as e:
+                last_error = e
+                if not self.retryable(e):
+                    self.counters["failures"] += 1
+                    raise
+
+        self.counters["failures"] += 1
+        if out_of_time or deadline is not None and loop.time() >= deadline:
+            raise asyncio.TimeoutError("전체 제한 시간을 초과했습니다.") from last_error
+        raise AttemptsExhausted(f"{self.max_attempts}번 시도가 모두 실패했습니다.") from last_error
+
+    async def _run_round(self, factory: Callable[[], Awaitable[Any]], attempt: int,
+                         deadline: Optional[float]) -> Any:
+        """시도 하나 (필요하면 헤지 요청 포함)를 실행하여 먼저 성공한 결과 반환"""
+        loop = asyncio.get_running_loop()
+        kind = "retry" if attempt else "primary"
+        tasks = [asyncio.ensure_future(self._attempt(factory, attempt, kind, deadline))]
+        try:
+            hedge_delay = self.hedge_delay()
+            if hedge_delay is not None:
+                done, _ = await asyncio.wait(tasks, timeout=hedge_delay)
+                if not done and (deadline is None or loop.time() < deadline):
+                    self.counters["hedges"] += 1
+                    tasks.append(asyncio.ensure_future(self._attempt(factory, attempt, "hedge", deadline)))
+
+            pending = set(tasks)
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if len(tasks) > 1 and task is tasks[1]:
+                            self.counters["hedge_wins"] += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    async def _attempt(self, factory: Callable[[], Awaitable[Any]], attempt: int, kind: str,
+                       deadline: Optional[float]) -> Any:
+        """실제 호출 한 번. 제한 시간을 적용하고 결과를 기록"""
+        loop = asyncio.get_running_loop()
+        timeout = self.attempt_timeout
+        if deadline is not None:
+            remaining = max(deadline - loop.time(), 0)
+            timeout = remaining if timeout is None else min(timeout, remaining)
+
+        record = {"attempt": attempt + 1, "kind": kind, "started_at": time.time(),
+                  "latency": None, "outcome": None, "error": None}
+        self.counters["attempts"] += 1
+        started = loop.time()
+        try:
+            result = await asyncio.wait_for(factory(), timeout)
+        except asyncio.TimeoutError:
+            record["outcome"] = "timeout"
+            self.counters["timeouts"] += 1
+            raise
+        except asyncio.CancelledError:
+            record["outcome"] = "cancelled"
+            raise
+        except Exception as e:
+            record["outcome"] = "error"
+            record["error"] = f"{type(e).__name__}: {e}"
+            self.counters["errors"] += 1
+            raise
+        else:
+            record["outcome"] = "ok"
+            self.latencies.record(loop.time() - started)
+            return result
+        finally:
+            record["latency"] = loop.time() - started
+            self._recent_attempts.append(record)
+
+    def recent_attempts(self, limit: int = 20) -> List[Dict]:
+        """최근 시도 기록 (최신순)"""
+        return list(reversed(self._recent_attempts[-limit:]))
+
+    def stats(self) -> Dict:
+        """시도/재시도/헤지 횟수와 지연 시간 백분위수"""
+        return dict(self.counters,
+                    latency_p50=self.latencies.percentile(50),
+                    latency_p95=self.latencies.percentile(95),
+                    hedge_delay=self.hedge_delay())
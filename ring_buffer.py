@@ -0,0 +1,88 @@
+from typing import Any, Iterable, Iterator, List, Optional
+
+
+class RingBuffer:
+    """
+    고정 용량 원형 버퍼
+
+    추가와 가장 오래된 항목 제거가 O(1)이며, 인덱스 접근과 역순 순회도
+    리스트처럼 사용할 수 있습니다. 슬라이스는 새 리스트를 반환합니다.
+    """
+
+    def __init__(self, capacity: int, items: Optional[Iterable[Any]] = None):
+        """
+        Args:
+            capacity: 보관할 최대 항목 수
+            items: 초기 항목들 (용량을 넘으면 최신 항목만 유지)
+        """
+        if capacity <= 0:
+            raise ValueError("capacity는 1 이상이어야 합니다.")
+        self.capacity = capacity
+        self._items: List[Any] = []
+        self._start = 0
+        if items is not None:
+            self.extend(items)
+
+    def append(self, item: Any) -> Optional[Any]:
+        """항목 추가. 용량을 넘어 밀려난 가장 오래된 항목을 반환"""
+        if len(self._items) < self.capacity:
+            self._items.append(item)
+            return None
+
+        evicted = self._items[self._start]
+        self._items[self._start] = item
+        self._start = (self._start + 1) % self.capacity
+        return evicted
+
+    def extend(self, items: Iterable[Any]) -> None:
+        """여러 항목 추가"""
+        for item in items:
+            self.append(item)
+
+    def clear(self) -> None:
+        """모든 항목 삭제"""
+        self._items = []
+        self._start = 0
+
+    def _physical_index(self, index: int) -> int:
+        """논리 인덱스를 내부 리스트 인덱스로 변환"""
+        size = len(self._items)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("RingBuffer index out of range")
+        return (self._start + index) % size
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._items[(self._start + i) % len(self._items)]
+                    for i in range(*index.indices(len(self._items)))]
+        return self._items[self._physical_index(index)]
+
+    def __setitem__(self, index: int, item: Any) -> None:
+        self._items[self._physical_index(index)] = item
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __iter__(self) -> Iterator[Any]:
+        items = self._items
+        for i in range(self._start, len(items)):
+            yield items[i]
+        for i in range(self._start):
+            yield items[i]
+
+    def __reversed__(self) -> Iterator[Any]:
+        items = self._items
+        for i in range(self._start - 1, -1, -1):
+            yield items[i]
+        for i in range(len(items) - 1, self._start - 1, -1):
+            yield items[i]
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (RingBuffer, list)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"RingBuffer(capacity={self.capacity}, items={list(self)!r})"
@@ -0,0 +1,189 @@
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+
+class AhoCorasick:
+    """
+    여러 키워드를 입력 문자열 한 번 순회로 모두 찾는 Aho-Corasick 오토마톤
+
+    각 상태에 실패 링크를 따라 도달하는 키워드 중 순위가 가장 높은 것을 미리 계산해 두므로,
+    가장 우선하는 키워드 하나만 필요할 때는 글자당 O(1)로 찾을 수 있습니다.
+    """
+
+    def __init__(self, patterns: List[str]):
+        """
+        Args:
+            patterns: 찾을 키워드 목록. 목록 안의 위치가 순위(작을수록 우선)가 됨
+        """
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._outputs: List[List[int]] = [[]]
+
+        for index, pattern in enumerate(patterns):
+            if pattern:
+                self._insert(pattern, index)
+        self._build_failure_links()
+
+    def _insert(self, pattern: str, index: int) -> None:
+        """키워드를 트라이에 추가"""
+        state = 0
+        for ch in pattern:
+            next_state = self._goto[state].get(ch)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][ch] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._outputs.append([])
+            state = next_state
+        self._outputs[state].append(index)
+
+    def _build_failure_links(self) -> None:
+        """너비 우선으로 실패 링크와 상태별 최우선 키워드 계산"""
+        self._best: List[Optional[int]] = [min(self._outputs[0], default=None)]
+        self._best.extend([None] * (len(self._goto) - 1))
+
+        queue = list(self._goto[0].values())
+        for state in queue:
+            self._best[state] = min(self._outputs[state], default=None)
+        head = 0
+        while head < len(queue):
+            state = queue[head]
+            head += 1
+            for ch, next_state in self._goto[state].items():
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                fail = self._goto[fail].get(ch, 0)
+                self._fail[next_state] = fail
+
+                # 실패 링크 쪽 상태는 이미 계산되어 있음 (더 얕은 깊이)
+                candidates = [index for index in (min(self._outputs[next_state], default=None),
+                                                  self._best[fail]) if index is not None]
+                self._best[next_state] = min(candidates, default=None)
+                queue.append(next_state)
+
+    def _step(self, state: int, ch: str) -> int:
+        """한 글자 전이"""
+        while state and ch not in self._goto[state]:
+            state = self._fail[state]
+        return self._goto[state].get(ch, 0)
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int]]:
+        """(끝 위치, 키워드 순위) 형태로 모든 일치 항목 반환"""
+        state = 0
+        for position, ch in enumerate(text):
+            state = self._step(state, ch)
+            match_state = state
+            while match_state:
+                for index in self._outputs[match_state]:
+                    yield position, index
+                match_state = self._fail[match_state]
+
+    def best_match(self, text: str) -> Optional[int]:
+        """입력에 포함된 키워드 중 순위가 가장 높은 키워드의 순위 반환"""
+        best = None
+        state = 0
+        for ch in text:
+            state = self._step(state, ch)
+            candidate = self._best[state]
+            if candidate is not None and (best is None or candidate < best):
+                best = candidate
+                if best == 0:
+                    break
+        return best
+
+
+class RuleEngine:
+    """
+    규칙 파일 기반 키워드 응답 엔진
+
+    규칙은 한 번만 읽어 오토마톤으로 만들어 두고, 규칙 파일이 바뀌면
+    재시작 없이 다시 읽습니다. 여러 키워드가 일치하면 priority가 높은 규칙,
+    같으면 파일에서 먼저 나온 규칙이 선택됩니다.
+    """
+
+    def __init__(self, rules_path: str, dynamic_values: Optional[Dict[str, Callable[[], str]]] = None,
+                 check_interval: float = 1.0):
+        """
+        Args:
+            rules_path: 규칙 JSON 파일 경로
+            dynamic_values: "dynamic": true 규칙의 응답에 채울 값 이름 -> 값을 만드는 함수.
+                            응답에 실제로 쓰인 값만 일치 시점에 계산됨
+            check_interval: 규칙 파일 변경 여부를 확인하는 최소 간격 (초)
+        """
+        self.rules_path = rules_path
+        self.dynamic_values = dynamic_values or {}
+        self.check_interval = check_interval
+
+        # (규칙 목록, 오토마톤) 쌍을 하나의 속성으로 교체하여 요청 스레드가 항상 일관된 쌍을 보게 함
+        self._compiled: Tuple[List[Dict], AhoCorasick] = ([], AhoCorasick([]))
+        self._loaded_mtime: Optional[float] = None
+        self._last_check = 0.0
+        self._reload_lock = threading.Lock()
+        self.reload()
+
+    def reload(self) -> bool:
+        """규칙 파일을 읽어 오토마톤을 다시 만듦. 실패하면 기존 규칙을 유지"""
+        with self._reload_lock:
+            try:
+                mtime = os.path.getmtime(self.rules_path)
+                with open(self.rules_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"규칙 파일 로드 중 오류 발생: {e}")
+                return False
+
+            # 우선순위가 높은 규칙이 앞에 오도록 정렬 (같으면 파일 순서 유지)
+            rules = [rule for rule in data.get("rules", []) if rule.get("keyword")]
+            rules.sort(key=lambda rule: -rule.get("priority", 0))
+
+            self._compiled = (rules, AhoCorasick([rule["keyword"] for rule in rules]))
+            self._loaded_mtime = mtime
+            return True
+
+    def reload_if_changed(self) -> None:
+        """check_interval마다 규칙 파일의 수정 시각을 확인하여 바뀌었으면 다시 읽음"""
+        now = time.monotonic()
+        if now - self._last_check < self.check_interval:
+            return
+        self._last_check = now
+        try:
+            mtime = os.path.getmtime(self.rules_path)
+        except OSError:
+            return
+        if mtime != self._loaded_mtime:
+            self.reload()
+
+    def match(self, user_input: str) -> Optional[str]:
+        """입력에 일치하는 규칙의 응답 반환 (없으면 None)"""
+        self.reload_if_changed()
+
+        rules, matcher = self._compiled
+        index = matcher.best_match(user_input)
+        if index is None:
+            return None
+
+        rule = rules[index]
+        if rule.get("dynamic"):
+            return rule["response"].format_map(_LazyValues(self.dynamic_values))
+        return rule["response"]
+
+    def __len__(self) -> int:
+        return len(self._compiled[0])
+
+
+class _LazyValues(dict):
+    """format_map에서 실제로 참조된 값만 계산하는 매핑"""
+
+    def __init__(self, providers: Dict[str, Callable[[], str]]):
+        super().__init__()
+        self._providers = providers
+
+    def __missing__(self, key: str) -> str:
+        value = self._providers[key]()
+        self[key] = value
+        return value
@@ -0,0 +1,277 @@
+import os
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from conversation_store import ConversationStore
+
+
+def extract_ngrams(text: str, n: int = 2) -> Set[str]:
+    """
+    문자 n-gram 추출 (대소문자 무시)
+
+    형태소 분석기 없이도 "날씨" 같은 한국어 부분 문자열을 찾을 수 있도록
+    한 글자(unigram)와 n글자 조각을 모두 색인합니다. 공백만으로 된 조각은 제외합니다.
+    """
+    text = text.lower()
+    grams = {ch for ch in text if not ch.isspace()}
+    for i in range(len(text) - n + 1):
+        gram = text[i:i + n]
+        if not gram.isspace():
+            grams.add(gram)
+    return grams
+
+
+class SearchIndex:
+    """
+    여러 세션의 대화 메시지를 검색하는 디스크 기반 역색인
+
+    메시지가 저장될 때마다 증분으로 색인되며, 검색은 가장 드문 n-gram의
+    포스팅 목록에서 시작해 후보를 좁히므로 전체 대화 파일을 읽지 않습니다.
+    """
+
+    def __init__(self, db_path: str = "conversation_history/search_index.db",
+                 ngram: int = 2, max_candidates: int = 5000):
+        """
+        Args:
+            db_path: 색인 데이터베이스 파일 경로
+            ngram: 색인할 문자 n-gram 길이
+            max_candidates: 한 번의 검색에서 순위를 매길 최대 후보 수 (최신 메시지 우선)
+        """
+        self.db_path = db_path
+        self.ngram = ngram
+        self.max_candidates = max_candidates
+
+        db_dir = os.path.dirname(db_path)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_tables()
+
+    def _create_tables(self) -> None:
+        """색인 테이블 생성"""
+        with self._conn:
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS messages (
+                    id INTEGER PRIMARY KEY,
+                    session_id TEXT NOT NULL,
+                    seq INTEGER NOT NULL,
+                    timestamp TEXT,
+                    role TEXT,
+                    source TEXT,
+                    content TEXT NOT NULL,
+                    UNIQUE (session_id, seq)
+                );
+                CREATE TABLE IF NOT EXISTS postings (
+                    gram TEXT NOT NULL,
+                    message_id INTEGER NOT NULL,
+                    PRIMARY KEY (gram, message_id)
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS stats (
+                    id INTEGER PRIMARY KEY CHECK (id = 0),
+                    document_count INTEGER NOT NULL,
+                    total_length INTEGER NOT NULL
+                );
+                INSERT OR IGNORE INTO stats (id, document_count, total_length) VALUES (0, 0, 0);
+            """)
+
+    def add_messages(self, session_id: str, entries: Iterable[Tuple[int, Dict]]) -> int:
+        """
+        메시지들을 색인에 추가
+
+        Args:
+            session_id: 세션 ID
+            entries: (메시지 순번, 메시지) 목록. 이미 색인된 순번은 건너뜀
+
+        Returns:
+            새로 색인된 메시지 수
+        """
+        added = 0
+        added_length = 0
+        with self._lock, self._conn:
+            for seq, message in entries:
+                content = message.get("content") or ""
+                cursor = self._conn.execute(
+                    "INSERT OR IGNORE INTO messages (session_id, seq, timestamp, role, source, content) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (session_id, seq, message.get("timestamp"), message.get("role"),
+                     message.get("source"), content))
+                if cursor.rowcount != 1:
+                    continue
+
+                message_id = cursor.lastrowid
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO postings (gram, message_id) VALUES (?, ?)",
+                    ((gram, message_id) for gram in extract_ngrams(content, self.ngram)))
+                added += 1
+                added_length += len(content)
+
+            if added:
+                self._conn.execute(
+                    "UPDATE stats SET document_count = document_count + ?, total_length = total_length + ? "
+                    "WHERE id = 0", (added, added_length))
+        return added
+
+    def remove_session(self, session_id: str) -> int:
+        """
+        세션의 메시지를 색인에서 제거
+
+        포스팅은 메시지 내용의 n-gram으로 (n-gram, 메시지 ID) 기본 키를 찾아 지우므로
+        포스팅 전체를 훑지 않습니다.
+
+        Returns:
+            제거된 메시지 수
+        """
+        with self._lock, self._conn:
+            rows = self._conn.execute(
+                "SELECT id, content FROM messages WHERE session_id = ?", (session_id,)).fetchall()
+            for row in rows:
+                self._conn.executemany(
+                    "DELETE FROM postings WHERE gram = ? AND message_id = ?",
+                    ((gram, row["id"]) for gram in extract_ngrams(row["content"], self.ngram)))
+            if rows:
+                self._conn.execute("DELETE FROM messages WHERE session_id = ?", (session_id,))
+                self._conn.execute(
+                    "UPDATE stats SET document_count = document_count - ?, total_length = total_length - ? "
+                    "WHERE id = 0", (len(rows), sum(len(row["content"]) for row in rows)))
+        return len(rows)
+
+    def search(self, query: str, session_id: Optional[str] = None, role: Optional[str] = None,
+               source: Optional[str] = None, since: Optional[str] = None, until: Optional[str] = None,
+               page: int = 1, page_size: int = 20) -> Dict:
+        """
+        키워드 검색
+
+        키워드를 부분 문자열로 포함하는 메시지를 BM25 방식 점수와 최신순으로 정렬해 반환합니다.
+
+        Args:
+            query: 검색 키워드
+            session_id, role, source: 해당 값과 일치하는 메시지만 검색
+            since, until: ISO 형식 시각 범위 (포함)
+            page, page_size: 페이지 번호(1부터)와 페이지 크기
+
+        Returns:
+            {"total", "page", "page_size", "truncated", "results"} 형식의 딕셔너리
+        """
+        keyword = query.strip().lower()
+        page = max(page, 1)
+        empty = {"total": 0, "page": page, "page_size": page_size, "truncated": False, "results": []}
+
+        query_grams = self._query_grams(keyword)
+        if not query_grams:
+            return empty
+
+        with self._lock:
+            # 가장 드문 n-gram부터 조건을 걸어 후보 집합을 최소화
+            query_grams.sort(key=self._gram_frequency)
+
+            sql = ["SELECT m.* FROM messages m WHERE m.id IN "
+                   "(SELECT message_id FROM postings WHERE gram = ?)"]
+            params: List = [query_grams[0]]
+            for gram in query_grams[1:]:
+                sql.append("AND EXISTS (SELECT 1 FROM postings p WHERE p.gram = ? AND p.message_id = m.id)")
+                params.append(gram)
+            for column, value in (("session_id", session_id), ("role", role), ("source", source)):
+                if value is not None:
+                    sql.append(f"AND m.{column} = ?")
+                    params.append(value)
+            if since is not None:
+                sql.append("AND m.timestamp >= ?")
+                params.append(since)
+            if until is not None:
+                sql.append("AND m.timestamp <= ?")
+                params.append(until)
+            sql.append("ORDER BY m.id DESC LIMIT ?")
+            params.append(self.max_candidates)
+
+            rows = self._conn.execute(" ".join(sql), params).fetchall()
+            document_count, total_length = self._conn.execute(
+                "SELECT document_count, total_length FROM stats WHERE id = 0").fetchone()
+
+        avg_length = total_length / document_count if document_count else 1
+        results = []
+        for row in rows:
+            content = row["content"]
+            # n-gram이 모두 있어도 연속된 부분 문자열인지는 다시 확인해야 함
+            term_frequency = content.lower().count(keyword)
+            if not term_frequency:
+                continue
+            results.append({
+                "session_id": row["session_id"],
+                "timestamp": row["timestamp"],
+                "role": row["role"],
+                "source": row["source"],
+                "content": content,
+                "score": self._bm25(term_frequency, len(content), avg_length)
+            })
+
+        results.sort(key=lambda result: (result["score"], result["timestamp"] or ""), reverse=True)
+        start = (page - 1) * page_size
+        return {
+            "total": len(results),
+            "page": page,
+            "page_size": page_size,
+            "truncated": len(rows) >= self.max_candidates,
+            "results": results[start:start + page_size]
+        }
+
+    def _query_grams(self, keyword: str) -> List[str]:
+        """검색어를 색인과 같은 방식의 n-gram 목록으로 변환"""
+        if len(keyword) < self.ngram:
+            return [ch for ch in keyword if not ch.isspace()]
+        grams = {keyword[i:i + self.ngram] for i in range(len(keyword) - self.ngram + 1)}
+        return [gram for gram in grams if not gram.isspace()]
+
+    def _gram_frequency(self, gram: str) -> int:
+        """n-gram이 등장하는 메시지 수 (후보 수 상한까지만 계산)"""
+        return self._conn.execute(
+            "SELECT COUNT(*) FROM (SELECT 1 FROM postings WHERE gram = ? LIMIT ?)",
+            (gram, self.max_candidates)).fetchone()[0]
+
+    @staticmethod
+    def _bm25(term_frequency: int, length: int, avg_length: float,
+              k1: float = 1.2, b: float = 0.75) -> float:
+        """BM25 단어 빈도 점수 (검색어 하나이므로 IDF는 모든 후보에 동일)"""
+        norm = k1 * (1 - b + b * length / avg_length)
+        return term_frequency * (k1 + 1) / (term_frequency + norm)
+
+    def index_history_dir(self, history_dir: str = "conversation_history",
+                          store: Optional[ConversationStore] = None) -> int:
+        """
+        저장된 대화 파일들을 색인 (최초 구축 또는 누락분 보충용)
+
+        이미 색인된 메시지는 건너뛰므로 여러 번 실행해도 안전합니다.
+
+        Args:
+            history_dir: JSON 파일 대화 기록 디렉토리
+            store: 대화 기록 저장소 (주면 history_dir 대신 사용)
+        """
+        from conversation_manager import ConversationManager
+
+        loader = ConversationManager(max_history=10 ** 9, save_to_file=False, history_dir=history_dir,
+                                     store=store)
+        added = 0
+        for session_id in loader.get_available_sessions():
+            if loader.load_from_file(session_id):
+                added += self.add_messages(session_id, loader.get_messages_with_seq())
+        return added
+
+    def close(self) -> None:
+        """데이터베이스 연결 종료"""
+        with self._lock:
+            self._conn.close()
+
+
+if __name__ == "__main__":
+    from config import CONVERSATION_DB_PATH, CONVERSATION_STORE
+    from conversation_store import create_store
+
+    index = SearchIndex()
+    count = index.index_history_dir(store=create_store(CONVERSATION_STORE, db_path=CONVERSATION_DB_PATH))
+    print(f"{count}개의 메시지를 색인했습니다.")
+    index.close()
@@ -0,0 +1,168 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from conversation_manager import ConversationManager
+
+
+class SessionCache:
+    """
+    메모리에 유지하는 ConversationManager의 LRU 캐시
+
+    항목 수나 메모리 예산을 넘거나 일정 시간 사용되지 않은 세션은 디스크에
+    저장(flush)한 뒤 메모리에서 내리고, 다음 요청 때 파일에서 다시 로드합니다.
+    세션의 메모리 크기는 캐시에서 꺼낼 때마다 다시 측정하므로, 마지막 요청 이후
+    추가된 메시지만큼은 다음 조회 때 반영됩니다.
+    내려간 세션의 저장이 끝나기 전에는 같은 세션을 다시 로드하지 않으므로, 다시 로드한 관리자가
+    아직 저장되지 않은 메시지의 순번을 놓치지 않습니다.
+    """
+
+    def __init__(self, loader: Callable[[str], ConversationManager], max_entries: int = 1000,
+                 max_memory_bytes: Optional[int] = None, idle_ttl: Optional[float] = None):
+        """
+        Args:
+            loader: 세션 키로 ConversationManager를 만들어(저장된 기록이 있으면 로드) 반환하는 함수
+            max_entries: 메모리에 유지할 최대 세션 수
+            max_memory_bytes: 세션 히스토리 전체의 대략적인 메모리 예산 (바이트)
+            idle_ttl: 이 시간(초) 동안 사용되지 않은 세션은 내림
+        """
+        self.loader = loader
+        self.max_entries = max_entries
+        self.max_memory_bytes = max_memory_bytes
+        self.idle_ttl = idle_ttl
+
+        # 세션 키 -> (관리자, 마지막 사용 시각, 마지막으로 측정한 메모리 크기). 앞쪽이 가장 오래 전 사용
+        self._entries: "OrderedDict[str, Tuple[ConversationManager, float, int]]" = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        # 내려서 디스크에 저장하는 중인 세션 키 -> 진행 중인 저장 수 (저장이 끝나면 _spilled로 알림)
+        self._spilling: Dict[str, int] = {}
+        self._spilled = threading.Condition(self._lock)
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = {"lru": 0, "memory": 0, "idle": 0}
+
+    def get(self, key: str) -> ConversationManager:
+        """세션 관리자 반환 (없으면 로드하여 캐시에 추가)"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self.hits += 1
+                manager = entry[0]
+                self._store(key, manager, now)
+                evicted = self._select_evictions(now, keep=key)
+            else:
+                self.misses += 1
+                manager = None
+                # 같은 세션이 내려가며 저장 중이면 저장이 끝난 뒤에 로드
+                self._spilled.wait_for(lambda: key not in self._spilling)
+
+        if manager is None:
+            # 파일 로드는 잠금 밖에서 수행
+            manager = self.loader(key)
+            with self._lock:
+                # 그 사이 다른 요청이 먼저 로드했다면 그 관리자를 사용
+                entry = self._entries.get(key)
+                if entry is not None:
+                    manager = entry[0]
+                self._store(key, manager, now)
+                evicted = self._select_evictions(now, keep=key)
+
+        self._spill(evicted)
+        return manager
+
+    def put(self, key: str, manager: ConversationManager) -> None:
+        """세션 관리자를 캐시에 추가 (같은 키가 있으면 교체)"""
+        now = time.monotonic()
+        with self._lock:
+            previous = self._entries.get(key)
+            self._store(key, manager, now)
+            evicted = self._select_evictions(now, keep=key)
+            if previous is not None and previous[0] is not manager:
+                self._spilling[key] = self._spilling.get(key, 0) + 1
+                evicted.append((key, previous[0]))
+        self._spill(evicted)
+
+    def flush_all(self) -> None:
+        """캐시에 있는 모든 세션을 디스크에 저장"""
+        with self._lock:
+            managers = [entry[0] for entry in self._entries.values()]
+        for manager in managers:
+            manager.flush()
+
+    def stats(self) -> Dict:
+        """캐시 적중/미스/제거 횟수와 현재 크기"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "memory_bytes": self._memory_bytes,
+                "max_memory_bytes": self.max_memory_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0,
+                "evictions": dict(self.evictions)
+            }
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def _store(self, key: str, manager: ConversationManager, now: float) -> None:
+        """항목을 가장 최근 사용으로 기록하고 메모리 크기를 다시 측정 (잠금 안에서 호출)"""
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= previous[2]
+        size = manager.approx_memory_bytes()
+        self._entries[key] = (manager, now, size)
+        self._memory_bytes += size
+
+    def _select_evictions(self, now: float, keep: str) -> List[Tuple[str, ConversationManager]]:
+        """내려야 할 세션들을 캐시에서 제거하고 반환 (잠금 안에서 호출)"""
+        evicted = []
+
+        def pop_oldest(reason: str) -> bool:
+            oldest_key = next(iter(self._entries))
+            if oldest_key == keep:
+                return False
+            manager, _, size = self._entries.pop(oldest_key)
+            self._memory_bytes -= size
+            self.evictions[reason] += 1
+            self._spilling[oldest_key] = self._spilling.get(oldest_key, 0) + 1
+            evicted.append((oldest_key, manager))
+            return True
+
+        if self.idle_ttl is not None:
+            while self._entries and now - next(iter(self._entries.values()))[1] > self.idle_ttl:
+                if not pop_oldest("idle"):
+                    break
+        while len(self._entries) > self.max_entries:
+            if not pop_oldest("lru"):
+                break
+        if self.max_memory_bytes is not None:
+            while self._entries and self._memory_bytes > self.max_memory_bytes:
+                if not pop_oldest("memory"):
+                    break
+        return evicted
+
+    def _spill(self, evicted: List[Tuple[str, ConversationManager]]) -> None:
+        """내린 세션들을 디스크에 저장하고 저장을 기다리는 로드를 깨움 (잠금 밖에서 호출)"""
+        for key, manager in evicted:
+            try:
+                manager.flush()
+            except Exception as e:
+                print(f"세션 저장 중 오류 발생: {e}")
+            finally:
+                with self._lock:
+                    self._spilling[key] -= 1
+                    if not self._spilling[key]:
+                        del self._spilling[key]
+                    self._spilled.notify_all()
@@ -0,0 +1,178 @@
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from conversation_store import ConversationStore
+
+
+class SessionCatalog:
+    """
+    저장된 대화 세션 목록
+
+    세션이 저장될 때마다 세션 ID, 생성/수정 시각, 메시지 수, 파일 크기를 기록하므로
+    세션 목록을 보여줄 때 대화 기록 디렉토리를 다시 훑지 않아도 됩니다.
+    """
+
+    SORT_COLUMNS = ("session_id", "created_at", "updated_at", "message_count", "size_bytes")
+
+    def __init__(self, db_path: str = "conversation_history/session_catalog.db"):
+        """
+        Args:
+            db_path: 세션 목록 데이터베이스 파일 경로
+        """
+        self.db_path = db_path
+
+        db_dir = os.path.dirname(db_path)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS sessions (
+                    session_id TEXT PRIMARY KEY,
+                    created_at TEXT,
+                    updated_at TEXT,
+                    message_count INTEGER NOT NULL DEFAULT 0,
+                    size_bytes INTEGER NOT NULL DEFAULT 0
+                );
+                CREATE INDEX IF NOT EXISTS idx_sessions_updated_at ON sessions (updated_at);
+                CREATE INDEX IF NOT EXISTS idx_sessions_created_at ON sessions (created_at);
+            """)
+
+    def update(self, session_id: str, message_count: int, size_bytes: int,
+               created_at: Optional[str] = None, updated_at: Optional[str] = None) -> None:
+        """
+        세션 정보 기록 (없으면 추가, 있으면 갱신. 생성 시각은 처음 값을 유지)
+
+        Args:
+            session_id: 세션 ID
+            message_count: 세션의 메시지 수
+            size_bytes: 세션 파일 크기 합계
+            created_at: 첫 메시지 시각 (ISO 형식)
+            updated_at: 마지막 저장 시각 (ISO 형식, 기본값: 현재 시각)
+        """
+        updated_at = updated_at or datetime.now().isoformat()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO sessions (session_id, created_at, updated_at, message_count, size_bytes) "
+                "VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(session_id) DO UPDATE SET "
+                "created_at = COALESCE(sessions.created_at, excluded.created_at), "
+                "updated_at = excluded.updated_at, "
+                "message_count = excluded.message_count, "
+                "size_bytes = excluded.size_bytes",
+                (session_id, created_at or updated_at, updated_at, message_count, size_bytes))
+
+    def remove(self, session_id: str) -> None:
+        """세션 정보 삭제"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+
+    def list_sessions(self, sort: str = "session_id", descending: bool = True,
+                      page: int = 1, page_size: int = 20, prefix: Optional[str] = None,
+                      min_messages: Optional[int] = None,
+                      updated_since: Optional[str] = None) -> Dict:
+        """
+        세션 목록 조회
+
+        Args:
+            sort: 정렬 기준 (SORT_COLUMNS 중 하나)
+            descending: 내림차순 여부
+            page, page_size: 페이지 번호(1부터)와 페이지 크기
+            prefix: 세션 ID 접두사 필터
+            min_messages: 최소 메시지 수 필터
+            updated_since: 이 시각 이후 수정된 세션만 (ISO 형식)
+
+        Returns:
+            {"total", "page", "page_size", "sessions"} 형식의 딕셔너리
+        """
+        if sort not in self.SORT_COLUMNS:
+            raise ValueError(f"지원하지 않는 정렬 기준입니다: {sort}")
+        page = max(page, 1)
+
+        conditions = []
+        params = []
+        if prefix:
+            # LIKE 대신 범위 조건을 사용해 기본 키 인덱스를 활용
+            conditions.append("session_id >= ? AND session_id < ?")
+            params.extend([prefix, prefix + "\uffff"])
+        if min_messages is not None:
+            conditions.append("message_count >= ?")
+            params.append(min_messages)
+        if updated_since is not None:
+            conditions.append("updated_at >= ?")
+            params.append(updated_since)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        order = "DESC" if descending else "ASC"
+
+        with self._lock:
+            total = self._conn.execute(f"SELECT COUNT(*) FROM sessions {where}", params).fetchone()[0]
+            rows = self._conn.execute(
+                f"SELECT * FROM sessions {where} ORDER BY {sort} {order}, session_id {order} "
+                "LIMIT ? OFFSET ?",
+                params + [page_size, (page - 1) * page_size]).fetchall()
+
+        return {
+            "total": total,
+            "page": page,
+            "page_size": page_size,
+            "sessions": [dict(row) for row in rows]
+        }
+
+    def list_session_ids(self) -> List[str]:
+        """모든 세션 ID를 최신순으로 반환"""
+        with self._lock:
+            rows = self._conn.execute("SELECT session_id FROM sessions ORDER BY session_id DESC").fetchall()
+        return [row["session_id"] for row in rows]
+
+    def is_empty(self) -> bool:
+        """기록된 세션이 없는지 여부"""
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM sessions LIMIT 1").fetchone() is None
+
+    def rebuild(self, history_dir: str = "conversation_history",
+                store: Optional[ConversationStore] = None) -> int:
+        """
+        대화 기록 디렉토리(또는 저장소)를 훑어 세션 목록을 다시 구축
+
+        Args:
+            history_dir: JSON 파일 대화 기록 디렉토리
+            store: 대화 기록 저장소 (주면 history_dir 대신 사용)
+
+        Returns:
+            기록된 세션 수
+        """
+        from conversation_manager import ConversationManager
+
+        loader = ConversationManager(max_history=10 ** 9, save_to_file=False, history_dir=history_dir,
+                                     store=store)
+        session_ids = loader.get_available_sessions()
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM sessions")
+
+        for session_id in session_ids:
+            if loader.load_from_file(session_id):
+                self.update(session_id, **loader.get_catalog_entry())
+        return len(session_ids)
+
+    def close(self) -> None:
+        """데이터베이스 연결 종료"""
+        with self._lock:
+            self._conn.close()
+
+
+if __name__ == "__main__":
+    from config import CONVERSATION_DB_PATH, CONVERSATION_STORE
+    from conversation_store import create_store
+
+    catalog = SessionCatalog()
+    count = catalog.rebuild(store=create_store(CONVERSATION_STORE, db_path=CONVERSATION_DB_PATH))
+    print(f"{count}개의 세션을 목록에 기록했습니다.")
+    catalog.close()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+파일 분석 작업 큐 테스트
+"""
+
+import io
+import os
+import tempfile
+
+import pytest
+
+from analysis_jobs import AnalysisJobQueue, QueueFullError
+from file_analyzer import FileAnalyzer
+
+def make_upload(analyzer, filename, data):
+    """업로드 파일 객체(filename 속성이 있는 스트림)를 저장하고 prepare_upload 결과 반환"""
+    file = io.BytesIO(data)
+    file.filename = filename
+    upload = analyzer.prepare_upload(file)
+    assert upload['success']
+    return upload
+
+def wait_finished(job, timeout=30):
+    """작업이 끝날 때까지 대기"""
+    seen = 0
+    while True:
+        parts, finished = job.wait_for_update(seen, timeout)
+        seen += len(parts)
+        if finished or not parts:
+            return job.status
+
+def test_thread_job_completes_and_caches_content():
+    """가벼운 형식은 작업 스레드에서 분석되고 결과가 저장소에 기록되는지 테스트"""
+    with tempfile.TemporaryDirectory() as upload_dir:
+        analyzer = FileAnalyzer(upload_dir=upload_dir)
+        jobs = AnalysisJobQueue(analyzer, max_workers=1)
+        jobs.start()
+        try:
+            upload = make_upload(analyzer, "memo.txt", "안녕하세요".encode("utf-8"))
+            job = jobs.submit(upload)
+            assert wait_finished(job) == "done"
+
+            data = jobs.get(job.job_id).to_dict()
+            assert data["file_info"]["content"] == "안녕하세요"
+            assert "memo.txt" in data["summary"]
+            assert make_upload(analyzer, "copy.txt", "안녕하세요".encode("utf-8"))["content"] == "안녕하세요"
+        finally:
+            jobs.shutdown()
+
+def test_backpressure_and_cancel_queued_job():
+    """대기 작업이 가득 차면 거절하고, 대기 중인 작업은 실행 전에 취소되는지 테스트"""
+    with tempfile.TemporaryDirectory() as upload_dir:
+        analyzer = FileAnalyzer(upload_dir=upload_dir)
+        jobs = AnalysisJobQueue(analyzer, max_workers=1, max_pending=1)
+        upload = make_upload(analyzer, "a.txt", b"a")
+
+        # 작업 스레드를 시작하기 전이므로 첫 작업이 큐를 채움
+        job = jobs.submit(upload)
+        with pytest.raises(QueueFullError):
+            jobs.submit(upload)
+        assert jobs.stats()["rejected"] == 1
+
+        assert jobs.cancel(job.job_id)
+        assert not jobs.cancel(job.job_id)
+        jobs.start()
+        jobs.shutdown()
+        assert job.status == "cancelled" and job.result is None
+
+def test_process_job_streams_pages_and_times_out():
+    """PDF는 별도 프로세스에서 페이지별로 진행 상황을 보내고, 제한 시간을 넘으면 종료되는지 테스트"""
+    pytest.importorskip("PyPDF2")
+    from benchmarks.bench_pdf_extraction import write_synthetic_pdf
+
+    with tempfile.TemporaryDirectory() as upload_dir:
+        pdf_path = os.path.join(upload_dir, "source.pdf")
+        write_synthetic_pdf(pdf_path, pages=3, lines_per_page=5)
+        with open(pdf_path, "rb") as f:
+            pdf_data = f.read()
+
+        analyzer = FileAnalyzer(upload_dir=upload_dir, pdf_workers=1)
+        jobs = AnalysisJobQueue(analyzer, max_workers=1, time_limit=60)
+        jobs.start()
+        try:
+            job = jobs.submit(make_upload(analyzer, "report.pdf", pdf_data))
+            assert wait_finished(job, timeout=60) == "done"
+            assert job.to_dict()["progress"]["parts"] == 3
+            assert "Page 3 line 5" in job.result["file_info"]["content"]
+        finally:
+            jobs.shutdown()
+
+        jobs = AnalysisJobQueue(analyzer, max_workers=1, time_limit=0)
+        jobs.start()
+        try:
+            upload = make_upload(analyzer, "other.pdf", pdf_data + b"\n")
+            job = jobs.submit(upload)
+            assert wait_finished(job) == "timeout"
+            assert job.error and analyzer.store.get_content(upload["file_hash"], ".pdf") is None
+        finally:
+            jobs.shutdown()
+
+def test_extraction_failures_fail_the_job_and_partial_results_are_not_cached():
+    """추출 오류는 failed로 끝나고, 오류나 제한으로 잘린 내용은 업로드 저장소에 남지 않는지 테스트"""
+    openpyxl = pytest.importorskip("openpyxl")
+
+    with tempfile.TemporaryDirectory() as upload_dir:
+        book_path = os.path.join(upload_dir, "source.xlsx")
+        workbook = openpyxl.Workbook()
+        for i in range(10):
+            workbook.active.append([f"행{i}", i])
+        workbook.save(book_path)
+        with open(book_path, "rb") as f:
+            book_data = f.read()
+
+        analyzer = FileAnalyzer(upload_dir=upload_dir, excel_max_rows=3)
+        # 작업 프로세스와 작업 스레드 두 경로 모두 확인
+        for process_extensions in ((".docx", ".xlsx"), ()):
+            jobs = AnalysisJobQueue(analyzer, max_workers=1, process_extensions=process_extensions)
+            jobs.start()
+            try:
+                broken = make_upload(analyzer, "broken.docx", b"not a document")
+                job = jobs.submit(broken)
+                assert wait_finished(job, timeout=60) == "failed"
+                assert "Word 문서 읽기 오류" in job.error
+                assert analyzer.store.get_content(broken["file_hash"], ".docx") is None
+
+                truncated = make_upload(analyzer, "book.xlsx", book_data)
+                job = jobs.submit(truncated)
+                assert wait_finished(job, timeout=60) == "done"
+                assert "행 수 제한" in job.result["file_info"]["content"]
+                assert analyzer.store.get_content(truncated["file_hash"], ".xlsx") is None
+            finally:
+                jobs.shutdown()
+
+if __name__ == "__main__":
+    test_thread_job_completes_and_caches_content()
+    test_backpressure_and_cancel_queued_job()
+    test_process_job_streams_pages_and_times_out()
+    test_extraction_failures_fail_the_job_and_partial_results_are_not_cached()
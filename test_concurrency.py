@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+비동기 동시 실행 제한기 테스트
+"""
+
+import asyncio
+
+import pytest
+
+from concurrency import BackgroundEventLoop, ConcurrencyLimiter, ConcurrencyLimitTimeout, SingleFlight
+
+def test_global_and_per_session_limits():
+    """전역/세션별 동시 실행 수가 제한을 넘지 않는지 테스트"""
+    limiter = ConcurrencyLimiter(max_concurrent=3, max_per_session=1)
+    running = {"total": 0, "max_total": 0, "per_session": {}, "max_per_session": 0}
+    
+    async def call(session_key):
+        async with limiter.acquire(session_key):
+            running["total"] += 1
+            running["per_session"][session_key] = running["per_session"].get(session_key, 0) + 1
+            running["max_total"] = max(running["max_total"], running["total"])
+            running["max_per_session"] = max(running["max_per_session"],
+                                             running["per_session"][session_key])
+            await asyncio.sleep(0.01)
+            running["total"] -= 1
+            running["per_session"][session_key] -= 1
+    
+    async def main():
+        await asyncio.gather(*(call(f"s{i % 5}") for i in range(20)))
+    
+    BackgroundEventLoop().run(main(), timeout=5)
+    assert running["max_total"] == 3
+    assert running["max_per_session"] == 1
+    assert limiter.stats()["in_flight"] == 0 and limiter.stats()["queued"] == 0
+
+def test_queue_timeout():
+    """슬롯을 얻지 못하면 제한 시간 후 예외가 발생하는지 테스트"""
+    limiter = ConcurrencyLimiter(max_concurrent=1, queue_timeout=0.05)
+    
+    async def main():
+        async with limiter.acquire():
+            with pytest.raises(ConcurrencyLimitTimeout):
+                async with limiter.acquire():
+                    pass
+    
+    asyncio.run(main())
+    assert limiter.stats()["timeouts"] == 1
+
+def test_acquire_sync_shares_slots_with_async_calls():
+    """동기 스레드가 잡은 슬롯이 비동기 요청과 같은 제한을 받고, 블록이 끝나면 반환되는지 테스트"""
+    event_loop = BackgroundEventLoop()
+    limiter = ConcurrencyLimiter(max_concurrent=1, queue_timeout=0.05)
+    
+    async def call():
+        async with limiter.acquire():
+            return "ok"
+    
+    with limiter.acquire_sync(event_loop, "s1"):
+        assert limiter.stats()["in_flight"] == 1
+        with pytest.raises(ConcurrencyLimitTimeout):
+            event_loop.run(call(), timeout=5)
+        with pytest.raises(ConcurrencyLimitTimeout):
+            with limiter.acquire_sync(event_loop):
+                pass
+    assert event_loop.run(call(), timeout=5) == "ok"
+    assert limiter.stats()["in_flight"] == 0 and limiter.stats()["timeouts"] == 2
+    event_loop.stop()
+
+def test_single_flight_coalesces_concurrent_calls():
+    """같은 키의 동시 호출은 한 번만 실행되고 모두 같은 결과를 받는지 테스트"""
+    single_flight = SingleFlight()
+    calls = []
+    
+    async def fetch(key):
+        calls.append(key)
+        await asyncio.sleep(0.01)
+        return f"answer:{key}"
+    
+    async def main():
+        return await asyncio.gather(
+            *(single_flight.do(key, lambda key=key: fetch(key)) for key in ["a"] * 5 + ["b"] * 2))
+    
+    results = asyncio.run(main())
+    assert results == ["answer:a"] * 5 + ["answer:b"] * 2
+    assert sorted(calls) == ["a", "b"]
+    stats = single_flight.stats()
+    assert stats["upstream_calls"] == 2 and stats["coalesced_calls"] == 5
+    assert stats["in_flight"] == 0
+    
+    # 끝난 호출은 합치지 않고 새로 실행
+    asyncio.run(main())
+    assert len(calls) == 4
+
+if __name__ == "__main__":
+    test_global_and_per_session_limits()
+    test_queue_timeout()
+    test_acquire_sync_shares_slots_with_async_calls()
+    test_single_flight_coalesces_concurrent_calls()
@@ -4,6 +4,11 @@
 """
 
 from conversation_manager import ConversationManager
+from persistence_writer import WriteBehindWriter
+from context_compactor import ContextCompactor
+from tokenizer import CharRatioTokenizer
+import os
+import tempfile
 import time
 
 def test_conversation_manager():
@@ -68,5 +73,166 @@ def test_conversation_manager():
     
     print("테스트가 완료되었습니다!")
 
+def test_journal_persistence():
+    """저널 기록, 압축, 스냅샷 + 저널 재생 테스트"""
+    with tempfile.TemporaryDirectory() as history_dir:
+        cm = ConversationManager(max_history=10, history_dir=history_dir, compact_every=4)
+        for i in range(6):
+            cm.add_message("user", f"메시지 {i}", 0.1, "test")
+        
+        # 4개에서 압축되고 나머지 2개는 저널에 남아 있어야 함
+        journal_path = os.path.join(history_dir, f"conversation_{cm.session_id}.jsonl")
+        with open(journal_path, encoding='utf-8') as f:
+            assert len(f.readlines()) == 2
+        
+        loaded = ConversationManager(max_history=10, history_dir=history_dir)
+        assert loaded.load_from_file(cm.session_id)
+        assert [m["content"] for m in loaded.conversation_history] == [f"메시지 {i}" for i in range(6)]
+        
+        # 로드 후 이어서 추가한 메시지도 복원되어야 함
+        loaded.add_message("assistant", "이어서", 0.2, "test")
+        reloaded = ConversationManager(max_history=10, history_dir=history_dir)
+        assert reloaded.load_from_file(cm.session_id)
+        assert len(reloaded.conversation_history) == 7
+        assert reloaded.get_available_sessions() == [cm.session_id]
+
+def test_write_behind_flush():
+    """쓰기 지연 모드에서 여러 갱신이 한 번의 쓰기로 합쳐지는지 테스트"""
+    with tempfile.TemporaryDirectory() as history_dir:
+        writer = WriteBehindWriter(flush_interval=60, max_dirty_age=60)
+        writer.start()
+        cm = ConversationManager(max_history=10, history_dir=history_dir,
+                                 write_behind=True, writer=writer)
+        for i in range(3):
+            cm.add_message("user", f"메시지 {i}", 0.1, "test")
+        
+        # 백그라운드 작성기가 아직 쓰지 않았으므로 파일이 없어야 함
+        journal_path = os.path.join(history_dir, f"conversation_{cm.session_id}.jsonl")
+        assert not os.path.exists(journal_path)
+        
+        writer.shutdown()
+        with open(journal_path, encoding='utf-8') as f:
+            assert len(f.readlines()) == 3
+
+def test_context_window_selection():
+    """누적합 기반 컨텍스트 선택이 최신 메시지부터 채우는 방식과 같은지 테스트"""
+    with tempfile.TemporaryDirectory() as history_dir:
+        cm = ConversationManager(max_history=8, save_to_file=False, history_dir=history_dir)
+        for i in range(20):
+            cm.add_message("user" if i % 2 == 0 else "assistant", "가" * (i % 5) + "word " * i)
+        
+        for max_tokens in range(0, 120, 7):
+            expected = []
+            total = 0
+            for message in reversed(cm.conversation_history):
+                if total + message["token_count"] > max_tokens:
+                    break
+                expected.insert(0, {"role": message["role"], "content": message["content"]})
+                total += message["token_count"]
+            assert cm.get_context_for_llm(max_tokens=max_tokens) == expected
+
+def test_incremental_summary():
+    """max_history로 메시지가 밀려난 뒤에도 누적 통계가 정확한지 테스트"""
+    with tempfile.TemporaryDirectory() as history_dir:
+        cm = ConversationManager(max_history=5, save_to_file=False, history_dir=history_dir)
+        for i in range(8):
+            cm.add_message("user", f"질문 {i}", None, "user")
+            cm.add_message("assistant", f"답변 {i}", 0.5 + i,
+                           "rule_engine" if i % 2 == 0 else "llm_api")
+        
+        history = list(cm.conversation_history)
+        answers = [m for m in history if m["role"] == "assistant"]
+        summary = cm.get_conversation_summary()
+        assert summary["total_messages"] == 5
+        assert summary["user_messages"] == len(history) - len(answers)
+        assert summary["assistant_messages"] == len(answers)
+        assert abs(summary["avg_response_time"]
+                   - sum(m["response_time"] for m in answers) / len(answers)) < 1e-9
+        assert summary["start_time"] == history[0]["timestamp"]
+        assert summary["by_source"]["llm_api"]["messages"] == sum(
+            1 for m in history if m["source"] == "llm_api")
+
+def test_context_compaction():
+    """밀려난 대화가 누적 요약으로 합쳐지고 컨텍스트 크기가 제한되는지 테스트"""
+    summarized = []
+    
+    def summarize(previous_summary, messages):
+        summarized.extend(message["content"] for message in messages)
+        return " | ".join(filter(None, [previous_summary] + [m["content"] for m in messages]))
+    
+    compactor = ContextCompactor(summarize)
+    with tempfile.TemporaryDirectory() as history_dir:
+        cm = ConversationManager(max_history=6, history_dir=history_dir,
+                                 compactor=compactor, context_recent_tokens=10)
+        for i in range(20):
+            cm.add_message("user" if i % 2 == 0 else "assistant", f"메시지{i}")
+            if i == 9:
+                assert compactor.wait_idle(5)
+        assert compactor.wait_idle(5)
+        
+        # 히스토리에서 밀려난 메시지까지 순서대로 한 번씩만 요약됨
+        recent = cm.get_context_for_llm(max_tokens=1000)
+        assert summarized == [f"메시지{i}" for i in range(len(summarized))]
+        assert recent[0]["role"] == "system"
+        assert [m["content"] for m in recent[1:]] == [f"메시지{i}" for i in range(len(summarized), 20)]
+        # 최근 구간(10토큰) + 아직 한 묶음이 되지 않아 요약되지 않은 메시지
+        assert sum(cm.tokenizer.count_tokens(m["content"]) for m in recent[1:]) < 10 + cm.context_summary_batch_tokens
+        
+        # 스냅샷에 저장된 요약은 다시 로드해도 유지됨
+        cm.compact()
+        loaded = ConversationManager(max_history=6, history_dir=history_dir,
+                                     compactor=compactor, context_recent_tokens=10)
+        assert loaded.load_from_file(cm.session_id)
+        assert loaded.get_context_for_llm(max_tokens=1000) == recent
+        
+        cm.clear_history()
+        assert cm.get_context_for_llm() == []
+
+def test_context_summary_batching_and_backoff():
+    """요약이 묶음 단위로만 호출되고, 묶음 크기 상한과 실패 후 백오프가 지켜지는지 테스트"""
+    calls = []
+    failing = []
+    
+    def summarize(previous_summary, messages):
+        calls.append(sum(len(m["content"]) for m in messages))
+        if failing:
+            raise RuntimeError("요약 실패")
+        return "요약"
+    
+    compactor = ContextCompactor(summarize)
+    # 메시지 하나 = 10토큰, 최근 구간 100토큰(10개), 밀려난 토큰이 50 이상일 때 요약
+    cm = ConversationManager(max_history=20, save_to_file=False, tokenizer=CharRatioTokenizer(1),
+                             compactor=compactor, context_recent_tokens=100,
+                             context_summary_max_batch_tokens=80)
+    for i in range(100):
+        cm.add_message("user", "x" * 10)
+        assert compactor.wait_idle(5)
+    # 90개(900토큰)가 밀려나 매 턴이 아니라 50토큰마다 한 번만 요약
+    assert calls == [50] * 18
+    assert compactor.stats()["errors"] == 0
+    
+    # 실패하면 매 턴 다시 시도하지 않고 백오프 시각까지 기다리며, 밀려난 메시지 보관 수도 제한됨
+    failing.append(True)
+    calls.clear()
+    cm.summary_retry_delay = 60
+    for i in range(100):
+        cm.add_message("user", "x" * 10)
+        assert compactor.wait_idle(5)
+    assert len(calls) == 1 and compactor.stats()["errors"] == 1
+    assert len(cm._unsummarized_evicted) <= cm.max_history
+    
+    # 백오프가 지나면 다시 시도하고, 쌓인 메시지는 한 번에 80토큰까지만 합치며 성공하면 백오프가 풀림
+    failing.clear()
+    cm._summary_retry_at = 0.0
+    cm.add_message("user", "x" * 10)
+    assert compactor.wait_idle(5)
+    assert calls[1:] == [80] and cm._summary_failures == 0
+
 if __name__ == "__main__":
     test_conversation_manager()
+    test_journal_persistence()
+    test_write_behind_flush()
+    test_context_window_selection()
+    test_incremental_summary()
+    test_context_compaction()
+    test_context_summary_batching_and_backoff()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+대화 기록 저장소(JSON 파일, SQLite)와 JSON → SQLite 마이그레이션 테스트
+"""
+
+import os
+import tempfile
+
+import pytest
+
+from context_compactor import ContextCompactor
+from conversation_manager import ConversationManager
+from conversation_store import ConversationStore, JsonFileStore, SqliteConversationStore, migrate_json_sessions
+
+def test_manager_round_trip_on_both_stores():
+    """두 저장소 모두에서 저널 기록, 압축, 다시 로드, 세션 목록이 같게 동작하는지 테스트"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        stores = [JsonFileStore(os.path.join(tmp_dir, "json")),
+                  SqliteConversationStore(os.path.join(tmp_dir, "sqlite", "conversations.db"))]
+        for store in stores:
+            cm = ConversationManager(max_history=5, compact_every=3, store=store, session_id="s1")
+            for i in range(8):
+                cm.add_message("user" if i % 2 == 0 else "assistant", f"메시지 {i}", 0.1, "test")
+
+            loaded = ConversationManager(max_history=5, store=store)
+            assert loaded.load_from_file("s1")
+            assert [m["content"] for m in loaded.conversation_history] == [f"메시지 {i}" for i in range(3, 8)]
+            assert loaded.get_conversation_summary()["user_messages"] == 2
+
+            loaded.add_message("user", "이어서", 0.1, "test")
+            reloaded = ConversationManager(max_history=5, store=store)
+            assert reloaded.load_from_file("s1") and reloaded.get_recent_messages(1)[0]["content"] == "이어서"
+            assert reloaded.get_available_sessions() == ["s1"]
+            assert reloaded.get_catalog_entry()["size_bytes"] > 0
+            assert not reloaded.load_from_file("missing")
+        stores[1].close()
+
+def test_sqlite_pagination_and_context_summary():
+    """SQLite 저장소가 오래된 메시지를 범위 조회로 읽고, 누적 요약을 유지한 채 필요한 구간만 로드하는지 테스트"""
+    def summarize(previous_summary, messages):
+        return " | ".join(filter(None, [previous_summary] + [m["content"] for m in messages]))
+
+    compactor = ContextCompactor(summarize)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = SqliteConversationStore(os.path.join(tmp_dir, "conversations.db"))
+        cm = ConversationManager(max_history=5, store=store, session_id="s1",
+                                 compactor=compactor, context_recent_tokens=10)
+        for i in range(30):
+            cm.add_message("user", f"메시지{i}")
+        assert compactor.wait_idle(5)
+        cm.compact()
+
+        # 최근 구간은 메모리에서, 히스토리에서 밀려난 구간은 저장소에서 읽음
+        assert [seq for seq, _ in cm.get_message_page(limit=3)] == [28, 29, 30]
+        page = cm.get_message_page(before_seq=12, limit=4)
+        assert [(seq, m["content"]) for seq, m in page] == [(seq, f"메시지{seq - 1}") for seq in range(8, 12)]
+        assert cm.get_message_page(before_seq=3, limit=10)[0][0] == 1
+
+        plan = " ".join(row[-1] for row in store._db().execute(
+            "EXPLAIN QUERY PLAN SELECT seq FROM messages WHERE session_id = ? AND seq < ? "
+            "ORDER BY seq DESC LIMIT ?", ("s1", 12, 4)))
+        assert "USING" in plan and "INDEX" in plan and "TEMP B-TREE" not in plan
+
+        # 요약에 합쳐진 메시지는 다시 읽지 않음
+        session = store.load("s1", max_messages=5, include_unsummarized=True)
+        assert session["context_summary"]["summarized_seq"] >= 30 - len(session["messages"])
+        assert len(session["messages"]) <= 5 and session["journal_entries"] == 0
+        loaded = ConversationManager(max_history=5, store=store, compactor=compactor, context_recent_tokens=10)
+        assert loaded.load_from_file("s1")
+        assert loaded.get_context_for_llm(max_tokens=1000) == cm.get_context_for_llm(max_tokens=1000)
+        store.close()
+
+def test_migrate_json_sessions():
+    """JSON 파일 세션(스냅샷 + 저널)을 SQLite로 가져오고, 다시 실행해도 중복되지 않는지 테스트"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        history_dir = os.path.join(tmp_dir, "history")
+        json_store = JsonFileStore(history_dir)
+        for index in range(3):
+            cm = ConversationManager(max_history=10, compact_every=4, store=json_store, session_id=f"s{index}")
+            for i in range(5 + index):
+                cm.add_message("user", f"세션{index} 메시지 {i}", 0.1, "test")
+        with open(os.path.join(history_dir, "conversation_broken.json"), 'w', encoding='utf-8') as f:
+            f.write("{")
+
+        db_path = os.path.join(tmp_dir, "conversations.db")
+        result = migrate_json_sessions(history_dir, db_path, batch_size=2)
+        assert result == {"sessions": 3, "messages": 5 + 6 + 7, "failed": ["broken"]}
+        assert migrate_json_sessions(history_dir, db_path)["messages"] == 0
+
+        sqlite_store = SqliteConversationStore(db_path)
+        assert sqlite_store.list_sessions() == ["s2", "s1", "s0"]
+        for index in range(3):
+            expected = json_store.load(f"s{index}")
+            migrated = sqlite_store.load(f"s{index}")
+            assert migrated["last_seq"] == expected["last_seq"]
+            assert [m["content"] for m in migrated["messages"]] == [m["content"] for m in expected["messages"]]
+        assert sqlite_store.size_bytes("s0") == sum(
+            len(f"세션0 메시지 {i}".encode("utf-8")) for i in range(5))
+        sqlite_store.close()
+
+def test_migrate_keeps_summaries():
+    """스냅샷의 대화 통계 요약과 누적 요약(압축된 컨텍스트)이 마이그레이션 후에도 유지되는지 테스트"""
+    def summarize(previous_summary, messages):
+        return " | ".join(filter(None, [previous_summary] + [m["content"] for m in messages]))
+
+    compactor = ContextCompactor(summarize)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        history_dir = os.path.join(tmp_dir, "history")
+        cm = ConversationManager(max_history=5, store=JsonFileStore(history_dir), session_id="s1",
+                                 compactor=compactor, context_recent_tokens=10)
+        for i in range(20):
+            cm.add_message("user", f"메시지{i}", 0.1, "test")
+            assert compactor.wait_idle(5)
+        cm.compact()
+        expected = JsonFileStore(history_dir).load("s1")
+        assert expected["context_summary"]["content"] and expected["summary"]["total_messages"] == 5
+
+        db_path = os.path.join(tmp_dir, "conversations.db")
+        migrate_json_sessions(history_dir, db_path)
+        sqlite_store = SqliteConversationStore(db_path)
+        migrated = sqlite_store.load("s1")
+        assert migrated["summary"] == expected["summary"]
+        assert migrated["context_summary"] == expected["context_summary"]
+
+        loaded = ConversationManager(max_history=5, store=sqlite_store, compactor=compactor,
+                                     context_recent_tokens=10)
+        assert loaded.load_from_file("s1")
+        assert loaded.get_context_for_llm(max_tokens=1000) == cm.get_context_for_llm(max_tokens=1000)
+        sqlite_store.close()
+
+def test_incomplete_store_fails_at_construction():
+    """저장소 인터페이스를 다 구현하지 않은 클래스는 호출할 때가 아니라 생성할 때 실패하는지 테스트"""
+    class AppendOnlyStore(ConversationStore):
+        def append_messages(self, session_id, entries):
+            pass
+
+    with pytest.raises(TypeError):
+        AppendOnlyStore()
+
+if __name__ == "__main__":
+    test_manager_round_trip_on_both_stores()
+    test_sqlite_pagination_and_context_summary()
+    test_migrate_json_sessions()
+    test_migrate_keeps_summaries()
+    test_incomplete_store_fails_at_construction()
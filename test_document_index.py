@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+업로드 문서 조각 검색 색인 테스트
+"""
+
+import os
+import tempfile
+
+from document_index import DocumentIndex, format_reference, split_chunks, tokenize_terms
+from tokenizer import KoreanApproxTokenizer
+
+def make_document(sections):
+    """주제별로 여러 줄짜리 절이 이어지는 문서"""
+    lines = []
+    for topic, detail in sections:
+        lines.extend(f"{topic}에 관한 {i}번째 설명입니다. {detail}" for i in range(20))
+    return "\n".join(lines)
+
+def test_split_chunks_respects_token_budget():
+    """조각이 토큰 수 제한을 넘지 않고, 이웃 조각이 겹치며, 긴 줄도 나뉘는지 테스트"""
+    tokenizer = KoreanApproxTokenizer()
+    text = make_document([("계약 기간", "계약은 2025년 말까지 유효합니다."), ("환불 정책", "환불은 7일 이내 가능합니다.")])
+    chunks = split_chunks(text, tokenizer, chunk_tokens=100, overlap_tokens=30)
+    assert len(chunks) > 5
+    assert all(tokenizer.count_tokens(chunk) <= 100 for chunk in chunks)
+    assert chunks[1].splitlines()[0] in chunks[0]
+
+    long_line = "가" * 1000
+    pieces = split_chunks(long_line, tokenizer, chunk_tokens=100, overlap_tokens=0)
+    assert "".join(pieces) == long_line and all(tokenizer.count_tokens(piece) <= 100 for piece in pieces)
+
+    assert tokenize_terms("파일을 Upload 했다") == ["파일", "일을", "upload", "했다"]
+
+def test_retrieve_relevant_chunks_per_session_under_budget():
+    """질문과 관련된 조각만 세션별로 토큰 예산 안에서 돌려주는지 테스트"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        index = DocumentIndex(os.path.join(tmp_dir, "documents.db"), chunk_tokens=80,
+                              overlap_tokens=20, max_documents_per_session=2)
+        contract = make_document([("계약 기간", "계약은 2025년 말까지 유효합니다."),
+                                  ("환불 정책", "환불은 구매 후 7일 이내에 가능합니다."),
+                                  ("배송 안내", "배송은 영업일 기준 3일이 걸립니다.")])
+        chunk_count = index.add_document("s1", "hash-contract", "contract.txt", contract)
+        assert chunk_count > 6
+        assert index.add_document("s1", "hash-contract", "contract.txt", contract) == chunk_count
+
+        chunks = index.retrieve("s1", "환불은 며칠 안에 가능한가요?", top_k=3, token_budget=200)
+        assert 0 < len(chunks) <= 3 and sum(chunk["token_count"] for chunk in chunks) <= 200
+        assert all("환불" in chunk["content"] for chunk in chunks)
+        assert [chunk["position"] for chunk in chunks] == sorted(chunk["position"] for chunk in chunks)
+        assert "[contract.txt #" in format_reference(chunks)
+
+        # 다른 세션에는 보이지 않고, 같은 문서를 올리면 조각을 복사해 같은 결과를 줌
+        assert index.retrieve("s2", "환불") == []
+        assert index.add_document("s2", "hash-contract", "copy.txt", "") == chunk_count
+        copied = index.retrieve("s2", "환불은 며칠 안에 가능한가요?", top_k=3, token_budget=200)
+        assert [chunk["content"] for chunk in copied] == [chunk["content"] for chunk in chunks]
+
+        # 겹치는 단어가 없는 질문은 가장 최근 문서의 앞부분
+        fallback = index.retrieve("s1", "summary?!", top_k=2, token_budget=1000)
+        assert [chunk["position"] for chunk in fallback] == [0, 1]
+
+        # 세션당 최대 문서 수를 넘으면 오래된 문서부터 제거
+        index.add_document("s1", "hash-a", "a.txt", "첫 번째 메모")
+        index.add_document("s1", "hash-b", "b.txt", "두 번째 메모")
+        assert [document["filename"] for document in index.list_documents("s1")] == ["b.txt", "a.txt"]
+
+        index.remove_session("s1")
+        assert index.list_documents("s1") == [] and index.retrieve("s1", "메모") == []
+        assert index.retrieve("s2", "환불")
+        index.close()
+
+if __name__ == "__main__":
+    test_split_chunks_respects_token_budget()
+    test_retrieve_relevant_chunks_per_session_under_budget()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+스트리밍 Excel 추출 테스트
+"""
+
+import io
+import os
+import tempfile
+
+import openpyxl
+
+from excel_extractor import StreamingExcelExtractor
+from file_analyzer import FileAnalyzer
+
+def write_workbook(path):
+    """헤더가 있는 시트, 빈 행이 섞인 숫자 시트, 빈 시트로 된 통합 문서 생성"""
+    workbook = openpyxl.Workbook()
+    people = workbook.active
+    people.title = "people"
+    people.append(["이름", "나이", "도시", "메모"])
+    for i in range(10):
+        people.append([f"사람{i}", 20 + i, "서울", "x" * 20])
+    numbers = workbook.create_sheet("numbers")
+    numbers.append([1, 2.0, 3.5])
+    numbers.append([])
+    numbers.append([4, None, 6])
+    workbook.create_sheet("empty")
+    workbook.save(path)
+
+def test_streaming_extraction_with_header_and_caps():
+    """헤더 감지, 빈 행 건너뛰기, 행/열/크기 제한이 시트마다 적용되는지 테스트"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "book.xlsx")
+        write_workbook(path)
+
+        result = StreamingExcelExtractor().extract_text(path)
+        people, numbers, empty = result["sheets"]
+        assert people["header"] == ["이름", "나이", "도시", "메모"] and people["rows"] == 11
+        assert numbers["header"] is None and numbers["rows"] == 2 and not numbers["truncated"]
+        assert empty["rows"] == 0
+        assert "[헤더] 이름 | 나이 | 도시 | 메모" in result["content"]
+        assert "1 | 2 | 3.5\n4 |  | 6\n" in result["content"]
+        assert "--- 시트: empty ---" in result["content"]
+
+        capped = StreamingExcelExtractor(max_rows=3, max_columns=2).extract_text(path)
+        people = capped["sheets"][0]
+        assert people["truncated"] and people["reason"] == "max_rows" and people["rows"] == 3
+        assert "사람1 | 21\n" in capped["content"] and "사람2" not in capped["content"]
+        assert "(행 수 제한으로 전체 11행 중 3행만 추출했습니다.)" in capped["content"]
+        assert capped["sheets"][1]["columns"] == 2
+
+        limited = StreamingExcelExtractor(max_bytes=100).extract_text(path)
+        assert limited["sheets"][0]["reason"] == "max_bytes"
+        assert 0 < limited["sheets"][0]["rows"] < 11 and not limited["sheets"][1]["truncated"]
+
+def test_file_analyzer_streams_excel_progress():
+    """FileAnalyzer가 Excel 내용을 여러 행 단위로 나눠 진행 상황을 전달하는지 테스트"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "book.xlsx")
+        write_workbook(path)
+        analyzer = FileAnalyzer(upload_dir=tmp_dir, excel_max_rows=5)
+        analyzer.excel_extractor.chunk_rows = 4
+
+        parts = []
+        content = analyzer.extract_content(path, ".xlsx", on_progress=parts.append)
+        assert len(parts) > 3 and "".join(parts) == content
+        assert "행 수 제한" in content
+
+def test_failed_and_truncated_extractions_are_not_cached():
+    """추출 오류와 제한으로 잘린 내용은 업로드 저장소에 남지 않고, 전체 내용만 다시 사용되는지 테스트"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "book.xlsx")
+        write_workbook(path)
+        with open(path, "rb") as f:
+            data = f.read()
+
+        def as_file(filename, content):
+            file = io.BytesIO(content)
+            file.filename = filename
+            return file
+
+        def upload(analyzer, filename, content):
+            return analyzer.analyze_file(as_file(filename, content))
+
+        def stored(analyzer, content):
+            """같은 내용을 다시 올렸을 때 저장소에서 바로 가져오는 내용 (없으면 None)"""
+            return analyzer.prepare_upload(as_file("again.xlsx", content))["content"]
+
+        analyzer = FileAnalyzer(upload_dir=os.path.join(tmp_dir, "uploads"), excel_max_rows=5)
+        broken = upload(analyzer, "broken.xlsx", b"not a workbook")
+        assert not broken["success"] and "Excel 파일 읽기 오류" in broken["error"]
+        assert stored(analyzer, b"not a workbook") is None
+
+        truncated = upload(analyzer, "book.xlsx", data)
+        assert truncated["success"] and "행 수 제한" in truncated["file_info"]["content"]
+        assert stored(analyzer, data) is None
+
+        analyzer = FileAnalyzer(upload_dir=os.path.join(tmp_dir, "uploads"))
+        complete = upload(analyzer, "book.xlsx", data)
+        assert complete["success"] and not complete["file_info"]["cached"]
+        assert stored(analyzer, data) == complete["file_info"]["content"]
+
+if __name__ == "__main__":
+    test_streaming_extraction_with_header_and_caps()
+    test_file_analyzer_streams_excel_progress()
+    test_failed_and_truncated_extractions_are_not_cached()
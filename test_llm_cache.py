@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+LLM 응답 캐시 테스트
+"""
+
+import os
+import tempfile
+import time
+
+from llm_cache import ResponseCache, normalize_prompt
+
+def test_cache_key_normalization():
+    """공백/대소문자 차이는 같은 키, 모델이나 컨텍스트가 다르면 다른 키"""
+    context = [{"role": "user", "content": "안녕"}]
+    key = ResponseCache.make_key("gpt-3.5-turbo", "  Python 이  뭔가요? ", context)
+    assert key == ResponseCache.make_key("gpt-3.5-turbo", "python 이 뭔가요?", context)
+    assert key != ResponseCache.make_key("gpt-4", "python 이 뭔가요?", context)
+    assert key != ResponseCache.make_key("gpt-3.5-turbo", "python 이 뭔가요?", [])
+    assert normalize_prompt("Ａ\tB") == "a b"
+
+def test_memory_lru_ttl_and_disk_tier():
+    """메모리 LRU 제거, TTL 만료, 디스크 캐시 재사용 테스트"""
+    with tempfile.TemporaryDirectory() as cache_dir:
+        disk_path = os.path.join(cache_dir, "llm_cache.db")
+        cache = ResponseCache(max_entries=2, ttl=60, disk_path=disk_path)
+        for key in ("a", "b", "c"):
+            cache.put(key, f"응답 {key}")
+        
+        # 메모리에서 밀려난 a는 디스크에서 찾음
+        assert cache.get("a") == "응답 a"
+        assert cache.get("c") == "응답 c"
+        assert cache.get("없음") is None
+        stats = cache.stats()
+        assert stats["hits"] == 1 and stats["disk_hits"] == 1 and stats["misses"] == 1
+        
+        # 재시작 후에도 디스크 캐시 유지
+        restarted = ResponseCache(disk_path=disk_path)
+        assert restarted.get("b") == "응답 b"
+        
+        expiring = ResponseCache(ttl=0.01)
+        expiring.put("k", "v")
+        time.sleep(0.02)
+        assert expiring.get("k") is None
+
+if __name__ == "__main__":
+    test_cache_key_normalization()
+    test_memory_lru_ttl_and_disk_tier()
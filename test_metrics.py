@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+지표(카운터, 히스토그램, 콜백 지표)와 Prometheus 텍스트 출력 테스트
+"""
+
+import time
+
+import pytest
+
+from metrics import OVERHEAD_BUDGET_SECONDS, CallbackMetric, Counter, Histogram, Registry, timed
+
+def test_render_text_exposition_format():
+    """누적 버킷, 합계, 개수, 레이블 이스케이프가 텍스트 형식에 맞게 출력되는지 테스트"""
+    registry = Registry()
+    latency = Histogram("stage_seconds", "단계별 시간", ("stage",), buckets=(0.1, 1.0), registry=registry)
+    latency.labels("rule").observe(0.05)
+    latency.labels("rule").observe(0.5)
+    latency.labels("rule").observe(5)
+    requests = Counter("requests_total", "요청 수\n(출처별)", ("source",), registry=registry)
+    requests.labels('say "hi"').inc()
+    requests.labels('say "hi"').inc(2)
+    CallbackMetric("cache_hit_ratio", "적중률", "gauge", lambda: {("llm",): 0.25}, ("cache",), registry=registry)
+
+    text = registry.render()
+    assert text.endswith("\n")
+    assert """# HELP stage_seconds 단계별 시간
+# TYPE stage_seconds histogram
+stage_seconds_bucket{stage="rule",le="0.1"} 1
+stage_seconds_bucket{stage="rule",le="1"} 2
+stage_seconds_bucket{stage="rule",le="+Inf"} 3
+stage_seconds_sum{stage="rule"} 5.55
+stage_seconds_count{stage="rule"} 3
+""" in text
+    assert "# HELP requests_total 요청 수\\n(출처별)\n# TYPE requests_total counter\n" in text
+    assert 'requests_total{source="say \\"hi\\""} 3\n' in text
+    assert '# TYPE cache_hit_ratio gauge\ncache_hit_ratio{cache="llm"} 0.25\n' in text
+
+    with pytest.raises(ValueError):
+        Counter("requests_total", "중복", registry=registry)
+    with pytest.raises(ValueError):
+        latency.labels("rule", "extra")
+
+def test_timed_records_outcome_and_stays_within_budget():
+    """timed가 예외 여부를 결과 레이블로 남기고, 요청당 기록 비용이 예산 안인지 테스트"""
+    registry = Registry()
+    upstream = Histogram("upstream_seconds", "LLM", ("operation", "outcome"), registry=registry)
+    with timed(upstream, "completion"):
+        pass
+    with pytest.raises(RuntimeError):
+        with timed(upstream, "completion"):
+            raise RuntimeError("실패")
+    text = registry.render()
+    assert 'upstream_seconds_count{operation="completion",outcome="ok"} 1' in text
+    assert 'upstream_seconds_count{operation="completion",outcome="error"} 1' in text
+
+    from benchmarks.bench_metrics import build_request_metrics, record_request
+
+    metrics = build_request_metrics(Registry())
+    requests = 2000
+    start = time.perf_counter()
+    for _ in range(requests):
+        record_request(metrics)
+    per_request = (time.perf_counter() - start) / requests
+    # 다른 테스트와 함께 돌 때의 흔들림을 감안해 예산의 두 배까지 허용
+    assert per_request < OVERHEAD_BUDGET_SECONDS * 2, f"요청당 {per_request * 1e6:.1f}µs"
+
+if __name__ == "__main__":
+    test_render_text_exposition_format()
+    test_timed_records_outcome_and_stays_within_budget()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+OCR 파이프라인 테스트 (전처리, 띠 분할, 프레임 처리, 결과 캐시)
+"""
+
+import os
+import shutil
+import tempfile
+
+import pytest
+from PIL import Image, ImageDraw
+
+from ocr_pipeline import OcrPipeline, iter_frames, merge_strip_texts, preprocess_image, split_strips
+
+def draw_lines(size, lines, background="white", ink="black"):
+    """줄마다 글자 대신 검은 막대를 그린 이미지 (y 좌표 목록)"""
+    image = Image.new("RGB", size, background)
+    draw = ImageDraw.Draw(image)
+    for y in lines:
+        draw.rectangle((50, y, size[0] - 50, y + 20), fill=ink)
+    return image
+
+def test_preprocess_normalizes_size_and_color():
+    """큰 이미지는 줄이고 작은 이미지는 키우며, 흑백으로 만들고 어두운 배경은 뒤집는지 테스트"""
+    large = preprocess_image(draw_lines((4000, 3000), [100, 500]), max_side=2000)
+    assert large.size == (2000, 1500) and large.mode == "L"
+    histogram = large.histogram()
+    assert histogram[0] + histogram[255] == 2000 * 1500
+
+    small = preprocess_image(draw_lines((200, 100), [40]), min_side=800)
+    assert max(small.size) == 800
+
+    dark = preprocess_image(draw_lines((1000, 1000), [100], background="black", ink="white"))
+    assert dark.histogram()[255] > dark.histogram()[0]
+
+def test_split_strips_cut_between_lines_and_merge_overlap():
+    """띠 경계가 글자 줄 사이에 오고 겹친 영역에서 두 번 읽힌 줄은 한 번만 남는지 테스트"""
+    lines = list(range(30, 1900, 60))
+    image = preprocess_image(draw_lines((1000, 1950), lines), max_side=2000, min_side=1)
+    boxes = split_strips(image, strip_height=500, overlap=20)
+
+    assert boxes[0][0] == 0 and boxes[-1][1] == image.height and len(boxes) == 4
+    for (_, bottom), (top, _) in zip(boxes, boxes[1:]):
+        assert bottom - top == 40
+        cut = top + 20
+        assert all(not (y <= cut <= y + 20) for y in lines)
+
+    assert merge_strip_texts(["a\nb\nc", "b\nc\nd", "", "d\ne"]) == "a\nb\nc\nd\ne"
+    assert merge_strip_texts(["x\ny", "z"]) == "x\ny\nz"
+
+def test_gif_frames_use_cache_per_image_hash():
+    """GIF의 모든 프레임을 처리하고, 캐시에 있는 프레임은 OCR하지 않는지 테스트"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "anim.gif")
+        frames = [draw_lines((300, 200), [20]), draw_lines((300, 200), [120]), draw_lines((300, 200), [20])]
+        frames[0].save(path, save_all=True, append_images=frames[1:], duration=100, disposal=2)
+
+        pipeline = OcrPipeline(cache_path=os.path.join(tmp_dir, "ocr_cache.db"), max_frames=None)
+        with Image.open(path) as image:
+            keys = [pipeline.cache_key(preprocess_image(frame)) for frame in iter_frames(image)]
+        assert len(keys) == 3 and keys[0] == keys[2] != keys[1]
+
+        # 캐시에 결과가 있으면 tesseract 없이 결과를 돌려줌 (같은 프레임은 같은 키)
+        pipeline._get_cache().put(keys[0], "first")
+        pipeline._get_cache().put(keys[1], "second")
+        result = pipeline.extract_text(path)
+        assert result == {"text": "--- 프레임 1 ---\nfirst\n--- 프레임 2 ---\nsecond\n--- 프레임 3 ---\nfirst",
+                          "frames": 3, "total_frames": 3}
+
+        restarted = OcrPipeline(cache_path=os.path.join(tmp_dir, "ocr_cache.db"), max_frames=1)
+        assert restarted.extract_text(path) == {"text": "first", "frames": 1, "total_frames": 3}
+
+@pytest.mark.skipif(shutil.which("tesseract") is None, reason="tesseract가 설치되지 않음")
+def test_ocr_large_image_in_strips():
+    """큰 이미지를 띠로 나눠 OCR한 결과에 모든 줄이 한 번씩 들어가는지 테스트"""
+    from benchmarks.bench_ocr import write_synthetic_photo
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "photo.jpg")
+        write_synthetic_photo(path, lines=20)
+        pipeline = OcrPipeline(lang="eng", max_workers=2)
+        try:
+            text = pipeline.extract_text(path)["text"]
+        finally:
+            pipeline.shutdown()
+        assert "invoice" in text and text.count("customer") >= 10
+
+if __name__ == "__main__":
+    test_preprocess_normalizes_size_and_color()
+    test_split_strips_cut_between_lines_and_merge_overlap()
+    test_gif_frames_use_cache_per_image_hash()
+    if shutil.which("tesseract"):
+        test_ocr_large_image_in_strips()
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+PDF 병렬 추출 테스트
+"""
+
+import os
+import tempfile
+
+import pytest
+
+pytest.importorskip("PyPDF2")
+
+from benchmarks.bench_pdf_extraction import write_synthetic_pdf
+from pdf_extractor import ParallelPdfExtractor
+
+def test_parallel_extraction_matches_sequential_order():
+    """프로세스 풀로 추출한 페이지가 순서대로, 빠짐없이 반환되는지 테스트"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "doc.pdf")
+        write_synthetic_pdf(path, pages=40, lines_per_page=3)
+
+        sequential = ParallelPdfExtractor(max_workers=1)
+        parallel = ParallelPdfExtractor(max_workers=2, pages_per_task=7, parallel_threshold=1)
+        try:
+            expected = list(sequential.iter_pages(path))
+            assert [page_num for page_num, _ in expected] == list(range(1, 41))
+            assert "Page 17 line 2" in expected[16][1]
+            assert list(parallel.iter_pages(path)) == expected
+        finally:
+            parallel.shutdown()
+
+def test_page_and_time_budgets_return_partial_results():
+    """페이지 수/시간 예산을 넘으면 추출한 부분까지만 반환하는지 테스트"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "doc.pdf")
+        write_synthetic_pdf(path, pages=30, lines_per_page=3)
+
+        result = ParallelPdfExtractor(max_workers=1, max_pages=12).extract_text(path)
+        assert result["truncated"] and result["reason"] == "max_pages"
+        assert result["extracted_pages"] == 12 and result["total_pages"] == 30
+        assert "--- 페이지 12 ---" in result["content"] and "--- 페이지 13 ---" not in result["content"]
+
+        result = ParallelPdfExtractor(max_workers=1, time_budget=0).extract_text(path)
+        assert result["truncated"] and result["reason"] == "time_budget"
+        assert result["extracted_pages"] == 0
+
+if __name__ == "__main__":
+    test_parallel_extraction_matches_sequential_order()
+    test_page_and_time_budgets_return_partial_results()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+LLM 호출 재시도/제한 시간/헤지 요청 테스트
+
+마지막 테스트는 로컬에서 띄운 OpenAI 호환 가짜 서버에 실제 SDK로 요청합니다.
+"""
+
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from resilience import AttemptsExhausted, ResilientCaller
+
+class FakeStatusError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+
+def make_flaky(outcomes):
+    """outcomes 순서대로 (지연 시간, 결과 또는 예외)를 내는 호출 함수"""
+    calls = []
+
+    async def call():
+        delay, outcome = outcomes[min(len(calls), len(outcomes) - 1)]
+        calls.append(outcome)
+        await asyncio.sleep(delay)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    return call, calls
+
+def test_retries_retryable_errors_and_timeouts():
+    """429/5xx와 시도 시간 초과는 재시도하고 시도 기록을 남기는지 테스트"""
+    caller = ResilientCaller(attempt_timeout=0.05, total_timeout=2, max_attempts=4,
+                             base_delay=0.001, max_delay=0.01)
+    call, calls = make_flaky([(0, FakeStatusError(429)), (0.2, "late"), (0, FakeStatusError(503)), (0, "ok")])
+
+    assert asyncio.run(caller.call(call)) == "ok"
+    assert len(calls) == 4
+    outcomes = [record["outcome"] for record in caller.recent_attempts()]
+    assert outcomes == ["ok", "error", "timeout", "error"]
+    stats = caller.stats()
+    assert stats["retries"] == 3 and stats["timeouts"] == 1 and stats["errors"] == 2
+
+def test_non_retryable_error_and_exhausted_attempts():
+    """재시도 대상이 아닌 오류는 바로, 시도를 다 쓰면 AttemptsExhausted로 실패하는지 테스트"""
+    caller = ResilientCaller(max_attempts=3, base_delay=0.001)
+    call, calls = make_flaky([(0, FakeStatusError(400))])
+    with pytest.raises(FakeStatusError):
+        asyncio.run(caller.call(call))
+    assert len(calls) == 1
+
+    call, calls = make_flaky([(0, FakeStatusError(500))])
+    with pytest.raises(AttemptsExhausted):
+        asyncio.run(caller.call(call))
+    assert len(calls) == 3
+
+def test_total_timeout():
+    """전체 제한 시간을 넘으면 asyncio.TimeoutError가 발생하는지 테스트"""
+    caller = ResilientCaller(attempt_timeout=None, total_timeout=0.05, max_attempts=5)
+    call, _ = make_flaky([(1, "late")])
+    started = time.monotonic()
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(caller.call(call))
+    assert time.monotonic() - started < 0.5
+
+def test_hedged_request_wins_over_slow_primary():
+    """첫 시도가 평소 지연 시간보다 늦으면 헤지 요청의 응답을 사용하는지 테스트"""
+    caller = ResilientCaller(attempt_timeout=2, hedge_percentile=90, hedge_min_samples=3)
+    for _ in range(5):
+        caller.latencies.record(0.01)
+    call, calls = make_flaky([(1, "slow"), (0, "fast")])
+
+    started = time.monotonic()
+    assert asyncio.run(caller.call(call)) == "fast"
+    assert time.monotonic() - started < 0.5
+    assert caller.stats()["hedges"] == 1 and caller.stats()["hedge_wins"] == 1
+    kinds = {record["kind"]: record["outcome"] for record in caller.recent_attempts()}
+    assert kinds == {"hedge": "ok", "primary": "cancelled"}
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    """/v1/chat/completions만 흉내 내는 가짜 서버. 서버의 script 순서대로 (지연, 상태 코드)를 적용"""
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with self.server.lock:
+            index = self.server.requests
+            self.server.requests += 1
+        delay, status = self.server.script[min(index, len(self.server.script) - 1)]
+        time.sleep(delay)
+
+        if status == 200:
+            payload = {
+                "id": f"chatcmpl-{index}", "object": "chat.completion", "created": int(time.time()),
+                "model": body["model"],
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": f"응답 {index}"}}],
+                "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2}
+            }
+        else:
+            payload = {"error": {"message": "일시적인 오류", "type": "server_error"}}
+        data = json.dumps(payload).encode("utf-8")
+        try:
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # 취소된 시도
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def fake_openai_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeOpenAIHandler)
+    server.lock = threading.Lock()
+    server.requests = 0
+    server.script = [(0, 200)]
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def test_against_fake_openai_server(fake_openai_server):
+    """OpenAI 호환 가짜 서버에서 5xx 재시도, 느린 응답 시간 초과, 헤지 요청을 확인"""
+    openai = pytest.importorskip("openai")
+    from llm_api import _is_retryable_llm_error
+
+    base_url = f"http://127.0.0.1:{fake_openai_server.server_address[1]}/v1"
+    caller = ResilientCaller(attempt_timeout=0.3, total_timeout=5, max_attempts=3,
+                             base_delay=0.01, retryable=_is_retryable_llm_error)
+
+    async def ask():
+        client = openai.AsyncOpenAI(api_key="test", base_url=base_url, max_retries=0)
+        try:
+            response = await caller.call(lambda: client.chat.completions.create(
+                model="fake-model", messages=[{"role": "user", "content": "안녕"}]))
+            return response.choices[0].message.content
+        finally:
+            await client.close()
+
+    # 500 -> 느린 응답(시도 시간 초과) -> 성공
+    fake_openai_server.script = [(0, 500), (1, 200), (0, 200)]
+    assert asyncio.run(ask()) == "응답 2"
+    assert [record["outcome"] for record in caller.recent_attempts()] == ["ok", "timeout", "error"]
+
+    # 헤지: 첫 요청이 느리면 두 번째 요청의 응답을 사용
+    caller.hedge_percentile = 90
+    caller.hedge_min_samples = 1
+    fake_openai_server.requests = 0
+    fake_openai_server.script = [(0.25, 200), (0, 200)]
+    assert asyncio.run(ask()) == "응답 1"
+    assert caller.stats()["hedge_wins"] == 1
+
+if __name__ == "__main__":
+    test_retries_retryable_errors_and_timeouts()
+    test_non_retryable_error_and_exhausted_attempts()
+    test_total_timeout()
+    test_hedged_request_wins_over_slow_primary()
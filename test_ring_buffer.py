@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""
+원형 버퍼 테스트
+"""
+
+from ring_buffer import RingBuffer
+
+def test_ring_buffer():
+    """추가, 밀어내기, 인덱스/슬라이스 접근, 역순 순회 테스트"""
+    buffer = RingBuffer(3)
+    assert buffer.append(1) is None
+    buffer.extend([2, 3])
+    assert buffer.append(4) == 1
+    assert buffer.append(5) == 2
+    
+    assert len(buffer) == 3
+    assert list(buffer) == [3, 4, 5]
+    assert list(reversed(buffer)) == [5, 4, 3]
+    assert buffer[0] == 3 and buffer[-1] == 5
+    assert buffer[-2:] == [4, 5]
+    assert buffer == [3, 4, 5]
+    
+    buffer.clear()
+    assert len(buffer) == 0 and buffer[-10:] == []
+
+if __name__ == "__main__":
+    test_ring_buffer()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+규칙 엔진 테스트
+"""
+
+import json
+import os
+import random
+import tempfile
+
+from rule_matcher import AhoCorasick, RuleEngine
+from rule_engine import get_rule_response
+
+def _write_rules(path, rules):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({"rules": rules}, f, ensure_ascii=False)
+
+def test_aho_corasick_matches_linear_scan():
+    """오토마톤 결과가 키워드를 순서대로 확인하는 방식과 같은지 테스트"""
+    random.seed(0)
+    alphabet = "가나다라ab"
+    keywords = ["".join(random.choices(alphabet, k=random.randint(1, 4))) for _ in range(50)]
+    matcher = AhoCorasick(keywords)
+    
+    for _ in range(500):
+        text = "".join(random.choices(alphabet, k=random.randint(0, 20)))
+        expected = next((i for i, keyword in enumerate(keywords) if keyword in text), None)
+        assert matcher.best_match(text) == expected
+        
+        all_matches = {index for _, index in matcher.iter_matches(text)}
+        assert all_matches == {i for i, keyword in enumerate(keywords) if keyword in text}
+
+def test_rule_engine_priority_dynamic_and_reload():
+    """우선순위, 동적 응답, 규칙 파일 자동 재로딩 테스트"""
+    with tempfile.TemporaryDirectory() as rules_dir:
+        rules_path = os.path.join(rules_dir, "rules.json")
+        _write_rules(rules_path, [
+            {"keyword": "안녕", "response": "인사"},
+            {"keyword": "시간", "response": "지금은 {time}", "dynamic": True},
+            {"keyword": "환불", "response": "환불 안내", "priority": 10}
+        ])
+        calls = []
+        engine = RuleEngine(rules_path, dynamic_values={"time": lambda: calls.append(1) or "12:00"},
+                            check_interval=0)
+        
+        assert engine.match("안녕 시간") == "인사"
+        assert not calls  # 동적 값은 해당 규칙이 선택될 때만 계산
+        assert engine.match("시간 알려줘") == "지금은 12:00"
+        assert engine.match("안녕하세요 환불 문의") == "환불 안내"
+        assert engine.match("무관한 입력") is None
+        
+        _write_rules(rules_path, [{"keyword": "안녕", "response": "새 인사"}])
+        os.utime(rules_path, (0, 0))
+        assert engine.match("안녕") == "새 인사"
+        assert len(engine) == 1
+
+def test_default_rules():
+    """기본 rules.json 규칙 테스트"""
+    assert get_rule_response("안녕") == "안녕하세요! 무엇을 도와드릴까요?"
+    assert get_rule_response("지금 시간은?").startswith("현재 시간은 ")
+    assert get_rule_response("파이썬이 뭔가요?") is None
+
+if __name__ == "__main__":
+    test_aho_corasick_matches_linear_scan()
+    test_rule_engine_priority_dynamic_and_reload()
+    test_default_rules()
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+세션 간 메시지 검색 색인 테스트
+"""
+
+import os
+import tempfile
+
+from conversation_manager import ConversationManager
+from search_index import SearchIndex
+
+def test_search_index():
+    """증분 색인, 한국어 부분 문자열 검색, 필터와 페이지 테스트"""
+    with tempfile.TemporaryDirectory() as history_dir:
+        index = SearchIndex(os.path.join(history_dir, "search_index.db"))
+        
+        first = ConversationManager(max_history=10, history_dir=history_dir, search_index=index)
+        first.add_message("user", "오늘 날씨는 어때요?", None, "user")
+        first.add_message("assistant", "오늘의 날씨는 맑음입니다.", 0.1, "rule_engine")
+        
+        second = ConversationManager(max_history=10, history_dir=history_dir, search_index=index)
+        second.session_id = "other_session"
+        second.add_message("user", "내일 날씨 날씨 알려줘", None, "user")
+        second.add_message("assistant", "Python은 프로그래밍 언어입니다.", 1.0, "llm_api")
+        
+        result = index.search("날씨")
+        assert result["total"] == 3
+        # 검색어가 두 번 나오는 짧은 메시지가 가장 높은 점수
+        assert result["results"][0]["content"] == "내일 날씨 날씨 알려줘"
+        
+        assert index.search("날씨", session_id="other_session")["total"] == 1
+        assert index.search("날씨", role="assistant", source="rule_engine")["total"] == 1
+        assert index.search("PYTHON")["total"] == 1
+        assert index.search("씨날")["total"] == 0
+        assert index.search("맑")["total"] == 1
+        
+        page = index.search("날씨", page=2, page_size=2)
+        assert page["total"] == 3 and len(page["results"]) == 1
+        
+        # 저장된 파일로 다시 색인해도 중복되지 않아야 함
+        assert index.index_history_dir(history_dir) == 0
+        index.close()
+
+if __name__ == "__main__":
+    test_search_index()
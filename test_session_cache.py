@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+세션 캐시 테스트
+"""
+
+import os
+import tempfile
+import threading
+import time
+
+from conversation_manager import ConversationManager
+from persistence_writer import WriteBehindWriter
+from search_index import SearchIndex
+from session_cache import SessionCache
+from session_catalog import SessionCatalog
+
+def test_session_cache_eviction_and_reload():
+    """LRU 제거 시 디스크에 저장되고 다음 요청에서 다시 로드되는지 테스트"""
+    with tempfile.TemporaryDirectory() as history_dir:
+        def loader(session_id):
+            cm = ConversationManager(max_history=10, history_dir=history_dir, session_id=session_id)
+            cm.load_from_file(session_id)
+            return cm
+        
+        cache = SessionCache(loader, max_entries=2)
+        cache.get("a").add_message("user", "a의 메시지", None, "user")
+        cache.get("b").add_message("user", "b의 메시지", None, "user")
+        cache.get("a")
+        cache.get("c")
+        
+        # 가장 오래 전에 사용한 b가 내려가야 함
+        assert "b" not in cache and "a" in cache and "c" in cache
+        
+        reloaded = cache.get("b")
+        assert [m["content"] for m in reloaded.conversation_history] == ["b의 메시지"]
+        
+        stats = cache.stats()
+        assert stats["hits"] == 1 and stats["misses"] == 4
+        assert stats["evictions"]["lru"] == 2
+
+def test_session_cache_memory_budget():
+    """메모리 예산을 넘으면 오래된 세션부터 내리는지 테스트"""
+    with tempfile.TemporaryDirectory() as history_dir:
+        cache = SessionCache(
+            lambda session_id: ConversationManager(history_dir=history_dir, save_to_file=False,
+                                                   session_id=session_id),
+            max_memory_bytes=5000)
+        # 메모리 크기는 세션을 꺼낼 때 측정되므로 메시지 추가 후 한 번 더 조회
+        for key in ("a", "b", "c"):
+            cache.get(key).add_message("user", "가" * 1000, None, "user")
+            cache.get(key)
+        
+        assert "a" not in cache and "c" in cache
+        assert cache.stats()["memory_bytes"] <= 5000
+        assert cache.stats()["evictions"]["memory"] >= 1
+
+def test_reset_history_survives_reload():
+    """초기화한 세션이 캐시에서 내려가거나 재시작 후 다시 로드되어도 이전 기록이 돌아오지 않는지 테스트"""
+    with tempfile.TemporaryDirectory() as history_dir:
+        index = SearchIndex(os.path.join(history_dir, "search_index.db"))
+        catalog = SessionCatalog(os.path.join(history_dir, "session_catalog.db"))
+
+        def loader(session_id):
+            cm = ConversationManager(max_history=10, history_dir=history_dir, session_id=session_id,
+                                     search_index=index, catalog=catalog)
+            cm.load_from_file(session_id)
+            return cm
+
+        cache = SessionCache(loader, max_entries=1)
+        for i in range(3):
+            cache.get("abc").add_message("user", f"지울 메시지 {i}", None, "user")
+        manager = cache.get("abc")
+        manager.reset_history()
+        assert manager.session_id == "abc"
+        manager.add_message("user", "새 메시지", None, "user")
+
+        # 다른 세션 때문에 내려간 뒤 다시 로드, 그리고 새 캐시(재시작)에서 로드
+        cache.get("other")
+        assert "abc" not in cache
+        for reloaded in (cache.get("abc"), SessionCache(loader).get("abc")):
+            assert [m["content"] for m in reloaded.conversation_history] == ["새 메시지"]
+        assert index.search("지울")["total"] == 0 and index.search("새 메시지")["total"] == 1
+        assert catalog.list_sessions()["sessions"][0]["message_count"] == 1
+
+class SlowFlushManager(ConversationManager):
+    """저장이 오래 걸리는 관리자 (내려가는 중인 세션을 다시 로드하는 경합 재현용)"""
+
+    def flush(self) -> None:
+        if self._pending:
+            time.sleep(0.2)
+        super().flush()
+
+def test_reload_waits_for_spill():
+    """내려가며 저장 중인 세션을 다시 요청하면 저장이 끝난 뒤 로드해 순번이 겹치지 않는지 테스트"""
+    with tempfile.TemporaryDirectory() as history_dir:
+        writer = WriteBehindWriter(flush_interval=60)  # 시작하지 않으므로 내려갈 때만 저장
+
+        def loader(session_id):
+            cm = SlowFlushManager(max_history=10, history_dir=history_dir, session_id=session_id,
+                                  write_behind=True, writer=writer)
+            cm.load_from_file(session_id)
+            return cm
+
+        cache = SessionCache(loader, max_entries=1)
+        cache.get("a").add_message("user", "m1", None, "user")
+        cache.get("a").add_message("user", "m2", None, "user")
+        spiller = threading.Thread(target=cache.get, args=("b",))
+        spiller.start()
+        time.sleep(0.05)
+        reloaded = cache.get("a")
+        spiller.join()
+        assert [m["content"] for m in reloaded.conversation_history] == ["m1", "m2"]
+
+        reloaded.add_message("user", "m3", None, "user")
+        reloaded.flush()
+        fresh = ConversationManager(max_history=10, history_dir=history_dir)
+        assert fresh.load_from_file("a")
+        assert [m["content"] for m in fresh.conversation_history] == ["m1", "m2", "m3"]
+
+if __name__ == "__main__":
+    test_session_cache_eviction_and_reload()
+    test_session_cache_memory_budget()
+    test_reset_history_survives_reload()
+    test_reload_waits_for_spill()
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+세션 목록 테스트
+"""
+
+import os
+import tempfile
+
+from conversation_manager import ConversationManager
+from session_catalog import SessionCatalog
+
+def test_session_catalog():
+    """저장 시 갱신, 정렬/페이지/필터, 디스크에서 재구축 테스트"""
+    with tempfile.TemporaryDirectory() as history_dir:
+        catalog = SessionCatalog(os.path.join(history_dir, "session_catalog.db"))
+        
+        for session_id, count in (("20240101_000000", 1), ("20240102_000000", 3), ("20240201_000000", 2)):
+            cm = ConversationManager(max_history=10, history_dir=history_dir, catalog=catalog)
+            cm.session_id = session_id
+            for i in range(count):
+                cm.add_message("user", f"메시지 {i}", None, "user")
+        
+        result = catalog.list_sessions()
+        assert result["total"] == 3
+        assert [s["session_id"] for s in result["sessions"]] == [
+            "20240201_000000", "20240102_000000", "20240101_000000"]
+        assert result["sessions"][0]["size_bytes"] > 0
+        
+        by_count = catalog.list_sessions(sort="message_count", descending=False, page=2, page_size=2)
+        assert [s["session_id"] for s in by_count["sessions"]] == ["20240102_000000"]
+        assert catalog.list_sessions(prefix="202401")["total"] == 2
+        assert catalog.list_sessions(min_messages=2)["total"] == 2
+        
+        # 디스크에서 다시 구축해도 같은 내용이어야 함
+        rebuilt = SessionCatalog(os.path.join(history_dir, "rebuilt.db"))
+        assert rebuilt.rebuild(history_dir) == 3
+        assert rebuilt.list_session_ids() == catalog.list_session_ids()
+        assert rebuilt.list_sessions(sort="message_count")["sessions"][0]["message_count"] == 3
+        catalog.close()
+        rebuilt.close()
+
+if __name__ == "__main__":
+    test_session_catalog()
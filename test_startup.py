@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+"""
+시작 시간 회귀 테스트 (무거운 라이브러리 지연 로딩, CLI 시작 시 디렉토리 생성 없음)
+"""
+
+from benchmarks.bench_startup import probe_first_requests, probe_import
+
+def test_import_loads_no_heavy_modules():
+    """main과 web_app을 불러와도 LLM SDK·파일 추출 라이브러리를 불러오지 않고, CLI는 디렉토리를 만들지 않는지 테스트"""
+    for module in ("main", "web_app"):
+        result = probe_import(module)
+        assert result["modules"] == [], f"{module}: {result['modules']}"
+        if module == "main":
+            assert result["created"] == [], result["created"]
+        # 지연 로딩 전에는 web_app이 약 1.5초였으므로 느린 CI에서도 넉넉한 한도
+        assert result["seconds"] < 1.0, f"{module}: {result['seconds']:.2f}s"
+
+def test_first_requests_stay_lightweight():
+    """규칙 응답 채팅과 텍스트 파일 업로드는 첫 요청에서도 무거운 라이브러리를 불러오지 않는지 테스트"""
+    result = probe_first_requests()
+    assert result["modules"] == []
+    assert result["first chat"] < 1.0 and result["first upload"] < 1.0
+
+if __name__ == "__main__":
+    test_import_loads_no_heavy_modules()
+    test_first_requests_stay_lightweight()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+요청 구간 추적과 느린 요청 기록 테스트
+"""
+
+import json
+import os
+import tempfile
+import time
+
+import pytest
+
+from concurrency import BackgroundEventLoop
+from tracing import RequestTracer, current_span, format_span_tree, span
+
+def test_slow_trace_dumps_span_tree():
+    """중첩 구간(이벤트 루프에서 실행된 코루틴 포함)이 트리로 기록되고 느린 요청만 파일로 남는지 테스트"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tracer = RequestTracer(log_dir=tmp_dir, slow_threshold=0.05)
+        loop = BackgroundEventLoop()
+
+        async def upstream():
+            with span("llm.upstream", operation="completion"):
+                return current_span().name
+
+        # 추적 중이 아니면 구간을 기록하지 않음
+        with span("untraced") as untraced:
+            assert untraced is None
+
+        trace = tracer.start("chat", method="POST")
+        with span("rule_engine.match"):
+            pass
+        with span("llm.request"):
+            assert loop.run(upstream()) == "llm.upstream"
+            time.sleep(0.06)
+        with pytest.raises(OSError):
+            with span("conversation.save_snapshot"):
+                raise OSError("디스크 가득 참")
+        path = tracer.finish(trace, status=200)
+        loop.stop()
+
+        assert current_span() is None and tracer.finish(trace) is None
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        assert data["name"] == "chat" and data["duration_ms"] >= 60
+        root = data["spans"]
+        assert root["attributes"] == {"method": "POST", "status": 200}
+        assert [child["name"] for child in root["children"]] == [
+            "rule_engine.match", "llm.request", "conversation.save_snapshot"]
+        assert root["children"][1]["children"][0]["name"] == "llm.upstream"
+        assert "OSError" in root["children"][2]["attributes"]["error"]
+        assert "llm.upstream (operation=completion)" in format_span_tree(root)
+
+        fast = tracer.start("chat")
+        assert tracer.finish(fast) is None
+        assert tracer.stats()["traces"] == 2 and tracer.stats()["slow_traces"] == 1
+        assert len(os.listdir(tmp_dir)) == 1
+
+def test_sampled_profile_and_log_retention():
+    """표본 요청의 cProfile 결과가 함께 남고 오래된 기록은 최대 개수를 넘으면 지워지는지 테스트"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tracer = RequestTracer(log_dir=tmp_dir, slow_threshold=0, profile_sample_rate=1.0,
+                               max_log_files=2, max_spans=3)
+        paths = []
+        for index in range(3):
+            trace = tracer.start(f"request{index}")
+            for _ in range(5):
+                with span("step"):
+                    sum(range(1000))
+            paths.append(tracer.finish(trace))
+
+        remaining = sorted(os.listdir(tmp_dir))
+        assert len(remaining) == 4 and os.path.basename(paths[0]) not in remaining
+        with open(paths[-1], encoding="utf-8") as f:
+            data = json.load(f)
+        assert data["profile"] in remaining and "cumulative" in data["profile_summary"]
+        assert len(data["spans"]["children"]) == 2 and data["dropped_spans"] == 3
+        assert tracer.stats()["profiled"] == 3
+
+if __name__ == "__main__":
+    test_slow_trace_dumps_span_tree()
+    test_sampled_profile_and_log_retention()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+내용 주소 기반 업로드 저장소 테스트
+"""
+
+import io
+import os
+import tempfile
+import time
+
+from upload_store import UploadStore
+
+def test_content_addressed_uploads_and_cached_content():
+    """같은 내용은 한 번만 저장되고, 다른 내용은 서로 덮어쓰지 않는지 테스트"""
+    with tempfile.TemporaryDirectory() as root:
+        store = UploadStore(root)
+        digest1, path1, size1 = store.save_upload(io.BytesIO(b"hello"), ".txt")
+        digest2, path2, _ = store.save_upload(io.BytesIO(b"hello"), ".txt")
+        digest3, path3, _ = store.save_upload(io.BytesIO(b"world"), ".txt")
+        
+        assert digest1 == digest2 and path1 == path2 and size1 == 5
+        assert digest3 != digest1 and os.path.exists(path1) and os.path.exists(path3)
+        assert not [name for name in os.listdir(root) if name.endswith(".part")]
+        
+        assert store.get_content(digest1, ".txt") is None
+        store.put_content(digest1, ".txt", "분석 결과")
+        assert store.get_content(digest1, ".txt") == "분석 결과"
+        assert store.stats()["hits"] == 1 and store.stats()["misses"] == 1
+        store.close()
+
+def test_size_eviction_and_age_cleanup_share_policy():
+    """크기 예산과 보관 기간을 넘은 항목이 파일과 함께 정리되는지 테스트"""
+    with tempfile.TemporaryDirectory() as root:
+        store = UploadStore(root, max_bytes=250, max_age_hours=1)
+        entries = []
+        for i in range(3):
+            digest, path, _ = store.save_upload(io.BytesIO(bytes([i]) * 50), ".bin")
+            store.put_content(digest, ".bin", "x" * 50)
+            entries.append((digest, path))
+            time.sleep(0.01)
+        
+        # 100바이트씩 3개 > 250바이트: 가장 오래 사용하지 않은 첫 항목이 제거됨
+        assert not os.path.exists(entries[0][1])
+        assert store.get_content(entries[0][0], ".bin") is None
+        assert store.stats()["bytes"] == 200
+        
+        # 등록되지 않은 오래된 파일과 보관 기간이 지난 항목은 cleanup에서 정리
+        legacy = os.path.join(root, "legacy.txt")
+        with open(legacy, "w") as f:
+            f.write("old")
+        os.utime(legacy, (time.time() - 7200, time.time() - 7200))
+        assert os.path.basename(legacy) in store.cleanup()
+        assert os.path.exists(entries[2][1])
+        
+        deleted = store.cleanup(max_age_hours=0)
+        assert os.path.basename(entries[1][1]) in deleted and not os.path.exists(entries[2][1])
+        assert store.stats()["entries"] == 0
+        store.close()
+
+if __name__ == "__main__":
+    test_content_addressed_uploads_and_cached_content()
+    test_size_eviction_and_age_cleanup_share_policy()
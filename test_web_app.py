@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+웹 API 테스트 (빈 임시 디렉토리에서 새 프로세스로 web_app을 불러와 실행)
+"""
+
+from benchmarks.bench_startup import run_probe
+
+_INVALID_CHAT_PROBE = """
+import json
+import web_app
+client = web_app.app.test_client()
+result = {"responses": []}
+for path in ("/api/chat", "/api/chat/stream"):
+    for body in ("null", '"text"', '{"session_id": 5}', '{"message": 5}', '{"message": "안녕", "session_id": "a b"}'):
+        response = client.post(path, data=body, content_type="application/json")
+        payload = response.get_json() if response.is_json else None
+        result["responses"].append([path, body, response.status_code, payload])
+web_app.analysis_jobs.shutdown()
+print(json.dumps(result, ensure_ascii=False))
+"""
+
+def test_chat_rejects_malformed_bodies():
+    """JSON null, 문자열이 아닌 메시지·세션 ID 등 잘못된 요청에 두 채팅 엔드포인트가 400 JSON으로 답하는지 테스트"""
+    result = run_probe(_INVALID_CHAT_PROBE)
+    assert len(result["responses"]) == 10
+    for path, body, status, payload in result["responses"]:
+        if body == "null":
+            # 빈 본문은 {}와 같이 기본값으로 처리 (500 오류가 아님)
+            assert status == 200, (path, status)
+            continue
+        assert status == 400, (path, body, status)
+        assert payload["type"] == "error" and payload["response"], (path, body, payload)
+
+_CLEAR_THEN_UPLOAD_PROBE = """
+import io, json
+import web_app
+client = web_app.app.test_client()
+
+def chat(message):
+    return client.post("/api/chat", json={"message": message, "session_id": "client-key"}).get_json()
+
+def upload(name):
+    response = client.post("/api/upload-file", data={
+        "file": (io.BytesIO(f"{name} 문서 내용".encode("utf-8")), name), "session_id": "client-key"})
+    if response.status_code == 202:
+        # 작업 큐에서 분석되면 끝날 때까지 기다림 (색인은 done으로 바뀌기 전에 끝남)
+        job = web_app.analysis_jobs.get(response.get_json()["job_id"])
+        while not job.finished:
+            job.wait_for_update(len(job.partial), 1)
+        return job.status
+    return "done" if response.get_json()["success"] else "failed"
+
+result = {"uploads": [upload("before.txt")], "listings": [chat("파일 분석")["response"]]}
+result["clear"] = chat("초기화")["type"]
+result["listings"].append(chat("파일 분석")["response"])
+result["uploads"].append(upload("after.txt"))
+result["listings"].append(chat("파일 분석")["response"])
+stream = client.post("/api/chat/stream", json={"message": "파일 분석", "session_id": "client-key"})
+result["stream"] = stream.get_data(as_text=True)
+result["manager_session_id"] = web_app.session_cache.get("client-key").session_id
+web_app.analysis_jobs.shutdown()
+print(json.dumps(result, ensure_ascii=False))
+"""
+
+def test_clear_then_upload_file_analysis():
+    """'초기화' 후 같은 세션 ID로 올린 파일만 '파일 분석'에 보이고, 이전 파일은 지워지는지 테스트"""
+    result = run_probe(_CLEAR_THEN_UPLOAD_PROBE)
+    assert result["uploads"] == ["done", "done"] and result["clear"] == "clear"
+    before_clear, after_clear, after_upload = result["listings"]
+    assert "before.txt" in before_clear
+    assert "before.txt" not in after_clear and "업로드된 파일:" not in after_clear
+    assert "after.txt" in after_upload and "before.txt" not in after_upload
+    assert "after.txt" in result["stream"] and "before.txt" not in result["stream"]
+    assert result["manager_session_id"] == "client-key"
+
+_LOAD_SESSION_PROBE = """
+import json
+import web_app
+client = web_app.app.test_client()
+
+def chat(message):
+    return client.post("/api/chat", json={"message": message, "session_id": "loaded"}).get_json()
+
+chat("안녕")
+# 쓰기 지연 작성기가 아직 저장하지 않은 상태에서 같은 세션을 로드
+loaded = client.post("/api/load-session", json={"session_id": "loaded"})
+chat("안녕")
+missing = client.post("/api/load-session", json={"session_id": "missing"})
+web_app.session_cache.flush_all()
+fresh = web_app.build_conversation_manager("loaded")
+fresh.load_from_file("loaded")
+result = {"loaded": [loaded.status_code, len(loaded.get_json()["messages"])],
+          "missing": missing.status_code,
+          "contents": [m["content"] for m in fresh.conversation_history]}
+web_app.analysis_jobs.shutdown()
+print(json.dumps(result, ensure_ascii=False))
+"""
+
+def test_load_session_keeps_unsaved_messages():
+    """저장되지 않은 메시지가 있는 세션을 로드한 뒤 이어지는 메시지가 다시 로드해도 빠지지 않는지 테스트"""
+    result = run_probe(_LOAD_SESSION_PROBE)
+    assert result["loaded"] == [200, 2] and result["missing"] == 404
+    assert len(result["contents"]) == 4 and result["contents"][0] == result["contents"][2] == "안녕"
+
+_SEARCH_COMMAND_PROBE = """
+import json
+import web_app
+client = web_app.app.test_client()
+
+def chat(session_id, message):
+    return client.post("/api/chat", json={"message": message, "session_id": session_id}).get_json()
+
+chat("alice", "안녕")
+chat("bob", "안녕")
+web_app.session_cache.flush_all()
+result = {"alice": [r["session_id"] for r in chat("alice", "검색 안녕")["search_results"]]}
+result["all"] = sorted({r["session_id"] for r in client.get("/api/search?q=안녕").get_json()["results"]})
+web_app.analysis_jobs.shutdown()
+print(json.dumps(result, ensure_ascii=False))
+"""
+
+def test_search_command_stays_in_session():
+    """채팅의 '검색' 명령은 요청한 세션의 메시지만 보여주고, 세션 간 검색은 /api/search에서만 되는지 테스트"""
+    result = run_probe(_SEARCH_COMMAND_PROBE)
+    assert result["alice"] and set(result["alice"]) == {"alice"}
+    assert result["all"] == ["alice", "bob"]
+
+if __name__ == "__main__":
+    test_chat_rejects_malformed_bodies()
+    test_clear_then_upload_file_analysis()
+    test_load_session_keeps_unsaved_messages()
+    test_search_command_stays_in_session()
@@ -0,0 +1,69 @@
+import re
+from abc import ABC, abstractmethod
+
+
+class Tokenizer(ABC):
+    """토큰 수 계산기 인터페이스"""
+
+    @abstractmethod
+    def count_tokens(self, text: str) -> int:
+        """텍스트의 토큰 수 반환"""
+
+
+class CharRatioTokenizer(Tokenizer):
+    """문자 수를 일정 비율로 나누어 토큰 수를 추정 (기존 len(content) // 4 방식)"""
+
+    def __init__(self, chars_per_token: int = 4):
+        self.chars_per_token = chars_per_token
+
+    def count_tokens(self, text: str) -> int:
+        return len(text) // self.chars_per_token
+
+
+class KoreanApproxTokenizer(Tokenizer):
+    """
+    한국어에 맞춘 오프라인 근사 토큰 계산기
+
+    GPT 계열 BPE 토크나이저는 영문은 약 4글자당 1토큰이지만 한글은
+    음절 하나가 대략 1토큰 이상으로 나뉩니다. 외부 라이브러리 없이
+    문자 종류별로 가중치를 두어 추정합니다.
+    """
+
+    # 한글 음절/자모, 한자/가나, 영문·숫자 단어, 공백, 그 외 기호
+    _PATTERN = re.compile(
+        r"(?P<hangul>[\uac00-\ud7a3\u1100-\u11ff\u3130-\u318f]+)"
+        r"|(?P<cjk>[\u3040-\u30ff\u4e00-\u9fff]+)"
+        r"|(?P<word>[A-Za-z0-9]+)"
+        r"|(?P<space>\s+)"
+        r"|(?P<other>.)",
+        re.DOTALL,
+    )
+
+    def __init__(self, hangul_weight: float = 1.0, cjk_weight: float = 1.0,
+                 chars_per_word_token: int = 4):
+        """
+        Args:
+            hangul_weight: 한글 한 글자당 토큰 수
+            cjk_weight: 한자/가나 한 글자당 토큰 수
+            chars_per_word_token: 영문·숫자 단어에서 토큰 하나에 해당하는 글자 수
+        """
+        self.hangul_weight = hangul_weight
+        self.cjk_weight = cjk_weight
+        self.chars_per_word_token = chars_per_word_token
+
+    def count_tokens(self, text: str) -> int:
+        tokens = 0.0
+        for match in self._PATTERN.finditer(text):
+            kind = match.lastgroup
+            length = match.end() - match.start()
+            if kind == "hangul":
+                tokens += length * self.hangul_weight
+            elif kind == "cjk":
+                tokens += length * self.cjk_weight
+            elif kind == "word":
+                # 짧은 단어도 최소 1토큰
+                tokens += -(-length // self.chars_per_word_token)
+            elif kind == "other":
+                tokens += 1
+            # 공백은 대개 다음 토큰에 합쳐지므로 계산하지 않음
+        return int(round(tokens))
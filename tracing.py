@@ -0,0 +1,292 @@
+import contextvars
+import io
+import json
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+# cProfile/pstats는 표본 요청을 측정할 때만 불러옴
+if TYPE_CHECKING:
+    import cProfile
+
+# 현재 요청(또는 작업)에서 열려 있는 가장 안쪽 구간. 추적 중이 아니면 None
+_current_span: contextvars.ContextVar = contextvars.ContextVar("current_span", default=None)
+
+
+class Span:
+    """추적 구간 하나 (이름, 시작/끝 시각, 속성, 하위 구간)"""
+
+    __slots__ = ("trace", "name", "attributes", "start", "end", "children")
+
+    def __init__(self, trace: "Trace", name: str, attributes: Dict):
+        self.trace = trace
+        self.name = name
+        self.attributes = attributes
+        self.start = time.perf_counter()
+        self.end: Optional[float] = None
+        self.children: List["Span"] = []
+
+    def set(self, **attributes) -> None:
+        """구간 속성 추가 (예: 캐시 적중 여부, 결과 크기)"""
+        self.attributes.update(attributes)
+
+    def finish(self) -> None:
+        if self.end is None:
+            self.end = time.perf_counter()
+
+    @property
+    def duration(self) -> float:
+        return (self.end if self.end is not None else time.perf_counter()) - self.start
+
+    def to_dict(self, origin: float) -> Dict:
+        return {
+            "name": self.name,
+            "offset_ms": round((self.start - origin) * 1000, 3),
+            "duration_ms": round(self.duration * 1000, 3),
+            "attributes": self.attributes,
+            "children": [child.to_dict(origin) for child in self.children]
+        }
+
+
+class Trace:
+    """
+    요청 하나의 구간 트리
+
+    LLM 호출처럼 공용 이벤트 루프 스레드에서 실행되는 코드도 contextvars를 이어받으므로
+    같은 트리에 구간을 추가합니다. 그래서 하위 구간 추가는 잠금 안에서 합니다.
+    """
+
+    def __init__(self, name: str, attributes: Dict, max_spans: int):
+        self.trace_id = uuid.uuid4().hex
+        self.started_at = datetime.now()
+        self.root = Span(self, name, attributes)
+        self.max_spans = max_spans
+        self.span_count = 1
+        self.dropped_spans = 0
+        self.profiler: Optional["cProfile.Profile"] = None
+        self.finished = False
+        self._lock = threading.Lock()
+
+    def add_child(self, parent: Span, name: str, attributes: Dict) -> Optional[Span]:
+        """하위 구간 생성 (구간 수 제한을 넘으면 None)"""
+        with self._lock:
+            if self.span_count >= self.max_spans:
+                self.dropped_spans += 1
+                return None
+            self.span_count += 1
+            child = Span(self, name, attributes)
+            parent.children.append(child)
+            return child
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            return {
+                "trace_id": self.trace_id,
+                "name": self.root.name,
+                "started_at": self.started_at.isoformat(),
+                "duration_ms": round(self.root.duration * 1000, 3),
+                "dropped_spans": self.dropped_spans,
+                "spans": self.root.to_dict(self.root.start)
+            }
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """
+    현재 추적에 하위 구간 추가
+
+    추적 중이 아니면 아무것도 기록하지 않으므로(contextvar 조회 한 번) 어디서든 쓸 수 있습니다.
+    with 블록 안에서 예외가 나면 구간 속성에 error로 남깁니다.
+    """
+    parent = _current_span.get()
+    child = parent.trace.add_child(parent, name, attributes) if parent is not None else None
+    if child is None:
+        yield None
+        return
+    token = _current_span.set(child)
+    try:
+        yield child
+    except BaseException as e:
+        child.attributes["error"] = f"{type(e).__name__}: {e}"[:200]
+        raise
+    finally:
+        try:
+            _current_span.reset(token)
+        except ValueError:
+            # 구간을 연 제너레이터가 다른 컨텍스트에서 닫힘
+            pass
+        child.finish()
+
+
+def current_span() -> Optional[Span]:
+    """현재 열려 있는 구간 (추적 중이 아니면 None)"""
+    return _current_span.get()
+
+
+def format_span_tree(span_dict: Dict, indent: int = 0) -> str:
+    """구간 트리를 들여쓴 텍스트로 표시 (시작 시각, 소요 시간, 이름, 속성)"""
+    attributes = ", ".join(f"{key}={value}" for key, value in span_dict["attributes"].items())
+    line = (f"{span_dict['offset_ms']:>10.1f}ms {span_dict['duration_ms']:>10.1f}ms  "
+            f"{'  ' * indent}{span_dict['name']}" + (f" ({attributes})" if attributes else ""))
+    return "\n".join([line] + [format_span_tree(child, indent + 1) for child in span_dict["children"]])
+
+
+class RequestTracer:
+    """
+    요청별 구간 추적과 느린 요청 기록
+
+    요청마다 start()로 추적을 시작하고 finish()로 끝냅니다. 걸린 시간이 slow_threshold 이상이면
+    구간 트리를 log_dir에 JSON으로 남깁니다. profile_sample_rate 비율의 요청은 cProfile로도
+    측정하여, 느린 요청이면 .prof 파일과 누적 시간 상위 함수 요약을 함께 남깁니다.
+    cProfile은 요청 스레드만 측정하며, 한 번에 요청 하나만 측정합니다.
+    """
+
+    def __init__(self, log_dir: str = "logs/slow_requests", slow_threshold: float = 2.0,
+                 profile_sample_rate: float = 0.0, max_log_files: int = 200, max_spans: int = 500,
+                 enabled: bool = True):
+        """
+        Args:
+            log_dir: 느린 요청 기록을 남길 디렉토리
+            slow_threshold: 기록할 요청의 최소 소요 시간 (초)
+            profile_sample_rate: cProfile로 측정할 요청 비율 (0이면 측정하지 않음)
+            max_log_files: 보관할 최대 기록 파일 수 (넘으면 오래된 것부터 삭제)
+            max_spans: 요청 하나에 기록할 최대 구간 수
+            enabled: False이면 추적하지 않음
+        """
+        self.log_dir = log_dir
+        self.slow_threshold = slow_threshold
+        self.profile_sample_rate = profile_sample_rate
+        self.max_log_files = max_log_files
+        self.max_spans = max_spans
+        self.enabled = enabled
+
+        self.traces = 0
+        self.slow_traces = 0
+        self.profiled = 0
+        self._profiling = threading.Lock()
+        self._lock = threading.Lock()
+
+    def start(self, name: str, **attributes) -> Optional[Trace]:
+        """현재 스레드(컨텍스트)에서 추적 시작"""
+        if not self.enabled:
+            return None
+        trace = Trace(name, attributes, self.max_spans)
+        _current_span.set(trace.root)
+        if self.profile_sample_rate and random.random() < self.profile_sample_rate:
+            self._start_profiler(trace)
+        with self._lock:
+            self.traces += 1
+        return trace
+
+    def finish(self, trace: Optional[Trace], **attributes) -> Optional[str]:
+        """
+        추적 종료. 느린 요청이면 기록 파일 경로 반환
+
+        같은 추적에 여러 번 호출해도 한 번만 처리합니다.
+        """
+        if trace is None or trace.finished:
+            return None
+        trace.finished = True
+        trace.root.attributes.update(attributes)
+        trace.root.finish()
+        if _current_span.get() is trace.root:
+            _current_span.set(None)
+        profiler = self._stop_profiler(trace)
+
+        if trace.root.duration < self.slow_threshold:
+            return None
+        with self._lock:
+            self.slow_traces += 1
+        try:
+            return self._write_dump(trace, profiler)
+        except Exception as e:
+            print(f"느린 요청 기록 중 오류 발생: {e}")
+            return None
+
+    def _start_profiler(self, trace: Trace) -> None:
+        if not self._profiling.acquire(blocking=False):
+            return
+        import cProfile
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # 다른 프로파일러가 이미 동작 중
+            self._profiling.release()
+            return
+        trace.profiler = profiler
+        with self._lock:
+            self.profiled += 1
+
+    def _stop_profiler(self, trace: Trace) -> Optional["cProfile.Profile"]:
+        profiler = trace.profiler
+        if profiler is None:
+            return None
+        trace.profiler = None
+        profiler.disable()
+        self._profiling.release()
+        return profiler
+
+    def _write_dump(self, trace: Trace, profiler: Optional["cProfile.Profile"]) -> str:
+        os.makedirs(self.log_dir, exist_ok=True)
+        endpoint = "".join(c if c.isalnum() or c in "_-" else "_" for c in trace.root.name)[:40]
+        base = os.path.join(self.log_dir,
+                            f"{trace.started_at.strftime('%Y%m%d_%H%M%S_%f')}_{endpoint}_{trace.trace_id[:8]}")
+        data = trace.to_dict()
+        if profiler is not None:
+            import pstats
+            profiler.dump_stats(base + ".prof")
+            summary = io.StringIO()
+            pstats.Stats(profiler, stream=summary).sort_stats("cumulative").print_stats(25)
+            data["profile"] = os.path.basename(base + ".prof")
+            data["profile_summary"] = summary.getvalue()
+
+        with open(base + ".json", 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2, default=str)
+        self._prune()
+        return base + ".json"
+
+    def _prune(self) -> None:
+        """기록 파일이 max_log_files개를 넘으면 오래된 것부터 삭제 (.prof는 같은 이름의 .json과 함께)"""
+        dumps = sorted(name for name in os.listdir(self.log_dir) if name.endswith(".json"))
+        for name in dumps[:max(0, len(dumps) - self.max_log_files)]:
+            for path in (name, name[:-len(".json")] + ".prof"):
+                try:
+                    os.remove(os.path.join(self.log_dir, path))
+                except FileNotFoundError:
+                    pass
+
+    def stats(self) -> Dict:
+        """추적한 요청 수, 느린 요청 수, 프로파일링한 요청 수"""
+        with self._lock:
+            return {"traces": self.traces, "slow_traces": self.slow_traces, "profiled": self.profiled,
+                    "slow_threshold": self.slow_threshold, "profile_sample_rate": self.profile_sample_rate}
+
+
+def print_recent_dumps(log_dir: str, count: int = 5) -> None:
+    """최근 느린 요청 기록의 구간 트리 출력"""
+    if not os.path.isdir(log_dir):
+        print(f"느린 요청 기록이 없습니다: {log_dir}")
+        return
+    dumps = sorted(name for name in os.listdir(log_dir) if name.endswith(".json"))[-count:]
+    for name in dumps:
+        with open(os.path.join(log_dir, name), 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        print(f"=== {data['name']} {data['duration_ms']:.1f}ms ({data['started_at']}, {name}) ===")
+        print(format_span_tree(data["spans"]))
+        if data.get("profile_summary"):
+            print(data["profile_summary"])
+
+
+if __name__ == "__main__":
+    from config import TRACE_LOG_DIR
+
+    # 사용법: python tracing.py [표시할 기록 수] [기록 디렉토리]
+    print_recent_dumps(sys.argv[2] if len(sys.argv) > 2 else TRACE_LOG_DIR,
+                       int(sys.argv[1]) if len(sys.argv) > 1 else 5)
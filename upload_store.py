@@ -0,0 +1,220 @@
+import hashlib
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+
+class UploadStore:
+    """
+    업로드 파일과 분석 결과의 내용 주소 기반(content-addressed) 저장소
+
+    업로드는 받는 동안 SHA-256을 계산하여 <해시><확장자> 이름으로 저장하므로 같은 이름의
+    다른 파일이 서로 덮어쓰지 않고, 같은 내용을 다시 올리면 저장된 분석 결과를 바로 사용합니다.
+    파일과 분석 결과는 하나의 항목으로 관리되며, 전체 크기 예산(가장 오래 사용하지 않은 항목부터)과
+    보관 기간을 넘은 항목은 cleanup()에서 함께 정리됩니다.
+    """
+
+    CHUNK_SIZE = 1024 * 1024
+
+    def __init__(self, root: str = "uploads", max_bytes: Optional[int] = 1024 * 1024 * 1024,
+                 max_age_hours: Optional[float] = 24):
+        """
+        Args:
+            root: 업로드 파일 저장 디렉토리
+            max_bytes: 파일과 분석 결과를 합친 최대 크기 (바이트, None이면 제한 없음)
+            max_age_hours: 마지막 사용 후 이 시간이 지나면 정리 (None이면 기간 제한 없음)
+        """
+        self.root = root
+        self.max_bytes = max_bytes
+        self.max_age_hours = max_age_hours
+
+        if not os.path.exists(root):
+            os.makedirs(root)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(root, "upload_store.db"), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS uploads (
+                    digest TEXT NOT NULL,
+                    extension TEXT NOT NULL,
+                    file_size INTEGER NOT NULL,
+                    content TEXT,
+                    content_size INTEGER NOT NULL DEFAULT 0,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL,
+                    PRIMARY KEY (digest, extension)
+                );
+                CREATE INDEX IF NOT EXISTS idx_uploads_last_access ON uploads (last_access);
+            """)
+
+        self.hits = 0
+        self.misses = 0
+
+    def path_for(self, digest: str, extension: str) -> str:
+        """저장된 업로드 파일 경로"""
+        return os.path.join(self.root, f"{digest}{extension}")
+
+    def save_upload(self, file, extension: str) -> Tuple[str, str, int]:
+        """
+        업로드 파일을 읽는 동안 해시를 계산하며 저장
+
+        Args:
+            file: read()를 지원하는 파일 객체 또는 Flask의 FileStorage
+            extension: 저장할 확장자 (예: ".pdf")
+
+        Returns:
+            (해시, 저장 경로, 파일 크기)
+        """
+        stream = getattr(file, "stream", file)
+        digest = hashlib.sha256()
+        size = 0
+        fd, temp_path = tempfile.mkstemp(dir=self.root, suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as out:
+                while True:
+                    chunk = stream.read(self.CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    digest.update(chunk)
+                    out.write(chunk)
+                    size += len(chunk)
+
+            digest = digest.hexdigest()
+            path = self.path_for(digest, extension)
+            # 같은 내용이 이미 있으면 새로 받은 파일은 버림
+            if os.path.exists(path):
+                os.remove(temp_path)
+            else:
+                os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO uploads (digest, extension, file_size, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(digest, extension) DO UPDATE SET last_access = excluded.last_access",
+                (digest, extension, size, now, now))
+        return digest, path, size
+
+    def get_content(self, digest: str, extension: str) -> Optional[str]:
+        """저장된 분석 결과 반환 (없으면 None)"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content FROM uploads WHERE digest = ? AND extension = ?",
+                (digest, extension)).fetchone()
+            if row is None or row[0] is None:
+                self.misses += 1
+                return None
+            with self._conn:
+                self._conn.execute(
+                    "UPDATE uploads SET last_access = ? WHERE digest = ? AND extension = ?",
+                    (time.time(), digest, extension))
+            self.hits += 1
+            return row[0]
+
+    def put_content(self, digest: str, extension: str, content: str) -> None:
+        """분석 결과 저장 후 크기 예산을 넘으면 오래된 항목 정리"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE uploads SET content = ?, content_size = ?, last_access = ? "
+                "WHERE digest = ? AND extension = ?",
+                (content, len(content.encode("utf-8")), time.time(), digest, extension))
+        removed = self._evict(keep=(digest, extension))
+        self._remove_files(removed)
+
+    def cleanup(self, max_age_hours: Optional[float] = None) -> List[str]:
+        """
+        보관 기간과 크기 예산을 넘은 항목, 저장소에 등록되지 않은 오래된 파일을 삭제
+
+        Args:
+            max_age_hours: 보관 기간 (기본값: 생성 시 지정한 값)
+
+        Returns:
+            삭제한 파일 이름 목록
+        """
+        max_age_hours = self.max_age_hours if max_age_hours is None else max_age_hours
+        removed: List[Tuple[str, str]] = []
+        if max_age_hours is not None:
+            cutoff = time.time() - max_age_hours * 3600
+            with self._lock, self._conn:
+                removed = self._conn.execute(
+                    "SELECT digest, extension FROM uploads WHERE last_access < ?", (cutoff,)).fetchall()
+                self._conn.execute("DELETE FROM uploads WHERE last_access < ?", (cutoff,))
+        removed.extend(self._evict())
+        deleted = self._remove_files(removed)
+
+        # 저장소 도입 이전 업로드나 중단된 임시 파일처럼 등록되지 않은 파일은 수정 시각으로 정리
+        if max_age_hours is not None:
+            with self._lock:
+                known = {f"{digest}{extension}" for digest, extension in
+                         self._conn.execute("SELECT digest, extension FROM uploads")}
+            cutoff = time.time() - max_age_hours * 3600
+            for filename in os.listdir(self.root):
+                path = os.path.join(self.root, filename)
+                if (filename in known or filename.startswith("upload_store.db")
+                        or not os.path.isfile(path)):
+                    continue
+                if os.path.getmtime(path) < cutoff:
+                    try:
+                        os.remove(path)
+                        deleted.append(filename)
+                    except OSError as e:
+                        print(f"파일 삭제 실패: {filename}, 오류: {e}")
+        return deleted
+
+    def _evict(self, keep: Optional[Tuple[str, str]] = None) -> List[Tuple[str, str]]:
+        """크기 예산을 넘은 만큼 가장 오래 사용하지 않은 항목을 목록에서 제거하고 반환"""
+        if self.max_bytes is None:
+            return []
+        removed = []
+        with self._lock, self._conn:
+            total = self._conn.execute(
+                "SELECT COALESCE(SUM(file_size + content_size), 0) FROM uploads").fetchone()[0]
+            if total <= self.max_bytes:
+                return []
+            for digest, extension, size in self._conn.execute(
+                    "SELECT digest, extension, file_size + content_size FROM uploads "
+                    "ORDER BY last_access").fetchall():
+                if total <= self.max_bytes:
+                    break
+                if (digest, extension) == keep:
+                    continue
+                removed.append((digest, extension))
+                total -= size
+            self._conn.executemany("DELETE FROM uploads WHERE digest = ? AND extension = ?", removed)
+        return removed
+
+    def _remove_files(self, entries: List[Tuple[str, str]]) -> List[str]:
+        """목록에서 제거된 항목의 파일 삭제"""
+        deleted = []
+        for digest, extension in entries:
+            path = self.path_for(digest, extension)
+            try:
+                if os.path.exists(path):
+                    os.remove(path)
+                deleted.append(os.path.basename(path))
+            except OSError as e:
+                print(f"파일 삭제 실패: {os.path.basename(path)}, 오류: {e}")
+        return deleted
+
+    def stats(self) -> Dict:
+        """저장된 항목 수, 전체 크기, 분석 결과 적중/미스 횟수"""
+        with self._lock:
+            count, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(file_size + content_size), 0) FROM uploads").fetchone()
+            return {"entries": count, "bytes": total, "max_bytes": self.max_bytes,
+                    "hits": self.hits, "misses": self.misses}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -1,22 +1,173 @@
-from flask import Flask, render_template, request, jsonify, session
+from flask import Flask, render_template, request, jsonify, session, Response, stream_with_context, g
 from flask_cors import CORS
 import json
 import os
+import re
+import time
 from datetime import datetime
 from rule_engine import get_rule_response
-from llm_api import get_llm_response
+from llm_api import get_llm_response, stream_llm_response, get_llm_stats, summarize_context, response_cache
 from conversation_manager import ConversationManager
+from conversation_store import create_store
+from persistence_writer import WriteBehindWriter
+from search_index import SearchIndex
+from session_catalog import SessionCatalog
+from session_cache import SessionCache
+from context_compactor import ContextCompactor
 from file_analyzer import FileAnalyzer
+from analysis_jobs import AnalysisJobQueue, QueueFullError
+from document_index import DocumentIndex, format_reference
+from metrics import REGISTRY, CallbackMetric, Histogram
+from tracing import RequestTracer, span
+from config import (CONTEXT_COMPACTION_ENABLED, CONTEXT_RECENT_TOKENS, CONTEXT_SUMMARY_BATCH_TOKENS,
+                    CONTEXT_SUMMARY_MAX_BATCH_TOKENS, PDF_MAX_PAGES,
+                    PDF_TIME_BUDGET, PDF_MAX_WORKERS, UPLOAD_CACHE_MAX_BYTES, UPLOAD_MAX_AGE_HOURS,
+                    ANALYSIS_MAX_WORKERS, ANALYSIS_MAX_PENDING, ANALYSIS_TIME_LIMIT,
+                    ANALYSIS_MEMORY_LIMIT_MB, EXCEL_MAX_ROWS, EXCEL_MAX_COLUMNS, EXCEL_MAX_BYTES,
+                    OCR_LANG, OCR_MAX_SIDE, OCR_MAX_WORKERS, OCR_MAX_FRAMES, OCR_CACHE_DISK_PATH,
+                    DOCUMENT_INDEX_PATH, DOCUMENT_CHUNK_TOKENS, DOCUMENT_CHUNK_OVERLAP_TOKENS,
+                    DOCUMENT_TOP_K, DOCUMENT_CONTEXT_TOKENS, DOCUMENT_MAX_PER_SESSION,
+                    TRACE_ENABLED, TRACE_SLOW_THRESHOLD, TRACE_PROFILE_SAMPLE_RATE, TRACE_LOG_DIR,
+                    TRACE_MAX_LOG_FILES, CONVERSATION_STORE, CONVERSATION_DB_PATH)
 
 app = Flask(__name__)
 app.secret_key = 'your-secret-key-here'  # 실제 운영시에는 환경변수로 설정
 CORS(app)
 
-# 전역 대화 히스토리 관리자 (실제 운영시에는 데이터베이스 사용 권장)
-conversation_managers = {}
+# 대화 기록은 요청 스레드가 아닌 백그라운드 작성기에서 모아서 저장 (종료 시 자동 flush)
+history_writer = WriteBehindWriter(flush_interval=1.0, max_dirty_age=5.0)
+history_writer.start()
+
+# 대화 기록 저장소 (세션별 JSON 파일 또는 SQLite)
+conversation_store = create_store(CONVERSATION_STORE, db_path=CONVERSATION_DB_PATH)
+
+# 모든 세션의 메시지를 검색하는 역색인 (메시지가 저장될 때 증분 색인)
+search_index = SearchIndex()
+
+# 저장된 세션 목록 (세션이 저장될 때 갱신되므로 목록 조회 시 디렉토리를 훑지 않음)
+session_catalog = SessionCatalog()
+if session_catalog.is_empty():
+    session_catalog.rebuild(store=conversation_store)
+
+# 세션 ID는 파일 이름에 쓰이므로 영문, 숫자, '_', '-'만 허용
+SESSION_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+# 긴 대화의 오래된 부분을 요청 스레드 밖에서 누적 요약으로 합침
+context_compactor = ContextCompactor(summarize_context) if CONTEXT_COMPACTION_ENABLED else None
+
+def build_conversation_manager(session_id):
+    """세션 ID로 대화 히스토리 관리자 생성"""
+    return ConversationManager(
+        max_history=100, save_to_file=True, write_behind=True, writer=history_writer,
+        search_index=search_index, catalog=session_catalog, session_id=session_id,
+        compactor=context_compactor, context_recent_tokens=CONTEXT_RECENT_TOKENS,
+        context_summary_batch_tokens=CONTEXT_SUMMARY_BATCH_TOKENS,
+        context_summary_max_batch_tokens=CONTEXT_SUMMARY_MAX_BATCH_TOKENS,
+        store=conversation_store)
+
+def create_conversation_manager(session_id):
+    """세션 ID로 대화 히스토리 관리자 생성 (저장된 기록이 있으면 로드)"""
+    conversation_manager = build_conversation_manager(session_id)
+    conversation_manager.load_from_file(session_id)
+    return conversation_manager
+
+# 세션별 대화 히스토리 관리자 캐시 (오래 사용하지 않은 세션은 디스크에 저장 후 메모리에서 내림)
+session_cache = SessionCache(
+    create_conversation_manager,
+    max_entries=1000,
+    max_memory_bytes=256 * 1024 * 1024,
+    idle_ttl=30 * 60
+)
 
 # 파일 분석기 초기화
-file_analyzer = FileAnalyzer()
+file_analyzer = FileAnalyzer(pdf_max_pages=PDF_MAX_PAGES, pdf_time_budget=PDF_TIME_BUDGET,
+                             pdf_workers=PDF_MAX_WORKERS, cache_max_bytes=UPLOAD_CACHE_MAX_BYTES,
+                             max_age_hours=UPLOAD_MAX_AGE_HOURS, excel_max_rows=EXCEL_MAX_ROWS,
+                             excel_max_columns=EXCEL_MAX_COLUMNS, excel_max_bytes=EXCEL_MAX_BYTES,
+                             ocr_lang=OCR_LANG, ocr_max_side=OCR_MAX_SIDE, ocr_workers=OCR_MAX_WORKERS,
+                             ocr_max_frames=OCR_MAX_FRAMES, ocr_cache_path=OCR_CACHE_DISK_PATH)
+
+# 세션별 업로드 문서 조각 색인 ('파일 분석' 질문에 관련 조각만 LLM에 보냄)
+document_index = DocumentIndex(DOCUMENT_INDEX_PATH, chunk_tokens=DOCUMENT_CHUNK_TOKENS,
+                               overlap_tokens=DOCUMENT_CHUNK_OVERLAP_TOKENS,
+                               max_documents_per_session=DOCUMENT_MAX_PER_SESSION)
+
+def index_uploaded_document(upload, file_info):
+    """분석이 끝난 업로드 문서를 업로드한 세션의 색인에 추가"""
+    with span("document.index"):
+        document_index.add_document(upload['session_id'], file_info['file_hash'],
+                                    file_info['filename'], file_info['content'])
+
+# 요청(과 분석 작업)별 구간 추적. 느린 요청은 구간 트리(와 표본 요청의 cProfile 결과)를 로그 디렉토리에 기록
+request_tracer = RequestTracer(log_dir=TRACE_LOG_DIR, slow_threshold=TRACE_SLOW_THRESHOLD,
+                               profile_sample_rate=TRACE_PROFILE_SAMPLE_RATE,
+                               max_log_files=TRACE_MAX_LOG_FILES, enabled=TRACE_ENABLED)
+
+# 느린 파일 분석은 요청 스레드가 아닌 작업 큐에서 실행 (업로드 요청은 작업 ID를 바로 반환)
+analysis_jobs = AnalysisJobQueue(file_analyzer, max_workers=ANALYSIS_MAX_WORKERS,
+                                 max_pending=ANALYSIS_MAX_PENDING, time_limit=ANALYSIS_TIME_LIMIT,
+                                 memory_limit_mb=ANALYSIS_MEMORY_LIMIT_MB, on_done=index_uploaded_document,
+                                 tracer=request_tracer)
+analysis_jobs.start()
+
+# 요청 처리 시간 (스트리밍 응답은 응답 객체를 돌려줄 때까지, 즉 첫 이벤트 전까지)
+HTTP_REQUEST_SECONDS = Histogram("chatbot_http_request_seconds", "HTTP 요청 처리 시간",
+                                 ("endpoint", "method", "status"))
+
+def _cache_lookups():
+    """캐시별 (적중, 미스) 횟수 (각 캐시가 세고 있는 값을 /metrics를 읽을 때 가져옴)"""
+    lookups = {}
+    session_stats = session_cache.stats()
+    lookups['session'] = (session_stats['hits'], session_stats['misses'])
+    upload_stats = file_analyzer.store.stats()
+    lookups['upload_content'] = (upload_stats['hits'], upload_stats['misses'])
+    if response_cache:
+        llm_cache_stats = response_cache.stats()
+        lookups['llm_response'] = (llm_cache_stats['hits'] + llm_cache_stats['disk_hits'],
+                                   llm_cache_stats['misses'])
+    return lookups
+
+CallbackMetric("chatbot_cache_hits_total", "캐시 적중 횟수", "counter",
+               lambda: {(name,): hits for name, (hits, _) in _cache_lookups().items()}, ("cache",))
+CallbackMetric("chatbot_cache_misses_total", "캐시 미스 횟수", "counter",
+               lambda: {(name,): misses for name, (_, misses) in _cache_lookups().items()}, ("cache",))
+CallbackMetric("chatbot_cache_hit_ratio", "시작 이후 캐시 적중률", "gauge",
+               lambda: {(name,): hits / (hits + misses) if hits + misses else 0
+                        for name, (hits, misses) in _cache_lookups().items()}, ("cache",))
+CallbackMetric("chatbot_analysis_jobs", "상태별 파일 분석 작업 수", "gauge",
+               lambda: {(status,): count for status, count in analysis_jobs.stats()['jobs'].items()},
+               ("status",))
+CallbackMetric("chatbot_slow_requests_total", "느린 요청으로 기록된 요청과 분석 작업 수", "counter",
+               lambda: {(): request_tracer.stats()['slow_traces']})
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+    g.trace = request_tracer.start(request.endpoint or 'unknown', method=request.method, path=request.path)
+
+@app.after_request
+def observe_request_time(response):
+    start = g.pop('request_start', None)
+    if start is not None:
+        HTTP_REQUEST_SECONDS.labels(request.endpoint or 'unknown', request.method,
+                                    response.status_code).observe(time.perf_counter() - start)
+    trace = g.get('trace')
+    if trace is not None:
+        trace.root.set(status=response.status_code)
+        if response.is_streamed:
+            # 스트리밍 응답은 마지막 이벤트를 보내고 응답이 닫힐 때 추적 종료
+            g.trace = None
+            response.call_on_close(lambda: request_tracer.finish(trace))
+    return response
+
+@app.teardown_request
+def finish_request_trace(error=None):
+    trace = g.pop('trace', None)
+    if trace is not None:
+        if error is not None:
+            request_tracer.finish(trace, error=f"{type(error).__name__}: {error}"[:200])
+        else:
+            request_tracer.finish(trace)
 
 @app.route('/')
 def index():
@@ -25,7 +176,12 @@ def index():
 
 @app.route('/api/upload-file', methods=['POST'])
 def upload_file():
-    """파일 업로드 및 분석"""
+    """
+    파일 업로드 및 분석
+    
+    같은 내용을 분석한 결과가 있으면 바로 반환하고, 없으면 분석 작업을 큐에 넣은 뒤
+    202 응답으로 작업 ID를 반환합니다. 진행 상황은 /api/jobs/<job_id>에서 확인합니다.
+    """
     try:
         if 'file' not in request.files:
             return jsonify({
@@ -40,21 +196,42 @@ def upload_file():
                 'error': '파일이 선택되지 않았습니다.'
             }), 400
         
-        # 파일 분석
-        result = file_analyzer.analyze_file(file)
+        session_id = request.form.get('session_id', 'default')
+        if not SESSION_ID_PATTERN.match(session_id):
+            return jsonify({
+                'success': False,
+                'error': '올바르지 않은 세션 ID입니다.'
+            }), 400
         
-        if result['success']:
-            # 파일 정보 요약 생성
-            summary = file_analyzer.get_file_summary(result['file_info'])
-            
+        # 파일 저장 (형식 확인, 이전 분석 결과 조회)
+        upload = file_analyzer.prepare_upload(file)
+        if not upload['success']:
+            return jsonify(upload), 400
+        upload['session_id'] = session_id
+        
+        if upload['content'] is not None:
+            file_info = file_analyzer.finish_upload(upload, upload['content'])
+            index_uploaded_document(upload, file_info)
             return jsonify({
                 'success': True,
-                'file_info': result['file_info'],
-                'summary': summary,
+                'file_info': file_info,
+                'summary': file_analyzer.get_file_summary(file_info),
                 'message': '파일이 성공적으로 분석되었습니다.'
             })
-        else:
-            return jsonify(result), 400
+        
+        try:
+            job = analysis_jobs.submit(upload)
+        except QueueFullError as e:
+            response = jsonify({'success': False, 'error': str(e)})
+            response.headers['Retry-After'] = '5'
+            return response, 503
+        
+        return jsonify({
+            'success': True,
+            'job_id': job.job_id,
+            'status': job.status,
+            'message': '파일 분석을 시작했습니다.'
+        }), 202
             
     except Exception as e:
         return jsonify({
@@ -62,78 +239,154 @@ def upload_file():
             'error': f'파일 업로드 중 오류가 발생했습니다: {str(e)}'
         }), 500
 
+def handle_special_command(conversation_manager, session_id, user_message):
+    """
+    특별 명령어 처리. 명령어가 아니면 None 반환
+    
+    업로드 문서는 업로드 요청의 세션 ID로 색인되므로 문서 색인은 요청의 세션 ID(session_id)로 조회합니다.
+    """
+    if user_message == "히스토리":
+        messages = conversation_manager.get_recent_messages(20)
+        return {
+            'response': '대화 기록을 보여드리겠습니다.',
+            'history': messages,
+            'type': 'history'
+        }
+    elif user_message == "요약":
+        summary = conversation_manager.get_conversation_summary()
+        return {
+            'response': '대화 요약을 보여드리겠습니다.',
+            'summary': summary,
+            'type': 'summary'
+        }
+    elif user_message.startswith("검색 "):
+        keyword = user_message[3:].strip()
+        if keyword:
+            # 아직 저장되지 않은 현재 세션의 메시지도 검색되도록 먼저 기록.
+            # 다른 사용자의 대화가 보이지 않도록 요청한 세션 안에서만 검색 (세션 간 검색은 /api/search)
+            conversation_manager.flush()
+            search_result = search_index.search(keyword, session_id=session_id)
+            return {
+                'response': f"'{keyword}' 검색 결과입니다.",
+                'search_results': search_result['results'],
+                'total': search_result['total'],
+                'type': 'search'
+            }
+        else:
+            return {
+                'response': '검색할 키워드를 입력해주세요. 예: "검색 안녕"',
+                'type': 'error'
+            }
+    elif user_message == "초기화":
+        # 세션 ID(클라이언트 키)는 그대로 두고 저장된 기록까지 지워야 다시 로드해도 되살아나지 않음
+        conversation_manager.reset_history()
+        document_index.remove_session(session_id)
+        return {
+            'response': '대화 기록이 초기화되었습니다.',
+            'type': 'clear'
+        }
+    elif user_message == "도움말":
+        help_text = """사용 가능한 명령어:
+• '히스토리': 대화 기록 보기
+• '요약': 대화 요약 보기  
+• '검색 [키워드]': 메시지 검색
+• '초기화': 대화 기록 삭제
+• '파일 분석': 업로드된 파일 목록 보기
+• '파일 분석 [질문]': 업로드된 파일에서 관련 부분을 찾아 답변"""
+        return {
+            'response': help_text,
+            'type': 'help'
+        }
+    elif user_message.strip() == "파일 분석":
+        documents = document_index.list_documents(session_id)
+        if not documents:
+            response = '파일을 업로드하고 분석할 수 있습니다. 파일 업로드 버튼을 사용한 뒤 "파일 분석 [질문]"으로 질문해주세요.'
+        else:
+            names = "\n".join(f"• {document['filename']}" for document in documents)
+            response = f'업로드된 파일:\n{names}\n\n"파일 분석 [질문]"으로 파일 내용에 대해 질문해주세요.'
+        return {
+            'response': response,
+            'type': 'file_analysis'
+        }
+    
+    return None
+
+def get_file_question(session_id, user_message):
+    """
+    '파일 분석 [질문]'이면 (질문, 참고 자료) 반환, 아니면 None
+    
+    참고 자료는 요청의 세션 ID로 업로드된 문서에서 질문과 관련된 조각을 토큰 예산 안에서 고른 것이며,
+    업로드된 문서가 없으면 None입니다.
+    """
+    if not user_message.startswith("파일 분석"):
+        return None
+    question = user_message[len("파일 분석"):].strip()
+    if not question:
+        return None
+    with span("document.retrieve"):
+        chunks = document_index.retrieve(session_id, question, top_k=DOCUMENT_TOP_K,
+                                         token_budget=DOCUMENT_CONTEXT_TOKENS)
+    return question, (format_reference(chunks) if chunks else None)
+
+NO_DOCUMENT_RESPONSE = {
+    'response': '이 대화에 업로드된 파일이 없습니다. 먼저 파일을 업로드해주세요.',
+    'type': 'file_analysis'
+}
+
+def parse_chat_request():
+    """
+    채팅 요청 본문에서 (메시지, 세션 ID) 반환
+    
+    본문이 JSON 객체가 아니거나 메시지·세션 ID가 문자열이 아니면 ValueError를 발생시킵니다.
+    """
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data, dict):
+        raise ValueError('올바르지 않은 요청입니다.')
+    user_message = data.get('message', '')
+    session_id = data.get('session_id', 'default')
+    if not isinstance(user_message, str):
+        raise ValueError('메시지는 문자열이어야 합니다.')
+    if not isinstance(session_id, str) or not SESSION_ID_PATTERN.match(session_id):
+        raise ValueError('올바르지 않은 세션 ID입니다.')
+    return user_message, session_id
+
 @app.route('/api/chat', methods=['POST'])
 def chat():
     """챗봇 API 엔드포인트"""
     try:
-        data = request.get_json()
-        user_message = data.get('message', '')
-        session_id = data.get('session_id', 'default')
-        
-        # 세션별 대화 히스토리 관리자 생성
-        if session_id not in conversation_managers:
-            conversation_managers[session_id] = ConversationManager(max_history=100, save_to_file=True)
-        
-        conversation_manager = conversation_managers[session_id]
+        user_message, session_id = parse_chat_request()
+    except ValueError as e:
+        return jsonify({
+            'response': str(e),
+            'type': 'error'
+        }), 400
+    
+    try:
+        # 세션별 대화 히스토리 관리자 (캐시에 없으면 생성하거나 파일에서 다시 로드)
+        with span("session.get"):
+            conversation_manager = session_cache.get(session_id)
         
         # 특별 명령어 처리
-        if user_message == "히스토리":
-            messages = conversation_manager.get_recent_messages(20)
-            return jsonify({
-                'response': '대화 기록을 보여드리겠습니다.',
-                'history': messages,
-                'type': 'history'
-            })
-        elif user_message == "요약":
-            summary = conversation_manager.get_conversation_summary()
-            return jsonify({
-                'response': '대화 요약을 보여드리겠습니다.',
-                'summary': summary,
-                'type': 'summary'
-            })
-        elif user_message.startswith("검색 "):
-            keyword = user_message[3:].strip()
-            if keyword:
-                results = conversation_manager.search_messages(keyword)
-                return jsonify({
-                    'response': f"'{keyword}' 검색 결과입니다.",
-                    'search_results': results,
-                    'type': 'search'
-                })
-            else:
-                return jsonify({
-                    'response': '검색할 키워드를 입력해주세요. 예: "검색 안녕"',
-                    'type': 'error'
-                })
-        elif user_message == "초기화":
-            conversation_manager.clear_history()
-            return jsonify({
-                'response': '대화 기록이 초기화되었습니다.',
-                'type': 'clear'
-            })
-        elif user_message == "도움말":
-            help_text = """사용 가능한 명령어:
-• '히스토리': 대화 기록 보기
-• '요약': 대화 요약 보기  
-• '검색 [키워드]': 메시지 검색
-• '초기화': 대화 기록 삭제
-• '파일 분석': 업로드된 파일에 대해 질문"""
-            return jsonify({
-                'response': help_text,
-                'type': 'help'
-            })
-        elif user_message.startswith("파일 분석"):
-            # 파일 분석 관련 질문 처리
+        command_result = handle_special_command(conversation_manager, session_id, user_message)
+        if command_result is not None:
+            return jsonify(command_result)
+        
+        # 파일 분석 질문: 업로드 문서에서 관련 조각만 골라 질문과 함께 LLM에 보냄
+        file_question = get_file_question(session_id, user_message)
+        if file_question is not None:
+            question, reference = file_question
+            if reference is None:
+                return jsonify(NO_DOCUMENT_RESPONSE)
             return jsonify({
-                'response': '파일을 업로드하고 분석할 수 있습니다. 파일 업로드 버튼을 사용하거나 파일에 대해 질문해주세요.',
-                'type': 'file_analysis'
+                'response': get_llm_response(question, conversation_manager, reference=reference),
+                'type': 'normal'
             })
         
         # 일반 대화 처리
         # 1단계: 룰 엔진 먼저 시도
         response = get_rule_response(user_message, conversation_manager)
         
-        # 2단계: 룰이 없으면 LLM 호출
+        # 2단계: 룰이 없으면 LLM 호출 (공용 이벤트 루프에서 동시 요청 수를 제한하며 실행)
         if not response:
             response = get_llm_response(user_message, conversation_manager)
         
@@ -148,17 +401,128 @@ def chat():
             'type': 'error'
         }), 500
 
+def _sse_event(event, data):
+    """Server-Sent Events 형식의 이벤트 문자열 생성"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@app.route('/api/chat/stream', methods=['POST'])
+def chat_stream():
+    """
+    스트리밍 챗봇 API 엔드포인트 (Server-Sent Events)
+    
+    LLM 응답은 'token' 이벤트로 조각마다 전달하고 마지막에 'done' 이벤트를 보냅니다.
+    특별 명령어와 규칙 응답은 /api/chat과 같은 형식의 'result' 이벤트 하나로 전달합니다.
+    """
+    try:
+        user_message, session_id = parse_chat_request()
+    except ValueError as e:
+        return jsonify({
+            'response': str(e),
+            'type': 'error'
+        }), 400
+    
+    with span("session.get"):
+        conversation_manager = session_cache.get(session_id)
+    
+    def generate():
+        try:
+            command_result = handle_special_command(conversation_manager, session_id, user_message)
+            if command_result is not None:
+                yield _sse_event('result', command_result)
+                return
+            
+            prompt, reference = user_message, None
+            file_question = get_file_question(session_id, user_message)
+            if file_question is not None:
+                prompt, reference = file_question
+                if reference is None:
+                    yield _sse_event('result', NO_DOCUMENT_RESPONSE)
+                    return
+            else:
+                response = get_rule_response(user_message, conversation_manager)
+                if response:
+                    yield _sse_event('result', {'response': response, 'type': 'normal'})
+                    return
+            
+            # 클라이언트가 연결을 끊으면 제너레이터가 닫히고, 그때까지 받은 응답이 기록됨
+            chunks = []
+            llm_stream = stream_llm_response(prompt, conversation_manager, reference=reference)
+            try:
+                for delta in llm_stream:
+                    chunks.append(delta)
+                    yield _sse_event('token', {'delta': delta})
+            finally:
+                llm_stream.close()
+            yield _sse_event('done', {'response': ''.join(chunks), 'type': 'normal'})
+        except Exception as e:
+            yield _sse_event('result', {'response': f'오류가 발생했습니다: {str(e)}', 'type': 'error'})
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'  # 프록시 버퍼링 방지
+        }
+    )
+
 @app.route('/api/sessions', methods=['GET'])
 def get_sessions():
-    """사용 가능한 세션 목록 반환"""
+    """사용 가능한 세션 목록 반환 (정렬, 페이지, 필터 지원)"""
     try:
-        # 기본 세션 관리자에서 사용 가능한 세션 가져오기
-        default_manager = ConversationManager()
-        sessions = default_manager.get_available_sessions()
-        return jsonify({'sessions': sessions})
+        result = session_catalog.list_sessions(
+            sort=request.args.get('sort', 'session_id'),
+            descending=request.args.get('order', 'desc') != 'asc',
+            page=request.args.get('page', 1, type=int),
+            page_size=min(request.args.get('page_size', 20, type=int), 100),
+            prefix=request.args.get('prefix'),
+            min_messages=request.args.get('min_messages', type=int),
+            updated_since=request.args.get('updated_since')
+        )
+        return jsonify({
+            'sessions': [entry['session_id'] for entry in result['sessions']],
+            'items': result['sessions'],
+            'total': result['total'],
+            'page': result['page'],
+            'page_size': result['page_size']
+        })
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/search', methods=['GET'])
+def search():
+    """모든 세션의 메시지 검색"""
+    try:
+        query = request.args.get('q', '').strip()
+        if not query:
+            return jsonify({'error': '검색어(q)가 필요합니다.'}), 400
+        
+        result = search_index.search(
+            query,
+            session_id=request.args.get('session_id'),
+            role=request.args.get('role'),
+            source=request.args.get('source'),
+            since=request.args.get('since'),
+            until=request.args.get('until'),
+            page=request.args.get('page', 1, type=int),
+            page_size=min(request.args.get('page_size', 20, type=int), 100)
+        )
+        return jsonify(result)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/session-cache/stats', methods=['GET'])
+def get_session_cache_stats():
+    """세션 캐시 적중/미스/제거 통계"""
+    return jsonify(session_cache.stats())
+
+@app.route('/api/llm/stats', methods=['GET'])
+def llm_stats():
+    """LLM 호출 동시 실행/대기, 요청 합치기, 응답 캐시 현황"""
+    return jsonify(get_llm_stats())
+
 @app.route('/api/load-session', methods=['POST'])
 def load_session():
     """특정 세션 로드"""
@@ -168,11 +532,14 @@ def load_session():
         
         if not session_id:
             return jsonify({'error': '세션 ID가 필요합니다.'}), 400
+        if not SESSION_ID_PATTERN.match(session_id):
+            return jsonify({'error': '올바르지 않은 세션 ID입니다.'}), 400
         
-        # 새 대화 히스토리 관리자 생성
-        conversation_manager = ConversationManager()
-        if conversation_manager.load_from_file(session_id):
-            conversation_managers[session_id] = conversation_manager
+        # 캐시의 관리자를 사용 (없으면 로드). 따로 로드하면 캐시에 아직 저장되지 않은 메시지가 있을 때
+        # 순번이 겹쳐 이후 메시지가 다시 로드할 때 빠짐
+        with span("session.get"):
+            conversation_manager = session_cache.get(session_id)
+        if conversation_manager.conversation_history:
             messages = conversation_manager.get_recent_messages(50)
             return jsonify({
                 'success': True,
@@ -185,11 +552,92 @@ def load_session():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/sessions/<session_id>/messages', methods=['GET'])
+def get_session_messages(session_id):
+    """세션 메시지를 순번 기준으로 페이지 단위 조회 (before_seq 이전의 최근 limit개, 오래된 순)"""
+    if not SESSION_ID_PATTERN.match(session_id):
+        return jsonify({'error': '올바르지 않은 세션 ID입니다.'}), 400
+    try:
+        limit = max(1, min(request.args.get('limit', 50, type=int), 200))
+        with span("session.get"):
+            conversation_manager = session_cache.get(session_id)
+        page = conversation_manager.get_message_page(request.args.get('before_seq', type=int), limit)
+        return jsonify({
+            'session_id': session_id,
+            'messages': [dict(message, seq=seq) for seq, message in page],
+            # 더 오래된 메시지를 읽을 때 before_seq로 보낼 값 (없으면 None)
+            'next_before_seq': page[0][0] if page and page[0][0] > 1 else None
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """분석 작업 상태 (partial=1이면 지금까지 추출된 내용 포함)"""
+    job = analysis_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': '작업을 찾을 수 없습니다.'}), 404
+    return jsonify(job.to_dict(include_partial=request.args.get('partial') == '1'))
+
+@app.route('/api/jobs/<job_id>/stream', methods=['GET'])
+def stream_job(job_id):
+    """
+    분석 작업 진행 상황 스트리밍 (Server-Sent Events)
+    
+    추출된 부분 내용은 'progress' 이벤트로 보내고, 작업이 끝나면 'done' 또는 'error' 이벤트를 보냅니다.
+    """
+    job = analysis_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': '작업을 찾을 수 없습니다.'}), 404
+    
+    def generate():
+        seen = 0
+        while True:
+            parts, finished = job.wait_for_update(seen, timeout=15)
+            seen += len(parts)
+            for part in parts:
+                yield _sse_event('progress', {'status': job.status, 'delta': part})
+            if finished:
+                break
+            if not parts:
+                yield _sse_event('keepalive', {'status': job.status})
+        data = job.to_dict()
+        yield _sse_event('done' if data['status'] == 'done' else 'error', data)
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'  # 프록시 버퍼링 방지
+        }
+    )
+
+@app.route('/api/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    """분석 작업 취소"""
+    if analysis_jobs.get(job_id) is None:
+        return jsonify({'error': '작업을 찾을 수 없습니다.'}), 404
+    if not analysis_jobs.cancel(job_id):
+        return jsonify({'success': False, 'error': '이미 끝난 작업입니다.'}), 409
+    return jsonify({'success': True, 'job_id': job_id})
+
+@app.route('/api/jobs/stats', methods=['GET'])
+def get_job_stats():
+    """분석 작업 큐 현황 (상태별 작업 수, 대기 수, 거절 횟수)과 업로드 저장소 현황"""
+    return jsonify({'jobs': analysis_jobs.stats(), 'uploads': file_analyzer.store.stats()})
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """단계별 지연 시간 히스토그램, 캐시 적중률 등 지표 (Prometheus 텍스트 형식)"""
+    return Response(REGISTRY.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
 @app.route('/api/cleanup-files', methods=['POST'])
 def cleanup_files():
     """오래된 파일 정리"""
     try:
         file_analyzer.cleanup_files()
+        document_index.cleanup(UPLOAD_MAX_AGE_HOURS)
         return jsonify({
             'success': True,
             'message': '오래된 파일이 정리되었습니다.'